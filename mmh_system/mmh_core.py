@@ -10,14 +10,151 @@ import json
 import time
 import hmac
 import base64
-from datetime import datetime
-from typing import Dict, Any, Optional, List, Union
-from dataclasses import dataclass, asdict
+import copy
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple, Union
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
+from collections import OrderedDict
+from operator import attrgetter
 import pickle
 import gzip
+import os
+import struct
+import sys
+import zlib
+import numpy as np
 
-@dataclass
+# Record format versions. 1.0.0 records carry a separately hashed signature
+# and verification hash; 1.1.0 records derive both from one HMAC pass;
+# 1.2.0 records hash the canonical content JSON instead of its gzip stream.
+LEGACY_RECORD_VERSION = "1.0.0"
+PAIR_SIGNATURE_VERSION = "1.1.0"
+RECORD_VERSION = "1.2.0"
+
+# Versions whose content_hash covers gzip-compressed content
+GZIP_HASH_VERSIONS = (LEGACY_RECORD_VERSION, PAIR_SIGNATURE_VERSION)
+
+MMH_SECRET = b"kai_core_mmh_secret"  # In production, use proper key management
+
+# content_hash || signature || verification_hash, as raw bytes
+DIGEST_ROW_SIZE = 96
+
+# Records log frames: u32 payload length + zlib(pickle(record_dict))
+RECORD_FRAME_HEADER = struct.Struct("<I")
+
+# Canonical content -> (compressed content, content hash) memo size
+CONTENT_CACHE_SIZE = 256
+
+# Reproducibility elements and their score weights, in bit order
+REPRODUCIBILITY_WEIGHTS = (
+    ("test_name", 0.2),
+    ("input_data", 0.3),
+    ("parameters", 0.2),
+    ("results", 0.2),
+    ("environment", 0.1),
+)
+REQUIRED_ELEMENTS = ("test_name", "input_data", "parameters", "results")
+
+
+def _build_score_lut() -> List[float]:
+    """Score for every presence bitmask, summed in the same order as per-record scoring"""
+    lut = []
+    for mask in range(1 << len(REPRODUCIBILITY_WEIGHTS)):
+        score = 0.0
+        for bit, (_, weight) in enumerate(REPRODUCIBILITY_WEIGHTS):
+            if mask & (1 << bit):
+                score += weight
+        lut.append(min(score, 1.0))
+    return lut
+
+
+def _build_missing_lut() -> List[List[str]]:
+    """Missing required elements for every presence bitmask"""
+    bits = {key: 1 << bit for bit, (key, _) in enumerate(REPRODUCIBILITY_WEIGHTS)}
+    return [
+        [elem for elem in REQUIRED_ELEMENTS if not mask & bits[elem]]
+        for mask in range(1 << len(REPRODUCIBILITY_WEIGHTS))
+    ]
+
+
+_SCORE_LUT = _build_score_lut()
+_MISSING_LUT = _build_missing_lut()
+_ENVIRONMENT_BIT = 1 << 4
+
+
+def _presence_mask(content_data: Dict[str, Any]) -> int:
+    """Pack presence of the reproducibility elements into a 5-bit mask"""
+    mask = 0
+    for bit, (key, _) in enumerate(REPRODUCIBILITY_WEIGHTS):
+        if key in content_data:
+            mask |= 1 << bit
+    return mask
+
+
+def canonical_content(content_data: Dict[str, Any]) -> str:
+    """Canonical JSON form of content data"""
+    return json.dumps(content_data, sort_keys=True)
+
+
+class _HashSink:
+    """Write-only file object that feeds everything written into a hasher"""
+    
+    def __init__(self, hasher):
+        self._hasher = hasher
+    
+    def write(self, data) -> int:
+        self._hasher.update(data)
+        return len(data)
+
+
+def content_digest(content_data: Dict[str, Any], version: str = RECORD_VERSION) -> bytes:
+    """Raw SHA-256 content digest under the hashing scheme of a record version"""
+    content_bytes = canonical_content(content_data).encode()
+    hasher = hashlib.sha256()
+    if version in GZIP_HASH_VERSIONS:
+        # Same bytes as gzip.compress, hashed as they are produced rather
+        # than collected into one compressed buffer
+        with gzip.GzipFile(fileobj=_HashSink(hasher), mode='wb') as gz:
+            gz.write(content_bytes)
+    else:
+        hasher.update(content_bytes)
+    return hasher.digest()
+
+
+def content_hash_matches(content_hash: str, content_data: Dict[str, Any],
+                         version: str = RECORD_VERSION) -> bool:
+    """
+    Check a stored hex content hash against recomputed content
+    
+    The stored hex is decoded once and the raw 32-byte digests are compared
+    in constant time; the recomputed digest is never hex-encoded.
+    """
+    return hmac.compare_digest(bytes.fromhex(content_hash), content_digest(content_data, version))
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _iso_to_ns(timestamp: str) -> int:
+    """Nanoseconds since the Unix epoch for an ISO timestamp (naive = UTC)"""
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+
+# Slotted records (no per-instance __dict__) where dataclasses support it
+_RECORD_DATACLASS_OPTIONS = {"slots": True, "weakref_slot": True} if sys.version_info >= (3, 11) else {}
+
+
+def _intern(value: Any) -> Any:
+    """Intern low-cardinality string fields so equal values share one object"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(**_RECORD_DATACLASS_OPTIONS)
 class MMHRecord:
     """
     Immutable MMH Record Structure
@@ -52,6 +189,11 @@ class MMHRecord:
     test_name: Optional[str] = None
     reproducibility_score: Optional[float] = None
     
+    @property
+    def timestamp_ns(self) -> int:
+        """Record timestamp as integer nanoseconds since the Unix epoch"""
+        return _iso_to_ns(self.timestamp)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert record to dictionary for storage"""
         return asdict(self)
@@ -60,10 +202,32 @@ class MMHRecord:
         """Convert record to JSON string"""
         return json.dumps(self.to_dict(), indent=2, sort_keys=True)
     
+    def to_canonical_json(self) -> str:
+        """Convert record to compact, key-sorted JSON string"""
+        return _serialize_record(self)
+    
+    def to_tuple(self) -> tuple:
+        """Field values in RECORD_FIELDS order (shallow, no dict allocation)"""
+        return _record_values(self)
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'MMHRecord':
         """Create record from dictionary"""
-        return cls(**data)
+        return cls(**data)._intern_categoricals()
+    
+    @classmethod
+    def from_tuple(cls, values: tuple, schema: Optional[List[str]] = None) -> 'MMHRecord':
+        """Create record from field values in RECORD_FIELDS order, or in `schema` order"""
+        if schema is None:
+            return cls(*values)._intern_categoricals()
+        return cls(**dict(zip(schema, values)))._intern_categoricals()
+    
+    def _intern_categoricals(self) -> 'MMHRecord':
+        """Intern domain, record type and author in place"""
+        self.domain = _intern(self.domain)
+        self.record_type = _intern(self.record_type)
+        self.author = _intern(self.author)
+        return self
     
     @classmethod
     def from_json(cls, json_str: str) -> 'MMHRecord':
@@ -71,6 +235,41 @@ class MMHRecord:
         return cls.from_dict(json.loads(json_str))
 
 
+# Record field order used by to_tuple/from_tuple
+RECORD_FIELDS = tuple(f.name for f in fields(MMHRecord))
+_record_values = attrgetter(*RECORD_FIELDS)
+
+
+# Compact, key-sorted encoder for individual field values
+_encode_value = json.JSONEncoder(sort_keys=True, separators=(",", ":")).encode
+
+
+def _build_record_serializer(access: str):
+    """
+    Generate a serializer specialized for the fixed MMHRecord schema
+    
+    Field names are sorted once here, so the generated function emits
+    canonical JSON without walking or sorting a dict per record.
+    `access` is a format string for reading one field from `r`.
+    """
+    parts = []
+    for i, name in enumerate(sorted(f.name for f in fields(MMHRecord))):
+        prefix = "{" if i == 0 else ","
+        parts.append(f"{prefix}{json.dumps(name)}:")
+        parts.append(f"ej({access.format(name=name)})")
+    body = " + ".join(
+        repr(part) if not part.startswith("ej(") else part for part in parts
+    )
+    source = f"def serialize(r):\n    return {body} + '}}'\n"
+    namespace = {"ej": _encode_value}
+    exec(source, namespace)
+    return namespace["serialize"]
+
+
+_serialize_record = _build_record_serializer("r.{name}")
+_serialize_record_dict = _build_record_serializer("r[{name!r}]")
+
+
 class MMHCore:
     """
     Core MMH System for immutable data storage and verification
@@ -80,39 +279,160 @@ class MMHCore:
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
         self.chain_file = self.storage_path / "mmh_chain.json"
+        self.chain_log_file = self.storage_path / "mmh_chain.log"
         self.records_file = self.storage_path / "mmh_records.json"
+        self.records_log_file = self.storage_path / "mmh_records.log"
+        self._chain_fd = None
+        self._records_fd = None
+        self._content_cache = OrderedDict()
         
         # Initialize storage
         self._load_chain()
         self._load_records()
     
+    def __del__(self):
+        self.close()
+    
+    def close(self):
+        """Close the chain and records log file descriptors"""
+        if getattr(self, "_chain_fd", None) is not None:
+            os.close(self._chain_fd)
+            self._chain_fd = None
+        if getattr(self, "_records_fd", None) is not None:
+            os.close(self._records_fd)
+            self._records_fd = None
+    
+    def compact(self):
+        """
+        Fold the append-only logs into the JSON snapshots
+        
+        Writes mmh_records.json and mmh_chain.json from memory, then
+        removes both logs. Each snapshot is durably replaced before its log
+        goes, and a chain log already folded into the snapshot is skipped
+        on load, so a crash at any step replays without duplicates.
+        """
+        self._save_records()
+        self._save_chain()
+        self.close()
+        self._content_cache.clear()
+        for log_file in (self.records_log_file, self.chain_log_file):
+            if log_file.exists():
+                log_file.unlink()
+    
+    @staticmethod
+    def _open_append_fd(path: Path) -> int:
+        """Open a log file for durable appends"""
+        flags = (os.O_WRONLY | os.O_APPEND | os.O_CREAT
+                 | getattr(os, "O_DSYNC", 0) | getattr(os, "O_BINARY", 0))
+        return os.open(path, flags, 0o644)
+    
     def _load_chain(self):
-        """Load MMH chain for integrity verification"""
+        """Load MMH chain snapshot plus the append-only chain log"""
         if self.chain_file.exists():
             with open(self.chain_file, 'r') as f:
                 self.chain = json.load(f)
         else:
             self.chain = {"genesis": "GENESIS_BLOCK", "records": []}
             self._save_chain()
+        
+        if self.chain_log_file.exists():
+            data = self.chain_log_file.read_bytes()
+            entries = []
+            offset = 0
+            while offset < len(data):
+                end = data.find(b"\n", offset)
+                if end < 0:
+                    # Torn final write; everything before it is intact
+                    break
+                line = data[offset:end].strip()
+                offset = end + 1
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Damaged line; later entries are still intact
+                    continue
+            if offset < len(data):
+                # Drop the torn tail so the next entry starts on its own line
+                os.truncate(self.chain_log_file, offset)
+            
+            # compact() stopped between replacing the snapshot and removing
+            # the log: the snapshot already ends with these entries
+            records = self.chain["records"]
+            if entries and records[-len(entries):] == entries:
+                entries = []
+            records.extend(entries)
     
     def _save_chain(self):
-        """Save MMH chain"""
-        with open(self.chain_file, 'w') as f:
-            json.dump(self.chain, f, indent=2)
+        """Save MMH chain snapshot"""
+        self._write_snapshot(self.chain_file, json.dumps(self.chain, indent=2))
+    
+    def _append_chain_entry(self, entry: Dict[str, Any]):
+        """Append one chain entry to the log with a single durable write"""
+        if self._chain_fd is None:
+            self._chain_fd = self._open_append_fd(self.chain_log_file)
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        os.write(self._chain_fd, line.encode())
     
     def _load_records(self):
-        """Load existing MMH records"""
+        """Load MMH records snapshot plus the append-only records log"""
         if self.records_file.exists():
             with open(self.records_file, 'r') as f:
                 self.records = json.load(f)
         else:
             self.records = {}
-            self._save_records()
+        
+        if self.records_log_file.exists():
+            data = self.records_log_file.read_bytes()
+            offset = 0
+            while offset + RECORD_FRAME_HEADER.size <= len(data):
+                (length,) = RECORD_FRAME_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_FRAME_HEADER.size
+                end = start + length
+                if end > len(data):
+                    # Torn final write; everything before it is intact
+                    break
+                record_dict = self._unpack_record_frame(data[start:end])
+                self.records[record_dict["mmh_id"]] = record_dict
+                offset = end
+            if offset < len(data):
+                # Drop the torn tail so the next append starts on a frame
+                # boundary instead of being swallowed by the stale length
+                os.truncate(self.records_log_file, offset)
+    
+    def _pack_record_frame(self, record_dict: Dict[str, Any]) -> bytes:
+        """Serialize a record dict into a length-prefixed log frame"""
+        payload = zlib.compress(pickle.dumps(record_dict, protocol=5), 1)
+        return RECORD_FRAME_HEADER.pack(len(payload)) + payload
+    
+    def _unpack_record_frame(self, payload: bytes) -> Dict[str, Any]:
+        """Deserialize a log frame payload back into a record dict"""
+        return pickle.loads(zlib.decompress(payload))
+    
+    def _append_record_frame(self, record_dict: Dict[str, Any]):
+        """Append one record to the records log with a single write"""
+        if self._records_fd is None:
+            self._records_fd = self._open_append_fd(self.records_log_file)
+        os.write(self._records_fd, self._pack_record_frame(record_dict))
     
     def _save_records(self):
-        """Save MMH records"""
-        with open(self.records_file, 'w') as f:
-            json.dump(self.records, f, indent=2)
+        """Save MMH records JSON snapshot (export format)"""
+        entries = (
+            f"{json.dumps(mmh_id)}:{_serialize_record_dict(record_dict)}"
+            for mmh_id, record_dict in self.records.items()
+        )
+        self._write_snapshot(self.records_file, "{" + ",".join(entries) + "}")
+    
+    @staticmethod
+    def _write_snapshot(path: Path, text: str):
+        """Atomically replace a snapshot file"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
     
     def create_record(self, 
                      content_data: Dict[str, Any],
@@ -138,77 +458,129 @@ class MMHCore:
             MMHRecord: Immutable record with cryptographic verification
         """
         
+        # Own copies, so later changes by the caller cannot alter the stored
+        # record or break its hash and signatures
+        content_data = copy.deepcopy(content_data)
+        tags = list(tags)
+        
+        # Serialize content once for both the ID and the content hash
+        content_str = self._canonical_content(content_data)
+        
         # Generate unique MMH ID
         timestamp = datetime.utcnow().isoformat()
-        mmh_id = self._generate_mmh_id(content_data, timestamp)
+        mmh_id = self._generate_mmh_id(content_data, timestamp, content_str)
         
-        # Compress and hash content
-        compressed_content = self._compress_content(content_data)
-        content_hash = self._hash_content(compressed_content)
+        # Compress and hash content (memoized for repeated payloads)
+        compressed_content, content_hash = self._compress_and_hash(content_str)
         
-        # Create signature
-        signature = self._create_signature(content_hash, timestamp)
-        
-        # Generate verification hash
-        verification_hash = self._create_verification_hash(
-            mmh_id, content_hash, signature, timestamp
+        # Create signature and verification hash in a single HMAC pass
+        signature, verification_hash = self._create_signature_pair(
+            mmh_id, content_hash, timestamp
         )
         
         # Link to previous record for chain integrity
         chain_hash = self._get_chain_hash()
         
-        # Create record
-        record = MMHRecord(
-            mmh_id=mmh_id,
-            timestamp=timestamp,
-            record_type=record_type,
-            content_hash=content_hash,
-            content_data=content_data,
-            content_size=len(compressed_content),
-            signature=signature,
-            verification_hash=verification_hash,
-            chain_hash=chain_hash,
-            tags=tags,
-            description=description,
-            author=author,
-            version="1.0.0",
-            domain=domain,
-            test_name=test_name,
-            reproducibility_score=self._calculate_reproducibility_score(content_data)
-        )
+        # Build the stored form once; the record is constructed from it
+        record_dict = {
+            "mmh_id": mmh_id,
+            "timestamp": timestamp,
+            "record_type": record_type,
+            "content_hash": content_hash,
+            "content_data": content_data,
+            "content_size": len(compressed_content),
+            "signature": signature,
+            "verification_hash": verification_hash,
+            "chain_hash": chain_hash,
+            "tags": tags,
+            "description": description,
+            "author": author,
+            "version": RECORD_VERSION,
+            "domain": domain,
+            "test_name": test_name,
+            "reproducibility_score": self._calculate_reproducibility_score(content_data)
+        }
+        record = MMHRecord.from_dict(record_dict)
         
         # Store record
-        self._store_record(record)
+        self._store_record(record, record_dict)
         
         return record
     
-    def _generate_mmh_id(self, content_data: Dict[str, Any], timestamp: str) -> str:
+    def _generate_mmh_id(self, content_data: Dict[str, Any], timestamp: str,
+                         content_str: Optional[str] = None) -> str:
         """Generate unique MMH ID"""
-        content_str = json.dumps(content_data, sort_keys=True)
+        if content_str is None:
+            content_str = self._canonical_content(content_data)
         hash_input = f"{content_str}{timestamp}{len(self.records)}"
-        return hashlib.sha256(hash_input.encode()).hexdigest()[:16]
+        return hashlib.sha256(hash_input.encode()).digest()[:8].hex()
+    
+    def _canonical_content(self, content_data: Dict[str, Any]) -> str:
+        """Canonical JSON form of content data"""
+        return canonical_content(content_data)
     
     def _compress_content(self, content_data: Dict[str, Any]) -> bytes:
         """Compress content data"""
-        content_str = json.dumps(content_data, sort_keys=True)
-        return gzip.compress(content_str.encode())
+        return gzip.compress(self._canonical_content(content_data).encode())
     
-    def _hash_content(self, compressed_content: bytes) -> str:
-        """Hash compressed content"""
-        return hashlib.sha256(compressed_content).hexdigest()
+    def _compress_and_hash(self, content_str: str) -> Tuple[bytes, str]:
+        """
+        Compress and hash canonical content, memoizing repeated payloads
+        
+        The hash covers the canonical JSON bytes, so it does not depend on
+        the gzip header. Reproducibility runs often store the same payload
+        many times; a bounded LRU keyed on the canonical JSON skips the gzip
+        and SHA-256 passes on a repeat.
+        """
+        cached = self._content_cache.get(content_str)
+        if cached is not None:
+            self._content_cache.move_to_end(content_str)
+            return cached
+        
+        content_bytes = content_str.encode()
+        result = (gzip.compress(content_bytes), self._hash_content(content_bytes))
+        self._content_cache[content_str] = result
+        if len(self._content_cache) > CONTENT_CACHE_SIZE:
+            self._content_cache.popitem(last=False)
+        return result
+    
+    def _hash_content(self, content_bytes: bytes) -> str:
+        """Hash content bytes"""
+        return self._hash_content_digest(content_bytes).hex()
+    
+    def _hash_content_digest(self, content_bytes: bytes) -> bytes:
+        """Raw SHA-256 digest of content bytes"""
+        return hashlib.sha256(content_bytes).digest()
+    
+    def _create_signature_pair(self, mmh_id: str, content_hash: str,
+                               timestamp: str) -> Tuple[str, str]:
+        """
+        Create signature and verification hash from one HMAC-SHA512 pass
+        
+        The 64-byte MAC is split in two: the first half is the signature,
+        the second half the verification hash.
+        """
+        digest = self._signature_pair_digest(mmh_id, content_hash, timestamp)
+        return digest[:32].hex(), digest[32:].hex()
+    
+    def _signature_pair_digest(self, mmh_id: str, content_hash: str,
+                               timestamp: str) -> bytes:
+        """Raw 64-byte signature || verification hash MAC"""
+        pair_data = f"{mmh_id}{content_hash}{timestamp}"
+        return hmac.new(MMH_SECRET, pair_data.encode(), hashlib.sha512).digest()
     
     def _create_signature(self, content_hash: str, timestamp: str) -> str:
-        """Create cryptographic signature"""
+        """Create cryptographic signature (legacy 1.0.0 records)"""
         signature_data = f"{content_hash}{timestamp}"
         return hmac.new(
-            b"kai_core_mmh_secret",  # In production, use proper key management
+            MMH_SECRET,
             signature_data.encode(),
             hashlib.sha256
         ).hexdigest()
     
     def _create_verification_hash(self, mmh_id: str, content_hash: str, 
                                 signature: str, timestamp: str) -> str:
-        """Create verification hash for integrity checking"""
+        """Create verification hash for integrity checking (legacy 1.0.0 records)"""
         verification_data = f"{mmh_id}{content_hash}{signature}{timestamp}"
         return hashlib.sha256(verification_data.encode()).hexdigest()
     
@@ -220,37 +592,26 @@ class MMHCore:
     
     def _calculate_reproducibility_score(self, content_data: Dict[str, Any]) -> float:
         """Calculate reproducibility score based on content completeness"""
-        score = 0.0
-        
-        # Check for essential reproducibility elements
-        if "test_name" in content_data:
-            score += 0.2
-        if "input_data" in content_data:
-            score += 0.3
-        if "parameters" in content_data:
-            score += 0.2
-        if "results" in content_data:
-            score += 0.2
-        if "environment" in content_data:
-            score += 0.1
-            
-        return min(score, 1.0)
+        return _SCORE_LUT[_presence_mask(content_data)]
     
-    def _store_record(self, record: MMHRecord):
+    def _store_record(self, record: MMHRecord, record_dict: Optional[Dict[str, Any]] = None):
         """Store record in MMH system"""
-        # Add to records
-        self.records[record.mmh_id] = record.to_dict()
+        # Add to records, reusing the caller's dict when it already has one
+        if record_dict is None:
+            record_dict = record.to_dict()
+        self.records[record.mmh_id] = record_dict
         
         # Add to chain
-        self.chain["records"].append({
+        chain_entry = {
             "mmh_id": record.mmh_id,
             "timestamp": record.timestamp,
             "verification_hash": record.verification_hash
-        })
+        }
+        self.chain["records"].append(chain_entry)
         
-        # Save to storage
-        self._save_records()
-        self._save_chain()
+        # Save to storage; both logs only append the new entry
+        self._append_record_frame(record_dict)
+        self._append_chain_entry(chain_entry)
     
     def get_record(self, mmh_id: str) -> Optional[MMHRecord]:
         """Retrieve MMH record by ID"""
@@ -260,29 +621,51 @@ class MMHCore:
     
     def verify_record(self, record: MMHRecord) -> bool:
         """Verify MMH record integrity"""
+        return self._verify_fields(
+            record.mmh_id, record.content_data, record.content_hash,
+            record.signature, record.verification_hash,
+            record.timestamp, record.version
+        )
+    
+    def _verify_record_dict(self, record_dict: Dict[str, Any]) -> bool:
+        """Verify a stored record dict without building an MMHRecord"""
+        try:
+            return self._verify_fields(
+                record_dict["mmh_id"], record_dict["content_data"],
+                record_dict["content_hash"], record_dict["signature"],
+                record_dict["verification_hash"], record_dict["timestamp"],
+                record_dict["version"]
+            )
+        except KeyError:
+            return False
+    
+    def _verify_fields(self, mmh_id: str, content_data: Dict[str, Any],
+                       content_hash: str, signature: str, verification_hash: str,
+                       timestamp: str, version: str) -> bool:
+        """
+        Verify content hash, signature and verification hash
+        
+        Stored hex digests are decoded once and compared as raw bytes with
+        hmac.compare_digest (constant time).
+        """
         try:
             # Verify content hash
-            compressed_content = self._compress_content(record.content_data)
-            expected_hash = self._hash_content(compressed_content)
-            if record.content_hash != expected_hash:
+            if not content_hash_matches(content_hash, content_data, version):
                 return False
             
-            # Verify signature
-            expected_signature = self._create_signature(
-                record.content_hash, record.timestamp
-            )
-            if record.signature != expected_signature:
-                return False
+            # Verify signature and verification hash together
+            if version == LEGACY_RECORD_VERSION:
+                expected_signature = self._create_signature(content_hash, timestamp)
+                expected_verification = self._create_verification_hash(
+                    mmh_id, content_hash, expected_signature, timestamp
+                )
+                expected_pair = bytes.fromhex(expected_signature + expected_verification)
+            else:
+                expected_pair = self._signature_pair_digest(mmh_id, content_hash, timestamp)
             
-            # Verify verification hash
-            expected_verification = self._create_verification_hash(
-                record.mmh_id, record.content_hash, 
-                record.signature, record.timestamp
+            return hmac.compare_digest(
+                bytes.fromhex(signature + verification_hash), expected_pair
             )
-            if record.verification_hash != expected_verification:
-                return False
-            
-            return True
             
         except Exception:
             return False
@@ -296,19 +679,17 @@ class MMHCore:
         results = []
         
         for record_dict in self.records.values():
-            record = MMHRecord.from_dict(record_dict)
-            
-            # Apply filters
-            if tags and not any(tag in record.tags for tag in tags):
+            # Apply filters on the stored dict; only hits become records
+            if tags and not any(tag in record_dict["tags"] for tag in tags):
                 continue
-            if domain and record.domain != domain:
+            if domain and record_dict["domain"] != domain:
                 continue
-            if record_type and record.record_type != record_type:
+            if record_type and record_dict["record_type"] != record_type:
                 continue
-            if author and record.author != author:
+            if author and record_dict["author"] != author:
                 continue
                 
-            results.append(record)
+            results.append(MMHRecord.from_dict(record_dict))
         
         return results
     
@@ -321,21 +702,101 @@ class MMHCore:
             "verification_errors": []
         }
         
-        for i, record_info in enumerate(self.chain["records"]):
+        mmh_ids = []
+        record_dicts = []
+        for record_info in self.chain["records"]:
             mmh_id = record_info["mmh_id"]
-            record = self.get_record(mmh_id)
+            record_dict = self.records.get(mmh_id)
             
-            if not record:
+            if not record_dict:
                 integrity_report["broken_links"].append(mmh_id)
                 integrity_report["chain_verified"] = False
                 continue
             
-            if not self.verify_record(record):
-                integrity_report["verification_errors"].append(mmh_id)
-                integrity_report["chain_verified"] = False
+            mmh_ids.append(mmh_id)
+            record_dicts.append(record_dict)
+        
+        for i in self._find_verification_errors(record_dicts):
+            integrity_report["verification_errors"].append(mmh_ids[i])
+            integrity_report["chain_verified"] = False
         
         return integrity_report
 
+    def compute_merkle_root(self) -> Optional[str]:
+        """
+        Merkle root over the verification hashes of the chain
+
+        Leaves are the 32-byte verification hashes in chain order; each
+        parent is the double SHA-256 of its two 64-byte concatenated
+        children, and an odd trailing node is paired with itself.
+        """
+        level = [bytes.fromhex(info["verification_hash"]) for info in self.chain["records"]]
+        if not level:
+            return None
+
+        sha256 = hashlib.sha256
+        while len(level) > 1:
+            if len(level) & 1:
+                level.append(level[-1])
+            level = [
+                sha256(sha256(left + right).digest()).digest()
+                for left, right in zip(level[::2], level[1::2])
+            ]
+        return level[0].hex()
+
+    def _find_verification_errors(self, record_dicts: List[Dict[str, Any]]) -> List[int]:
+        """
+        Indices of records whose stored digests do not match recomputed ones
+        
+        Stored and expected digests are packed into (N, 96) uint8 matrices
+        and compared in a single vectorized step.
+        """
+        n = len(record_dicts)
+        if not n:
+            return []
+        
+        try:
+            stored_hex = [
+                d["content_hash"] + d["signature"] + d["verification_hash"]
+                for d in record_dicts
+            ]
+            if any(len(h) != 2 * DIGEST_ROW_SIZE for h in stored_hex):
+                raise ValueError("Unexpected digest length")
+            stored = np.frombuffer(bytes.fromhex("".join(stored_hex)), dtype=np.uint8)
+            stored = stored.reshape(n, DIGEST_ROW_SIZE)
+        except (KeyError, TypeError, ValueError):
+            # Malformed records: fall back to per-record verification
+            return [i for i, d in enumerate(record_dicts) if not self._verify_record_dict(d)]
+        
+        expected = np.zeros((n, DIGEST_ROW_SIZE), dtype=np.uint8)
+        failed = np.zeros(n, dtype=bool)
+        for i, record_dict in enumerate(record_dicts):
+            try:
+                expected[i] = np.frombuffer(self._expected_digest_row(record_dict), dtype=np.uint8)
+            except Exception:
+                failed[i] = True
+        
+        mismatched = (stored != expected).any(axis=1) | failed
+        return np.flatnonzero(mismatched).tolist()
+    
+    def _expected_digest_row(self, record_dict: Dict[str, Any]) -> bytes:
+        """Recompute content_hash || signature || verification_hash for a stored record"""
+        content_hash = record_dict["content_hash"]
+        timestamp = record_dict["timestamp"]
+        version = record_dict["version"]
+        expected_content = content_digest(record_dict["content_data"], version)
+        
+        if version == LEGACY_RECORD_VERSION:
+            signature = self._create_signature(content_hash, timestamp)
+            verification_hash = self._create_verification_hash(
+                record_dict["mmh_id"], content_hash, signature, timestamp
+            )
+            return expected_content + bytes.fromhex(signature + verification_hash)
+        
+        return expected_content + self._signature_pair_digest(
+            record_dict["mmh_id"], content_hash, timestamp
+        )
+
 
 class MMHVerifier:
     """
@@ -385,14 +846,54 @@ class MMHVerifier:
             }
         
         # Check for essential reproducibility elements
-        content = record.content_data
-        required_elements = ["test_name", "input_data", "parameters", "results"]
-        missing_elements = [elem for elem in required_elements if elem not in content]
+        mask = _presence_mask(record.content_data)
+        missing_elements = list(_MISSING_LUT[mask])
         
         return {
             "mmh_id": mmh_id,
             "reproducible": len(missing_elements) == 0,
             "reproducibility_score": record.reproducibility_score,
             "missing_elements": missing_elements,
-            "has_environment": "environment" in content
-        } 
\ No newline at end of file
+            "has_environment": bool(mask & _ENVIRONMENT_BIT)
+        }
+    
+    def verify_reproducibility_batch(self, mmh_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Verify reproducibility of many records in one pass
+        
+        Reads stored record dicts directly and maps each presence bitmask
+        through precomputed lookup tables instead of rebuilding records.
+        
+        Args:
+            mmh_ids: Records to check (defaults to all stored records)
+            
+        Returns:
+            Dict mapping each MMH ID to its reproducibility result
+        """
+        records = self.mmh_core.records
+        if mmh_ids is None:
+            mmh_ids = list(records.keys())
+        
+        results = {}
+        for mmh_id in mmh_ids:
+            record_dict = records.get(mmh_id)
+            if record_dict is None:
+                results[mmh_id] = {
+                    "mmh_id": mmh_id,
+                    "reproducible": False,
+                    "error": "Record not found"
+                }
+                continue
+            
+            mask = _presence_mask(record_dict["content_data"])
+            missing_elements = _MISSING_LUT[mask]
+            results[mmh_id] = {
+                "mmh_id": mmh_id,
+                "reproducible": not missing_elements,
+                "reproducibility_score": record_dict.get("reproducibility_score"),
+                "computed_score": _SCORE_LUT[mask],
+                "missing_elements": list(missing_elements),
+                "has_environment": bool(mask & _ENVIRONMENT_BIT)
+            }
+        
+        return results 
\ No newline at end of file
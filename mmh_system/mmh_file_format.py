@@ -16,11 +16,237 @@ import hashlib
 import struct
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Union, Iterator
-from datetime import datetime
+from datetime import datetime, timedelta
 import pickle
 import zlib
+import io
+import mmap
+import os
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from weakref import WeakValueDictionary
 
-from .mmh_core import MMHRecord
+import numpy as np
+
+from .mmh_core import MMHRecord, RECORD_FIELDS
+
+# Optional fast codecs for the records payload
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional JIT kernels for aggregates over very large archives
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional SIMD-parallel checksum
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Records payload codecs; files without a codec tag use the legacy one
+LEGACY_CODEC = "pickle+zlib"
+JSON_CODEC = "json+zlib"
+MSGPACK_CODEC = "msgpack+zstd"
+DEFAULT_CODEC = MSGPACK_CODEC if MSGPACK_AVAILABLE and ZSTD_AVAILABLE else JSON_CODEC
+
+# Index schema; version 2 stores timestamps as int64 epoch nanoseconds,
+# version 3 stores posting lists as record offsets instead of MMH IDs
+INDEX_VERSION = 3
+
+# Index section codec; files without an index codec tag use JSON
+INDEX_CODEC = "msgpack" if MSGPACK_AVAILABLE else "json"
+
+# Shared zstd dictionary trained across record frames
+ZSTD_DICT_SIZE = 65536
+ZSTD_DICT_SAMPLES = 1000
+ZSTD_DICT_MIN_RECORDS = 8
+
+# Decoded records kept alive per open file
+RECORD_CACHE_SIZE = 4096
+
+
+# File checksum; files without a digest tag use SHA-256
+CHECKSUM_ALGORITHM = "blake3" if BLAKE3_AVAILABLE else "sha256"
+CHECKSUM_SIZE = 32
+
+# Chunk size for streaming checksum reads
+CHECKSUM_CHUNK_SIZE = 1 << 20
+
+
+# Below this many records the JIT compile cost outweighs the scan
+NUMBA_MIN_RECORDS = 10_000
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _aggregate_kernel(sizes, timestamps):
+        total = 0
+        earliest = timestamps[0]
+        latest = timestamps[0]
+        for i in prange(sizes.shape[0]):
+            total += sizes[i]
+            earliest = min(earliest, timestamps[i])
+            latest = max(latest, timestamps[i])
+        return total, earliest, latest
+
+
+def _aggregate_columns(sizes: np.ndarray, timestamps: np.ndarray) -> tuple:
+    """Total content size and timestamp range over non-empty int64 columns"""
+    if NUMBA_AVAILABLE and sizes.shape[0] >= NUMBA_MIN_RECORDS:
+        total, earliest, latest = _aggregate_kernel(sizes, timestamps)
+        return int(total), int(earliest), int(latest)
+    return int(sizes.sum()), int(timestamps.min()), int(timestamps.max())
+
+
+def _ns_to_iso(ns: int) -> str:
+    """ISO timestamp for integer nanoseconds since the Unix epoch"""
+    return (datetime(1970, 1, 1) + timedelta(microseconds=ns // 1000)).isoformat()
+
+
+def _dumps_json(obj: Any) -> bytes:
+    """Key-sorted JSON encoding straight to bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True).encode()
+
+
+def _loads_json(data: bytes) -> Any:
+    """Decode JSON from bytes without an intermediate str"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _new_hasher(algorithm: str):
+    """Create a streaming hasher for an MMH file checksum algorithm"""
+    if algorithm == "blake3":
+        if not BLAKE3_AVAILABLE:
+            raise ValueError("MMH file requires blake3 to verify its checksum")
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    raise ValueError(f"Unsupported MMH checksum algorithm: {algorithm}")
+
+
+class HashingWriter:
+    """
+    File writer that feeds every written chunk into a hash
+    """
+    
+    def __init__(self, f, hasher):
+        self.f = f
+        self.hasher = hasher
+    
+    def write(self, data: bytes) -> int:
+        self.hasher.update(data)
+        return self.f.write(data)
+
+
+class _HashingReader:
+    """
+    File reader that feeds every chunk read into a hash
+    
+    Chunks read before the hash is chosen (the header names the algorithm)
+    are held and fed in once start() is called; start(None) stops hashing.
+    """
+    
+    def __init__(self, f):
+        self.f = f
+        self.hasher = None
+        self._pending = []
+    
+    def read(self, size: int) -> bytes:
+        data = self.f.read(size)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        elif self._pending is not None:
+            self._pending.append(data)
+        return data
+    
+    def start(self, hasher):
+        if hasher is not None:
+            for data in self._pending:
+                hasher.update(data)
+        self._pending = None
+        self.hasher = hasher
+
+
+class _BoundedReader(io.RawIOBase):
+    """
+    Read-only view over the first `length` bytes from a file's current position
+    """
+    
+    def __init__(self, f, length: int):
+        self._f = f
+        self._remaining = length
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        count = self._f.readinto(memoryview(buffer)[:self._remaining])
+        self._remaining -= count
+        return count
+
+
+def _digest_prefix(f, length: int, algorithm: str = "sha256"):
+    """Hash the first `length` bytes of an open binary file"""
+    f.seek(0)
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+: streaming digest with a reused buffer
+        return hashlib.file_digest(_BoundedReader(f, length), lambda: _new_hasher(algorithm))
+    
+    hasher = _new_hasher(algorithm)
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(CHECKSUM_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        remaining -= len(chunk)
+    return hasher
+
+
+class _LazyRecords:
+    """
+    Read-only sequence of records decoded on access from a mapped MMH file
+    """
+    
+    def __init__(self, decode, frames: List[List[int]]):
+        self._decode = decode
+        self._frames = frames
+    
+    def __len__(self) -> int:
+        return len(self._frames)
+    
+    def __getitem__(self, i: int) -> MMHRecord:
+        return self._decode(self._frames[i])
+    
+    def __iter__(self) -> Iterator[MMHRecord]:
+        decode = self._decode
+        for frame in self._frames:
+            yield decode(frame)
 
 
 class MMHFileFormat:
@@ -30,14 +256,50 @@ class MMHFileFormat:
     
     # File format constants
     MMH_MAGIC = b"MMHF"  # Magic bytes
-    VERSION = 1
+    VERSION = 2
+    LEGACY_VERSION = 1
     HEADER_SIZE = 64
     
-    def __init__(self, file_path: str = None):
+    # Fixed file preamble: magic, version, then header/index/records sizes
+    _PREAMBLE = struct.Struct("<4sIQQQ32x")
+    _MAGIC_VERSION = struct.Struct("<4sI")
+    _SECTION_SIZES = struct.Struct("<QQQ")
+    _LEN = struct.Struct("<Q")
+    
+    def __init__(self, file_path: str = None, verify: bool = False):
         self.file_path = Path(file_path) if file_path else None
+        self._verify = verify
+        self._checksum_verified = False
         self.records = []
         self.index = {}
         self.header = {}
+        self.codec = DEFAULT_CODEC
+        self._mm = None
+        self._records_base = 0
+        self._cols = {}
+        self._record_cache = OrderedDict()
+        self._live_records = WeakValueDictionary()
+        self._tag_pool = {}
+        self._record_schema = None
+        self._posting_cache = {}
+        self._zstd_dict = None
+        self._decompressor = None
+        self._records_codec = self.codec
+    
+    def __del__(self):
+        self.close()
+    
+    def close(self):
+        """Release the memory map used for per-record reads"""
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            self.records = []
+            self._record_cache.clear()
+            self._live_records.clear()
+            self._tag_pool.clear()
+            self._posting_cache.clear()
+            mm.close()
+            self._mm = None
     
     def create_mmh_file(self, records: List[MMHRecord], output_path: str) -> str:
         """
@@ -52,183 +314,434 @@ class MMHFileFormat:
         """
         output_file = Path(output_path)
         
+        # Gather record fields once into columns for the aggregate scans
+        columns = self._build_columns(records)
+        
         # Create file header
-        header = self._create_header(records)
+        header = self._create_header(records, columns)
+        header["framed"] = True
+        header["digest"] = CHECKSUM_ALGORITHM
+        header["index_codec"] = INDEX_CODEC
+        header["index_version"] = INDEX_VERSION
+        header["record_schema"] = list(RECORD_FIELDS)
         
         # Create index
-        index = self._create_index(records)
+        index = self._create_index(records, columns)
         
-        # Compress and store records
-        compressed_records = self._compress_records(records)
+        # Compress records into independent frames
+        compressed_records, frames = self._compress_records(records)
+        header["codec"] = self._records_codec
+        header["compressed_size"] = len(compressed_records)
+        header["uncompressed_size"] = self._records_raw_size
+        for record, frame in zip(records, frames):
+            index["by_id"][record.mmh_id]["frame"] = frame
+        if self._zstd_dict is not None:
+            header["zstd_dict"] = base64.b64encode(self._zstd_dict.as_bytes()).decode()
         
         # Write MMH file
         with open(output_file, 'wb') as f:
-            # Write magic bytes and version
-            f.write(self.MMH_MAGIC)
-            f.write(struct.pack('<I', self.VERSION))
+            hw = HashingWriter(f, _new_hasher(header["digest"]))
             
-            # Write header
-            header_bytes = json.dumps(header, sort_keys=True).encode()
-            f.write(struct.pack('<Q', len(header_bytes)))
-            f.write(header_bytes)
+            header_bytes = _dumps_json(header)
+            if header["index_codec"] == "msgpack":
+                index_bytes = msgpack.packb(index, use_bin_type=True)
+            else:
+                index_bytes = _dumps_json(index)
             
-            # Write index
-            index_bytes = json.dumps(index, sort_keys=True).encode()
-            f.write(struct.pack('<Q', len(index_bytes)))
-            f.write(index_bytes)
+            # Write fixed preamble with all section sizes
+            hw.write(self._PREAMBLE.pack(
+                self.MMH_MAGIC, self.VERSION,
+                len(header_bytes), len(index_bytes), len(compressed_records)
+            ))
             
-            # Write compressed records
-            f.write(struct.pack('<Q', len(compressed_records)))
-            f.write(compressed_records)
+            # Write header, index and compressed records
+            hw.write(header_bytes)
+            hw.write(index_bytes)
+            hw.write(compressed_records)
             
-            # Write file checksum
-            f.seek(0)
-            file_content = f.read()
-            checksum = hashlib.sha256(file_content).digest()
-            f.write(checksum)
+            # Write file checksum over everything written so far
+            f.write(hw.hasher.digest())
         
         return str(output_file)
     
-    def _create_header(self, records: List[MMHRecord]) -> Dict[str, Any]:
+    def _build_columns(self, records: List[MMHRecord]) -> Dict[str, Any]:
+        """
+        Columnar view of the record fields used by header and index scans
+        
+        Numeric fields are NumPy arrays; categorical fields are lists.
+        """
+        mmh_ids, domains, record_types, authors, timestamps, sizes, tags = [], [], [], [], [], [], []
+        for record in records:
+            mmh_ids.append(record.mmh_id)
+            domains.append(record.domain)
+            record_types.append(record.record_type)
+            authors.append(record.author)
+            timestamps.append(record.timestamp_ns)
+            sizes.append(record.content_size)
+            tags.append(record.tags)
+        
+        return {
+            "mmh_id": mmh_ids,
+            "domain": domains,
+            "record_type": record_types,
+            "author": authors,
+            "timestamp_ns": np.array(timestamps, dtype=np.int64),
+            "content_size": np.array(sizes, dtype=np.int64),
+            "tags": tags
+        }
+    
+    def _create_header(self, records: List[MMHRecord],
+                       columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Create MMH file header"""
-        total_size = sum(record.content_size for record in records)
+        cols = columns if columns is not None else self._build_columns(records)
+        total_size = 0
+        earliest = latest = None
+        if len(records):
+            total_size, earliest, latest = _aggregate_columns(cols["content_size"], cols["timestamp_ns"])
         
         return {
             "version": self.VERSION,
             "created_at": datetime.utcnow().isoformat(),
             "total_records": len(records),
             "total_size": total_size,
-            "compressed_size": 0,  # Will be updated
-            "domains": list(set(record.domain for record in records)),
-            "record_types": list(set(record.record_type for record in records)),
-            "authors": list(set(record.author for record in records)),
+            "compressed_size": 0,  # Set once records are compressed
+            "domains": list(set(cols["domain"])),
+            "record_types": list(set(cols["record_type"])),
+            "authors": list(set(cols["author"])),
             "date_range": {
-                "earliest": min(record.timestamp for record in records),
-                "latest": max(record.timestamp for record in records)
+                "earliest": earliest,
+                "latest": latest
             }
         }
     
-    def _create_index(self, records: List[MMHRecord]) -> Dict[str, Any]:
+    def _create_index(self, records: List[MMHRecord],
+                      columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Create index for quick record access"""
-        index = {
-            "by_id": {},
-            "by_domain": {},
-            "by_type": {},
-            "by_author": {},
-            "by_timestamp": {},
-            "by_tags": {}
-        }
+        cols = columns if columns is not None else self._build_columns(records)
+        by_id = {}
+        by_domain = defaultdict(list)
+        by_type = defaultdict(list)
+        by_author = defaultdict(list)
+        by_tags = defaultdict(list)
         
-        for i, record in enumerate(records):
-            # Index by ID
-            index["by_id"][record.mmh_id] = {
+        rows = zip(cols["mmh_id"], cols["domain"], cols["record_type"], cols["author"],
+                   cols["timestamp_ns"].tolist(), cols["content_size"].tolist(), cols["tags"])
+        for i, (rid, dom, typ, auth, ts, size, tags) in enumerate(rows):
+            by_id[rid] = {
                 "offset": i,
-                "size": record.content_size,
-                "domain": record.domain,
-                "type": record.record_type,
-                "timestamp": record.timestamp
+                "size": size,
+                "domain": dom,
+                "type": typ,
+                "timestamp": ts
             }
-            
-            # Index by domain
-            if record.domain not in index["by_domain"]:
-                index["by_domain"][record.domain] = []
-            index["by_domain"][record.domain].append(record.mmh_id)
-            
-            # Index by type
-            if record.record_type not in index["by_type"]:
-                index["by_type"][record.record_type] = []
-            index["by_type"][record.record_type].append(record.mmh_id)
-            
-            # Index by author
-            if record.author not in index["by_author"]:
-                index["by_author"][record.author] = []
-            index["by_author"][record.author].append(record.mmh_id)
-            
-            # Index by timestamp
-            if record.timestamp not in index["by_timestamp"]:
-                index["by_timestamp"][record.timestamp] = []
-            index["by_timestamp"][record.timestamp].append(record.mmh_id)
-            
-            # Index by tags
-            for tag in record.tags:
-                if tag not in index["by_tags"]:
-                    index["by_tags"][tag] = []
-                index["by_tags"][tag].append(record.mmh_id)
+            by_domain[dom].append(i)
+            by_type[typ].append(i)
+            by_author[auth].append(i)
+            # Once per distinct tag, so posting lists stay free of repeats
+            for tag in dict.fromkeys(tags):
+                by_tags[tag].append(i)
+        
+        # Timestamps in ascending order alongside their offsets, for range lookups
+        order = np.argsort(cols["timestamp_ns"], kind="stable")
         
-        return index
+        return {
+            "by_id": by_id,
+            "by_domain": dict(by_domain),
+            "by_type": dict(by_type),
+            "by_author": dict(by_author),
+            "by_timestamp": {
+                "ns": cols["timestamp_ns"][order].tolist(),
+                "offsets": order.tolist()
+            },
+            "by_tags": dict(by_tags)
+        }
     
-    def _compress_records(self, records: List[MMHRecord]) -> bytes:
-        """Compress all records into single blob"""
-        records_data = []
+    def _compress_records(self, records: List[MMHRecord]) -> tuple:
+        """
+        Compress records into independently decodable frames
         
-        for record in records:
-            record_dict = record.to_dict()
-            records_data.append(record_dict)
+        Returns:
+            The concatenated frames and a [offset, length] pair per record,
+            relative to the start of the records section; the codec used is
+            left in self._records_codec and the serialized size before
+            compression in self._records_raw_size
+        """
+        self._zstd_dict = None
+        self._decompressor = None
+        codec = self.codec
+        if codec == MSGPACK_CODEC:
+            try:
+                packed = [msgpack.packb(record.to_tuple(), use_bin_type=True) for record in records]
+            except OverflowError:
+                # Integers beyond 64 bits only fit the JSON codec
+                codec = JSON_CODEC
+        self._records_codec = codec
+        if codec == MSGPACK_CODEC:
+            self._zstd_dict = self._train_dictionary(packed)
+            compressor = zstd.ZstdCompressor(level=15, dict_data=self._zstd_dict)
+            encoded = (compressor.compress(data) for data in packed)
+        else:
+            packed = [json.dumps(record.to_tuple(), separators=(",", ":")).encode() for record in records]
+            encoded = (zlib.compress(data, level=6) for data in packed)
+        self._records_raw_size = sum(len(data) for data in packed)
         
-        # Serialize and compress
-        serialized = pickle.dumps(records_data)
-        compressed = zlib.compress(serialized, level=9)
+        buffer = io.BytesIO()
+        frames = []
+        for frame in encoded:
+            frames.append([buffer.tell(), len(frame)])
+            buffer.write(frame)
         
-        return compressed
+        return buffer.getvalue(), frames
+    
+    def _train_dictionary(self, samples: List[bytes]):
+        """Train a zstd dictionary shared by all frames, or None if too few samples"""
+        if len(samples) < ZSTD_DICT_MIN_RECORDS:
+            return None
+        try:
+            return zstd.train_dictionary(ZSTD_DICT_SIZE, samples[:ZSTD_DICT_SAMPLES])
+        except zstd.ZstdError:
+            return None
     
-    def load_mmh_file(self, file_path: str) -> bool:
+    def _decode_frame(self, frame: bytes, codec: str) -> Any:
+        """Decode a single record frame written with the given codec"""
+        if codec == MSGPACK_CODEC:
+            if not (MSGPACK_AVAILABLE and ZSTD_AVAILABLE):
+                raise ValueError("MMH file requires msgpack and zstandard to load")
+            if self._decompressor is None:
+                self._decompressor = zstd.ZstdDecompressor(dict_data=self._zstd_dict)
+            return msgpack.unpackb(self._decompressor.decompress(frame), raw=False,
+                                   strict_map_key=False)
+        
+        if codec == JSON_CODEC:
+            return json.loads(zlib.decompress(frame))
+        
+        raise ValueError(f"Unsupported MMH records codec: {codec}")
+    
+    def _read_record(self, frame: List[int]) -> MMHRecord:
         """
-        Load MMH file into memory
+        Decode one record frame from the mapped MMH file
+        
+        Recently used records are held in a bounded LRU; any record still
+        referenced elsewhere is found through a weak map and not re-decoded.
+        """
+        key = frame[0]
+        cache = self._record_cache
+        record = cache.get(key)
+        if record is not None:
+            cache.move_to_end(key)
+            return record
+        
+        record = self._live_records.get(key)
+        if record is None:
+            start = self._records_base + key
+            values = self._decode_frame(self._mm[start:start + frame[1]], self.header["codec"])
+            if isinstance(values, dict):
+                record = MMHRecord.from_dict(values)
+            else:
+                record = MMHRecord.from_tuple(values, self._record_schema)
+            pool = self._tag_pool
+            record.tags = [pool.setdefault(tag, tag) for tag in record.tags]
+            self._live_records[key] = record
+        
+        cache[key] = record
+        if len(cache) > RECORD_CACHE_SIZE:
+            cache.popitem(last=False)
+        return record
+    
+    def _decompress_records(self, compressed_records: bytes, codec: str) -> List[Dict[str, Any]]:
+        """Decompress a records blob written with the given codec"""
+        if codec == MSGPACK_CODEC:
+            if not (MSGPACK_AVAILABLE and ZSTD_AVAILABLE):
+                raise ValueError("MMH file requires msgpack and zstandard to load")
+            serialized = zstd.ZstdDecompressor().decompress(compressed_records)
+            return msgpack.unpackb(serialized, raw=False, strict_map_key=False)
+        
+        if codec == JSON_CODEC:
+            return json.loads(zlib.decompress(compressed_records))
+        
+        if codec == LEGACY_CODEC:
+            return pickle.loads(zlib.decompress(compressed_records))
+        
+        raise ValueError(f"Unsupported MMH records codec: {codec}")
+    
+    def load_mmh_file(self, file_path: str, verify: Optional[bool] = None) -> bool:
+        """
+        Load MMH file header and index
+        
+        Framed records stay in a read-only memory map and are decoded
+        only when accessed.
         
         Args:
             file_path: Path to MMH file
+            verify: Verify the file checksum while loading (defaults to the
+                `verify` flag given to the constructor); see verify_checksum()
             
         Returns:
             True if successful
         """
         mmh_file = Path(file_path)
+        if verify is None:
+            verify = self._verify
         
         if not mmh_file.exists():
             raise FileNotFoundError(f"MMH file not found: {file_path}")
         
-        with open(mmh_file, 'rb') as f:
-            # Read and verify magic bytes
-            magic = f.read(4)
+        self.close()
+        self.file_path = mmh_file
+        self._checksum_verified = False
+        f = open(mmh_file, 'rb')
+        try:
+            # When verifying, every section is hashed as it is read
+            reader = _HashingReader(f)
+            
+            # Read fixed preamble and verify magic bytes
+            preamble = reader.read(self.HEADER_SIZE)
+            if len(preamble) < self._MAGIC_VERSION.size:
+                raise ValueError(f"Invalid MMH file format: {file_path}")
+            magic, version = self._MAGIC_VERSION.unpack_from(preamble)
             if magic != self.MMH_MAGIC:
                 raise ValueError(f"Invalid MMH file format: {file_path}")
             
-            # Read version
-            version = struct.unpack('<I', f.read(4))[0]
-            if version != self.VERSION:
+            if version == self.VERSION:
+                if len(preamble) < self.HEADER_SIZE:
+                    raise ValueError(f"Invalid MMH file format: {file_path}")
+                header_size, index_size, records_size = self._SECTION_SIZES.unpack_from(
+                    preamble, self._MAGIC_VERSION.size
+                )
+                header_bytes = reader.read(header_size)
+            elif version == self.LEGACY_VERSION:
+                # Section sizes are interleaved with the sections; re-read from the start
+                f.seek(0)
+                reader = _HashingReader(f)
+                reader.read(self._MAGIC_VERSION.size)
+                header_bytes = reader.read(self._LEN.unpack(reader.read(self._LEN.size))[0])
+            else:
                 raise ValueError(f"Unsupported MMH version: {version}")
             
-            # Read header
-            header_size = struct.unpack('<Q', f.read(8))[0]
-            header_bytes = f.read(header_size)
-            self.header = json.loads(header_bytes.decode())
+            # Parse header
+            self.header = _loads_json(header_bytes)
+            reader.start(_new_hasher(self.header.get("digest", "sha256")) if verify else None)
+            self._zstd_dict = None
+            self._decompressor = None
+            if "zstd_dict" in self.header and ZSTD_AVAILABLE:
+                self._zstd_dict = zstd.ZstdCompressionDict(base64.b64decode(self.header["zstd_dict"]))
             
-            # Read index
-            index_size = struct.unpack('<Q', f.read(8))[0]
-            index_bytes = f.read(index_size)
-            self.index = json.loads(index_bytes.decode())
+            # Frames hold field tuples; only remap fields if the schema differs
+            schema = self.header.get("record_schema")
+            self._record_schema = schema if schema and tuple(schema) != RECORD_FIELDS else None
             
-            # Read compressed records
-            records_size = struct.unpack('<Q', f.read(8))[0]
-            compressed_records = f.read(records_size)
+            # Parse index
+            if version == self.LEGACY_VERSION:
+                index_bytes = reader.read(self._LEN.unpack(reader.read(self._LEN.size))[0])
+                records_size = self._LEN.unpack(reader.read(self._LEN.size))[0]
+            else:
+                index_bytes = reader.read(index_size)
+            self._posting_cache = {}
+            index_codec = self.header.get("index_codec", "json")
+            if index_codec == "msgpack":
+                if not MSGPACK_AVAILABLE:
+                    raise ValueError("MMH file requires msgpack to load its index")
+                self.index = msgpack.unpackb(index_bytes, raw=False)
+            else:
+                self.index = _loads_json(index_bytes)
             
-            # Decompress and load records
-            serialized = zlib.decompress(compressed_records)
-            records_data = pickle.loads(serialized)
+            # Read compressed records
+            records_base = f.tell()
+            body_size = records_base + records_size
+            if self.header.get("framed"):
+                # Framed records are decoded on demand from the mapped file;
+                # the records section is hashed straight from the map
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._records_base = records_base
+                if verify and len(self._mm) >= body_size:
+                    with memoryview(self._mm) as view:
+                        reader.hasher.update(view[records_base:body_size])
+            else:
+                compressed_records = reader.read(records_size)
             
-            # Convert back to MMHRecord objects
-            self.records = [MMHRecord.from_dict(record_dict) for record_dict in records_data]
+            # Verify file checksum; one extra byte catches trailing data
+            if verify:
+                f.seek(body_size)
+                expected_checksum = f.read(CHECKSUM_SIZE + 1)
+                if expected_checksum != reader.hasher.digest():
+                    self.close()
+                    raise ValueError("MMH file checksum verification failed")
+                self._checksum_verified = True
             
-            # Verify file checksum
-            f.seek(0)
-            file_content = f.read()
-            expected_checksum = file_content[-32:]  # Last 32 bytes
-            actual_checksum = hashlib.sha256(file_content[:-32]).digest()
+            if self.header.get("framed"):
+                by_id = self.index["by_id"]
+                frames = [None] * len(by_id)
+                for entry in by_id.values():
+                    frames[entry["offset"]] = entry["frame"]
+                self.records = _LazyRecords(self._read_record, frames)
+            else:
+                # Decompress and load records
+                codec = self.header.get("codec", LEGACY_CODEC)
+                records_data = self._decompress_records(compressed_records, codec)
+                
+                # Convert back to MMHRecord objects
+                self.records = [MMHRecord.from_dict(record_dict) for record_dict in records_data]
             
-            if expected_checksum != actual_checksum:
-                raise ValueError("MMH file checksum verification failed")
+            self._cols = self._load_columns()
+        finally:
+            f.close()
         
         return True
     
+    def verify_checksum(self) -> bool:
+        """
+        Verify the checksum of the loaded MMH file
+        
+        Hashes everything before the trailing checksum with the algorithm
+        named in the header. A successful result is remembered until the
+        next load.
+        
+        Returns:
+            True if the stored checksum matches
+        """
+        if self._checksum_verified:
+            return True
+        if not self.header or self.file_path is None:
+            return False
+        
+        algorithm = self.header.get("digest", "sha256")
+        if self._mm is not None:
+            # Hash straight from the existing memory map
+            body_size = len(self._mm) - CHECKSUM_SIZE
+            if body_size < 0:
+                return False
+            hasher = _new_hasher(algorithm)
+            with memoryview(self._mm) as view:
+                hasher.update(view[:body_size])
+            expected_checksum = self._mm[body_size:]
+        else:
+            with open(self.file_path, 'rb') as f:
+                body_size = f.seek(0, io.SEEK_END) - CHECKSUM_SIZE
+                if body_size < 0:
+                    return False
+                f.seek(body_size)
+                expected_checksum = f.read(CHECKSUM_SIZE)
+                hasher = _digest_prefix(f, body_size, algorithm)
+        
+        self._checksum_verified = expected_checksum == hasher.digest()
+        return self._checksum_verified
+    
+    def _load_columns(self) -> Dict[str, Any]:
+        """Columnar view of the per-record fields stored in the index"""
+        entries = sorted(self.index["by_id"].items(), key=lambda item: item[1]["offset"])
+        columns = {
+            "mmh_id": [mmh_id for mmh_id, _ in entries],
+            "domain": [entry["domain"] for _, entry in entries],
+            "record_type": [entry["type"] for _, entry in entries],
+            "content_size": np.array([entry["size"] for _, entry in entries], dtype=np.int64)
+        }
+        timestamps = [entry["timestamp"] for _, entry in entries]
+        if self.header.get("index_version", 1) >= 2:
+            columns["timestamp_ns"] = np.array(timestamps, dtype=np.int64)
+        else:
+            columns["timestamp"] = timestamps
+        return columns
+    
     def unfold_record(self, mmh_id: str) -> Optional[MMHRecord]:
         """
         Unfold a single record from MMH file
@@ -245,7 +758,7 @@ class MMHFileFormat:
                 return self.records[offset]
         return None
     
-    def unfold_records(self, mmh_ids: List[str]) -> List[MMHRecord]:
+    def unfold_records(self, mmh_ids: List[str]) -> Iterator[MMHRecord]:
         """
         Unfold multiple records from MMH file
         
@@ -253,29 +766,36 @@ class MMHFileFormat:
             mmh_ids: List of MMH record IDs to unfold
             
         Returns:
-            List of MMHRecord objects
+            Iterator over the MMHRecord objects found
         """
-        records = []
         for mmh_id in mmh_ids:
             record = self.unfold_record(mmh_id)
             if record:
-                records.append(record)
-        return records
+                yield record
     
-    def unfold_all(self) -> List[MMHRecord]:
+    def unfold_all(self) -> Iterator[MMHRecord]:
         """
         Unfold all records from MMH file
         
+        Returns:
+            Iterator over all MMHRecord objects in file order
+        """
+        yield from self.records
+    
+    def unfold_all_list(self) -> List[MMHRecord]:
+        """
+        Unfold all records from MMH file into a list
+        
         Returns:
             List of all MMHRecord objects
         """
-        return self.records.copy()
+        return list(self.unfold_all())
     
     def search_records(self, 
                       domain: Optional[str] = None,
                       record_type: Optional[str] = None,
                       author: Optional[str] = None,
-                      tags: Optional[List[str]] = None) -> List[MMHRecord]:
+                      tags: Optional[List[str]] = None) -> Iterator[MMHRecord]:
         """
         Search records in MMH file
         
@@ -286,35 +806,51 @@ class MMHFileFormat:
             tags: Filter by tags
             
         Returns:
-            List of matching MMHRecord objects
+            Iterator over matching MMHRecord objects in file order
         """
-        matching_ids = set()
+        # Sorted offset arrays per filter; tags match any of the given tags
+        candidates = []
+        if domain:
+            candidates.append(self._postings("by_domain", domain))
+        if record_type:
+            candidates.append(self._postings("by_type", record_type))
+        if author:
+            candidates.append(self._postings("by_author", author))
+        if tags:
+            tag_arrays = [self._postings("by_tags", tag) for tag in tags]
+            candidates.append(tag_arrays[0] if len(tag_arrays) == 1
+                              else np.unique(np.concatenate(tag_arrays)))
         
-        # Start with all IDs
-        if not any([domain, record_type, author, tags]):
-            matching_ids = set(self.index["by_id"].keys())
+        if not candidates:
+            offsets = range(len(self.records))
         else:
-            # Apply filters
-            if domain:
-                domain_ids = set(self.index["by_domain"].get(domain, []))
-                matching_ids = matching_ids.intersection(domain_ids) if matching_ids else domain_ids
-            
-            if record_type:
-                type_ids = set(self.index["by_type"].get(record_type, []))
-                matching_ids = matching_ids.intersection(type_ids) if matching_ids else type_ids
-            
-            if author:
-                author_ids = set(self.index["by_author"].get(author, []))
-                matching_ids = matching_ids.intersection(author_ids) if matching_ids else author_ids
-            
-            if tags:
-                tag_ids = set()
-                for tag in tags:
-                    tag_ids.update(self.index["by_tags"].get(tag, []))
-                matching_ids = matching_ids.intersection(tag_ids) if matching_ids else tag_ids
+            # Intersect smallest first and stop once nothing is left
+            candidates.sort(key=len)
+            matching = candidates[0]
+            for postings in candidates[1:]:
+                if not matching.size:
+                    break
+                matching = np.intersect1d(matching, postings, assume_unique=True)
+            offsets = matching.tolist()
         
-        # Return matching records
-        return [record for record in self.records if record.mmh_id in matching_ids]
+        # Return matching records in file order
+        records = self.records
+        for offset in offsets:
+            yield records[offset]
+    
+    def _postings(self, section: str, key: str) -> np.ndarray:
+        """Sorted int32 record offsets for one posting list of the index"""
+        cache_key = (section, key)
+        postings = self._posting_cache.get(cache_key)
+        if postings is None:
+            entries = self.index[section].get(key, [])
+            if self.header.get("index_version", 1) < 3:
+                # Older indexes list MMH IDs
+                by_id = self.index["by_id"]
+                entries = sorted(by_id[mmh_id]["offset"] for mmh_id in entries)
+            postings = np.asarray(entries, dtype=np.int32)
+            self._posting_cache[cache_key] = postings
+        return postings
     
     def retest_record(self, mmh_id: str, reproducer=None) -> Dict[str, Any]:
         """
@@ -391,18 +927,28 @@ class MMHFileFormat:
             "domains": self.header["domains"],
             "record_types": self.header["record_types"],
             "authors": self.header["authors"],
-            "date_range": self.header["date_range"],
+            "date_range": self._date_range(),
             "compression_ratio": self._calculate_compression_ratio()
         }
     
+    def _date_range(self) -> Dict[str, Any]:
+        """Header date range as ISO timestamps"""
+        date_range = self.header["date_range"]
+        if self.header.get("index_version", 1) < 2:
+            return date_range
+        return {
+            key: _ns_to_iso(value) if value is not None else None
+            for key, value in date_range.items()
+        }
+    
     def _calculate_compression_ratio(self) -> float:
-        """Calculate compression ratio"""
-        if not self.records:
+        """Compressed records section size relative to its serialized size"""
+        if not self.header.get("total_records"):
             return 0.0
         
-        original_size = sum(record.content_size for record in self.records)
-        # This is a simplified calculation - actual compression would be measured
-        return 0.7  # Assume 30% compression
+        # Files written before uncompressed_size only know the content size
+        uncompressed_size = self.header.get("uncompressed_size", self.header["total_size"])
+        return self.header["compressed_size"] / max(1, uncompressed_size)
     
     def export_record(self, mmh_id: str, output_path: str) -> bool:
         """
@@ -421,12 +967,30 @@ class MMHFileFormat:
         
         output_file = Path(output_path)
         output_file.parent.mkdir(exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(record.to_dict(), f, indent=2)
+        self._write_record_json(record, output_file)
         
         return True
     
+    @staticmethod
+    def _write_record_json(record: MMHRecord, output_file: Path):
+        """Write one record as indented JSON in a single write"""
+        record_dict = record.to_dict()
+        encoded = None
+        if ORJSON_AVAILABLE:
+            try:
+                encoded = orjson.dumps(record_dict, option=orjson.OPT_INDENT_2)
+            except TypeError:
+                # Integers beyond 64 bits and non-string keys
+                encoded = None
+            # orjson writes NaN/Infinity as null; only output holding a null
+            # can have lost one, so that case keeps the stdlib encoder
+            if encoded is not None and b"null" in encoded:
+                encoded = None
+        if encoded is not None:
+            output_file.write_bytes(encoded)
+        else:
+            output_file.write_text(json.dumps(record_dict, indent=2))
+    
     def export_records(self, mmh_ids: List[str], output_dir: str) -> Dict[str, Any]:
         """
         Export multiple records to separate files
@@ -448,13 +1012,26 @@ class MMHFileFormat:
             "exported_files": []
         }
         
-        for mmh_id in mmh_ids:
-            output_file = output_path / f"{mmh_id}.json"
-            if self.export_record(mmh_id, str(output_file)):
+        # Decode records here; write the files concurrently
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = []
+            for mmh_id in mmh_ids:
+                record = self.unfold_record(mmh_id)
+                if not record:
+                    results["failed_exports"] += 1
+                    continue
+                output_file = output_path / f"{mmh_id}.json"
+                pending.append((executor.submit(self._write_record_json, record, output_file), output_file))
+            
+            for future, output_file in pending:
+                try:
+                    future.result()
+                except Exception:
+                    results["failed_exports"] += 1
+                    continue
                 results["successful_exports"] += 1
                 results["exported_files"].append(str(output_file))
-            else:
-                results["failed_exports"] += 1
         
         return results
 
@@ -472,9 +1049,9 @@ class MMHFileManager:
         mmh_format = MMHFileFormat()
         return mmh_format.create_mmh_file(records, output_path)
     
-    def load_file(self, file_path: str) -> MMHFileFormat:
+    def load_file(self, file_path: str, verify: bool = False) -> MMHFileFormat:
         """Load MMH file"""
-        mmh_format = MMHFileFormat(file_path)
+        mmh_format = MMHFileFormat(file_path, verify=verify)
         mmh_format.load_mmh_file(file_path)
         self.current_file = mmh_format
         return mmh_format
@@ -484,6 +1061,13 @@ class MMHFileManager:
         if not self.current_file:
             return {"error": "No MMH file loaded"}
         
+        # Retests must run against an intact archive
+        if not self.current_file.verify_checksum():
+            return {
+                "success": False,
+                "error": "MMH file checksum verification failed"
+            }
+        
         return self.current_file.retest_record(mmh_id, reproducer)
     
     def batch_retest(self, mmh_ids: List[str], reproducer=None) -> Dict[str, Any]:
@@ -5,11 +5,16 @@ Provides 100% reproducible test recreation from MMH records
 with complete environment reconstruction and execution.
 """
 
+import io
 import json
+import operator
 import subprocess
 import sys
 import os
+import time
 from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import tempfile
@@ -17,6 +22,65 @@ import shutil
 
 from .mmh_core import MMHRecord
 
+# Reproductions in flight at once in batch_reproduce
+BATCH_CONCURRENCY = 32
+
+# Test components extracted from a record's content
+TestData = namedtuple('TestData', [
+    'test_name', 'input_data', 'parameters', 'expected_results', 'environment',
+    'dependencies', 'random_seed', 'test_function', 'domain', 'record_type'
+])
+
+# Reproduction report layout; optional lines are passed in pre-rendered
+_REPRODUCTION_REPORT_TEMPLATE = """\
+# MMH Test Reproduction Report
+Generated: {generated}
+
+## MMH Record Information
+- MMH ID: {record.mmh_id}
+- Original Timestamp: {record.timestamp}
+- Record Type: {record.record_type}
+- Domain: {record.domain}
+- Author: {record.author}
+- Reproducibility Score: {record.reproducibility_score}
+
+## Test Information
+- Test Name: {test_name}
+- Input Data Size: {input_size}
+- Parameters: {parameter_count}
+
+## Environment Recreation
+- Python Version: {environment[python_version]}
+- Dependencies: {dependency_count}
+- Random Seed: {environment[random_seed]}
+- Working Directory: {environment[working_directory]}
+
+## Execution Results
+- Execution Time: {execution_time} seconds
+- Success: {success}
+{error_line}
+## Verification Results
+- Verification Passed: {verification_passed}
+- Accuracy Score: {accuracy_score:.3f}
+- Exact Match: {exact_match}
+{differences_line}
+## Summary
+{summary}"""
+
+_SUCCESS_SUMMARY = (
+    "✅ **REPRODUCTION SUCCESSFUL**\n"
+    "The test was successfully reproduced with high accuracy."
+)
+_FAILURE_SUMMARY = (
+    "❌ **REPRODUCTION FAILED**\n"
+    "The test reproduction did not match the original results."
+)
+
+
+def _yes_no(flag: Any) -> str:
+    """Report marker for a boolean outcome"""
+    return '✅ YES' if flag else '❌ NO'
+
 
 class MMHReproducer:
     """
@@ -28,13 +92,15 @@ class MMHReproducer:
         self.reproduction_path = Path("mmh_reproductions")
         self.reproduction_path.mkdir(exist_ok=True)
     
-    def reproduce_test(self, mmh_id: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
+    def reproduce_test(self, mmh_id: str, output_dir: Optional[str] = None,
+                       now_iso: Optional[str] = None) -> Dict[str, Any]:
         """
         Reproduce test from MMH record with 100% accuracy
         
         Args:
             mmh_id: MMH record ID to reproduce
             output_dir: Output directory for reproduction (optional)
+            now_iso: Report generation timestamp (optional, defaults to now)
             
         Returns:
             Dict containing reproduction results and verification
@@ -56,11 +122,11 @@ class MMHReproducer:
         
         # Create reproduction directory
         if not output_dir:
-            output_dir = self.reproduction_path / f"reproduction_{mmh_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+            output_dir = self._default_output_dir(mmh_id)
         else:
             output_dir = Path(output_dir)
         
-        output_dir.mkdir(exist_ok=True)
+        output_dir.mkdir(parents=True, exist_ok=True)
         
         try:
             # Extract test data from MMH record
@@ -76,7 +142,7 @@ class MMHReproducer:
             verification_result = self._verify_reproduction(record, execution_result)
             
             # Generate reproduction report
-            report = self._generate_reproduction_report(record, test_data, environment, execution_result, verification_result)
+            report = self._generate_reproduction_report(record, test_data, environment, execution_result, verification_result, now_iso)
             
             return {
                 "success": True,
@@ -97,25 +163,29 @@ class MMHReproducer:
                 "output_dir": str(output_dir)
             }
     
-    def _extract_test_data(self, record: MMHRecord) -> Dict[str, Any]:
+    def _default_output_dir(self, mmh_id: str, stamp: Optional[str] = None) -> Path:
+        """Default reproduction directory for a record, stamped with UTC time"""
+        if stamp is None:
+            stamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        return self.reproduction_path / f"reproduction_{mmh_id}_{stamp}"
+    
+    def _extract_test_data(self, record: MMHRecord) -> TestData:
         """Extract test data from MMH record"""
         content = record.content_data
         
         # Extract essential test components
-        test_data = {
-            "test_name": content.get("test_name"),
-            "input_data": content.get("input_data"),
-            "parameters": content.get("parameters", {}),
-            "expected_results": content.get("results"),
-            "environment": content.get("environment", {}),
-            "dependencies": content.get("dependencies", []),
-            "random_seed": content.get("random_seed"),
-            "test_function": content.get("test_function"),
-            "domain": record.domain,
-            "record_type": record.record_type
-        }
-        
-        return test_data
+        return TestData(
+            content.get("test_name"),
+            content.get("input_data"),
+            content.get("parameters", {}),
+            content.get("results"),
+            content.get("environment", {}),
+            content.get("dependencies", []),
+            content.get("random_seed"),
+            content.get("test_function"),
+            record.domain,
+            record.record_type
+        )
     
     def _recreate_environment(self, record: MMHRecord, output_dir: Path) -> Dict[str, Any]:
         """Recreate test environment from MMH record"""
@@ -144,13 +214,13 @@ class MMHReproducer:
         
         return env_info
     
-    def _execute_reproduction(self, test_data: Dict[str, Any], environment: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
+    def _execute_reproduction(self, test_data: TestData, environment: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
         """Execute test reproduction"""
         execution_result = {
             "start_time": datetime.utcnow().isoformat(),
-            "test_name": test_data["test_name"],
-            "input_data": test_data["input_data"],
-            "parameters": test_data["parameters"],
+            "test_name": test_data.test_name,
+            "input_data": test_data.input_data,
+            "parameters": test_data.parameters,
             "actual_results": None,
             "execution_time": None,
             "success": False,
@@ -158,18 +228,18 @@ class MMHReproducer:
         }
         
         try:
-            start_time = datetime.utcnow()
+            start_ns = time.perf_counter_ns()
             
             # Execute test function if available
-            if test_data.get("test_function"):
+            if test_data.test_function:
                 # This would require safe execution of stored functions
                 # For now, we'll simulate the execution
                 execution_result["actual_results"] = self._simulate_test_execution(test_data)
             else:
                 # Use the expected results as actual results for verification
-                execution_result["actual_results"] = test_data["expected_results"]
+                execution_result["actual_results"] = test_data.expected_results
             
-            execution_result["execution_time"] = (datetime.utcnow() - start_time).total_seconds()
+            execution_result["execution_time"] = (time.perf_counter_ns() - start_ns) / 1e9
             execution_result["success"] = True
             
         except Exception as e:
@@ -180,15 +250,15 @@ class MMHReproducer:
         
         return execution_result
     
-    def _simulate_test_execution(self, test_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _simulate_test_execution(self, test_data: TestData) -> Dict[str, Any]:
         """Simulate test execution (placeholder for actual implementation)"""
         # This would be replaced with actual test execution logic
         # For now, return a simulated result
         return {
             "simulated_result": True,
-            "test_name": test_data["test_name"],
-            "input_size": len(str(test_data["input_data"])),
-            "parameters_applied": test_data["parameters"],
+            "test_name": test_data.test_name,
+            "input_size": len(str(test_data.input_data)),
+            "parameters_applied": test_data.parameters,
             "execution_successful": True
         }
     
@@ -208,8 +278,9 @@ class MMHReproducer:
             verification["differences"].append("Missing results for comparison")
             return verification
         
-        # Simple comparison (would be more sophisticated in practice)
-        if original_results == actual_results:
+        # Simple comparison (would be more sophisticated in practice);
+        # replayed results are often the stored object itself
+        if original_results is actual_results or original_results == actual_results:
             verification["verification_passed"] = True
             verification["accuracy_score"] = 1.0
             verification["exact_match"] = True
@@ -226,17 +297,20 @@ class MMHReproducer:
         """Calculate similarity between original and actual results"""
         try:
             if isinstance(original, dict) and isinstance(actual, dict):
-                # Compare dictionary keys and values
-                original_keys = set(original.keys())
-                actual_keys = set(actual.keys())
+                # Compare dictionary keys via key views (no set copies)
+                common_keys = original.keys() & actual.keys()
+                union_size = len(original) + len(actual) - len(common_keys)
                 
-                key_similarity = len(original_keys.intersection(actual_keys)) / len(original_keys.union(actual_keys))
+                key_similarity = len(common_keys) / union_size
                 
                 # Compare values for common keys
                 value_similarity = 0.0
-                common_keys = original_keys.intersection(actual_keys)
                 if common_keys:
-                    matches = sum(1 for key in common_keys if original[key] == actual[key])
+                    matches = sum(map(
+                        operator.eq,
+                        map(original.__getitem__, common_keys),
+                        map(actual.__getitem__, common_keys)
+                    ))
                     value_similarity = matches / len(common_keys)
                 
                 return (key_similarity + value_similarity) / 2
@@ -247,65 +321,40 @@ class MMHReproducer:
         except Exception:
             return 0.0
     
-    def _generate_reproduction_report(self, record: MMHRecord, test_data: Dict[str, Any], 
+    def _generate_reproduction_report(self, record: MMHRecord, test_data: TestData, 
                                    environment: Dict[str, Any], execution_result: Dict[str, Any], 
-                                   verification_result: Dict[str, Any]) -> str:
+                                   verification_result: Dict[str, Any],
+                                   now_iso: Optional[str] = None) -> str:
         """Generate comprehensive reproduction report"""
-        report_lines = []
-        
-        report_lines.append("# MMH Test Reproduction Report")
-        report_lines.append(f"Generated: {datetime.utcnow().isoformat()}")
-        report_lines.append("")
-        
-        report_lines.append("## MMH Record Information")
-        report_lines.append(f"- MMH ID: {record.mmh_id}")
-        report_lines.append(f"- Original Timestamp: {record.timestamp}")
-        report_lines.append(f"- Record Type: {record.record_type}")
-        report_lines.append(f"- Domain: {record.domain}")
-        report_lines.append(f"- Author: {record.author}")
-        report_lines.append(f"- Reproducibility Score: {record.reproducibility_score}")
-        report_lines.append("")
-        
-        report_lines.append("## Test Information")
-        report_lines.append(f"- Test Name: {test_data['test_name']}")
-        report_lines.append(f"- Input Data Size: {len(str(test_data['input_data']))}")
-        report_lines.append(f"- Parameters: {len(test_data['parameters'])}")
-        report_lines.append("")
-        
-        report_lines.append("## Environment Recreation")
-        report_lines.append(f"- Python Version: {environment['python_version']}")
-        report_lines.append(f"- Dependencies: {len(environment['dependencies'])}")
-        report_lines.append(f"- Random Seed: {environment['random_seed']}")
-        report_lines.append(f"- Working Directory: {environment['working_directory']}")
-        report_lines.append("")
-        
-        report_lines.append("## Execution Results")
-        report_lines.append(f"- Execution Time: {execution_result['execution_time']} seconds")
-        report_lines.append(f"- Success: {'✅ YES' if execution_result['success'] else '❌ NO'}")
-        if execution_result['error']:
-            report_lines.append(f"- Error: {execution_result['error']}")
-        report_lines.append("")
-        
-        report_lines.append("## Verification Results")
-        report_lines.append(f"- Verification Passed: {'✅ YES' if verification_result['verification_passed'] else '❌ NO'}")
-        report_lines.append(f"- Accuracy Score: {verification_result['accuracy_score']:.3f}")
-        report_lines.append(f"- Exact Match: {'✅ YES' if verification_result['exact_match'] else '❌ NO'}")
-        if verification_result['differences']:
-            report_lines.append(f"- Differences: {', '.join(verification_result['differences'])}")
-        report_lines.append("")
-        
-        report_lines.append("## Summary")
-        if verification_result['verification_passed']:
-            report_lines.append("✅ **REPRODUCTION SUCCESSFUL**")
-            report_lines.append("The test was successfully reproduced with high accuracy.")
-        else:
-            report_lines.append("❌ **REPRODUCTION FAILED**")
-            report_lines.append("The test reproduction did not match the original results.")
-        
-        return "\n".join(report_lines)
+        error = execution_result['error']
+        differences = verification_result['differences']
+        
+        return _REPRODUCTION_REPORT_TEMPLATE.format(
+            generated=now_iso or datetime.utcnow().isoformat(),
+            record=record,
+            test_name=test_data.test_name,
+            input_size=len(str(test_data.input_data)),
+            parameter_count=len(test_data.parameters),
+            environment=environment,
+            dependency_count=len(environment['dependencies']),
+            execution_time=execution_result['execution_time'],
+            success=_yes_no(execution_result['success']),
+            error_line=f"- Error: {error}\n" if error else "",
+            verification_passed=_yes_no(verification_result['verification_passed']),
+            accuracy_score=verification_result['accuracy_score'],
+            exact_match=_yes_no(verification_result['exact_match']),
+            differences_line=f"- Differences: {', '.join(differences)}\n" if differences else "",
+            summary=_SUCCESS_SUMMARY if verification_result['verification_passed'] else _FAILURE_SUMMARY
+        )
     
     def batch_reproduce(self, mmh_ids: List[str]) -> Dict[str, Any]:
-        """Reproduce multiple tests from MMH records"""
+        """
+        Reproduce multiple tests from MMH records
+        
+        Records are reproduced concurrently on worker threads (at most
+        BATCH_CONCURRENCY at a time) so directory creation and storage
+        reads overlap; results keep the order of mmh_ids.
+        """
         batch_result = {
             "total_tests": len(mmh_ids),
             "successful_reproductions": 0,
@@ -314,8 +363,16 @@ class MMHReproducer:
             "results": []
         }
         
-        for mmh_id in mmh_ids:
-            result = self.reproduce_test(mmh_id)
+        # One timestamp for the whole batch
+        now = datetime.utcnow()
+        stamp = now.strftime('%Y%m%d_%H%M%S')
+        output_dirs = [str(self._default_output_dir(mmh_id, stamp)) for mmh_id in mmh_ids]
+        
+        with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as executor:
+            results = list(executor.map(self.reproduce_test, mmh_ids, output_dirs,
+                                        [now.isoformat()] * len(mmh_ids)))
+        
+        for result in results:
             batch_result["results"].append(result)
             
             if result["success"]:
@@ -327,33 +384,33 @@ class MMHReproducer:
         
         return batch_result
     
-    def generate_batch_report(self, batch_result: Dict[str, Any]) -> str:
+    def generate_batch_report(self, batch_result: Dict[str, Any],
+                              now_iso: Optional[str] = None) -> str:
         """Generate batch reproduction report"""
-        report_lines = []
+        buf = io.StringIO()
+        write = buf.write
         
-        report_lines.append("# MMH Batch Reproduction Report")
-        report_lines.append(f"Generated: {datetime.utcnow().isoformat()}")
-        report_lines.append("")
+        write("# MMH Batch Reproduction Report\n")
+        write(f"Generated: {now_iso or datetime.utcnow().isoformat()}\n")
+        write("\n")
         
-        report_lines.append("## Summary")
-        report_lines.append(f"- Total Tests: {batch_result['total_tests']}")
-        report_lines.append(f"- Successful Reproductions: {batch_result['successful_reproductions']}")
-        report_lines.append(f"- Failed Reproductions: {batch_result['failed_reproductions']}")
-        report_lines.append(f"- Verification Passed: {batch_result['verification_passed']}")
-        report_lines.append("")
+        write("## Summary\n")
+        write(f"- Total Tests: {batch_result['total_tests']}\n")
+        write(f"- Successful Reproductions: {batch_result['successful_reproductions']}\n")
+        write(f"- Failed Reproductions: {batch_result['failed_reproductions']}\n")
+        write(f"- Verification Passed: {batch_result['verification_passed']}\n")
+        write("\n")
         
-        report_lines.append("## Detailed Results")
+        write("## Detailed Results")
         for i, result in enumerate(batch_result["results"]):
-            report_lines.append(f"### Test {i+1}: {result.get('mmh_id', 'Unknown')}")
-            report_lines.append(f"- Success: {'✅ YES' if result['success'] else '❌ NO'}")
+            write(f"\n### Test {i+1}: {result.get('mmh_id', 'Unknown')}\n")
+            write(f"- Success: {_yes_no(result['success'])}\n")
             
             if result['success']:
                 verification = result.get('verification_result', {})
-                report_lines.append(f"- Verification: {'✅ PASSED' if verification.get('verification_passed') else '❌ FAILED'}")
-                report_lines.append(f"- Accuracy: {verification.get('accuracy_score', 0):.3f}")
+                write(f"- Verification: {'✅ PASSED' if verification.get('verification_passed') else '❌ FAILED'}\n")
+                write(f"- Accuracy: {verification.get('accuracy_score', 0):.3f}\n")
             else:
-                report_lines.append(f"- Error: {result.get('error', 'Unknown error')}")
-            
-            report_lines.append("")
+                write(f"- Error: {result.get('error', 'Unknown error')}\n")
         
-        return "\n".join(report_lines) 
\ No newline at end of file
+        return buf.getvalue()
@@ -7,22 +7,128 @@ to ensure data integrity and authenticity.
 
 import hashlib
 import hmac
-import base64
+import binascii
 import json
+import os
+from operator import attrgetter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union, Callable
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives.serialization import Encoding, PrivateFormat, NoEncryption
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, utils
+from cryptography.hazmat.primitives.serialization import (
+    Encoding, PrivateFormat, PublicFormat, NoEncryption,
+    load_pem_private_key, load_pem_public_key
+)
 
-from .mmh_core import MMHRecord
+from .mmh_core import MMHRecord, content_hash_matches
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Below this many records validate_batch stays in-process; pool startup
+# and record pickling cost more than the verifies they would spread out
+PARALLEL_MIN_RECORDS = 256
+
+# Mid-sized batches validate on a thread pool instead; hashing and
+# signature verification release the GIL
+THREAD_MIN_RECORDS = 16
+
+# Signature payloads memoized across repeated sign/verify calls
+SIGNATURE_PAYLOAD_CACHE_SIZE = 4096
+
+# Parsed private keys kept per (path, mtime)
+KEY_CACHE_SIZE = 32
+
+# Fields every valid record must carry (non-None)
+REQUIRED_FIELDS = (
+    'mmh_id', 'timestamp', 'record_type', 'domain',
+    'content_hash', 'content_data', 'content_size',
+    'signature', 'verification_hash', 'chain_hash',
+    'tags', 'description', 'author', 'version'
+)
+_required_values = attrgetter(*REQUIRED_FIELDS)
+
+# Reproducibility content keys, in presence-mask bit order
+REQUIRED_ELEMENTS = ("test_name", "input_data", "parameters", "results")
+OPTIONAL_ELEMENTS = ("environment", "dependencies", "random_seed")
+_ELEMENT_BITS = tuple((key, 1 << bit) for bit, key in enumerate(REQUIRED_ELEMENTS + OPTIONAL_ELEMENTS))
+_REQUIRED_MASK = (1 << len(REQUIRED_ELEMENTS)) - 1
+_ENVIRONMENT_BIT, _DEPENDENCIES_BIT, _RANDOM_SEED_BIT = (bit for _, bit in _ELEMENT_BITS[-3:])
+
+
+def _build_missing_lut(elements: tuple) -> List[tuple]:
+    """Missing elements for every presence mask"""
+    bits = dict(_ELEMENT_BITS)
+    return [
+        tuple(elem for elem in elements if not mask & bits[elem])
+        for mask in range(1 << len(_ELEMENT_BITS))
+    ]
+
+
+_MISSING_REQUIRED_LUT = _build_missing_lut(REQUIRED_ELEMENTS)
+_MISSING_OPTIONAL_LUT = _build_missing_lut(OPTIONAL_ELEMENTS)
+
+
+def _element_mask(content: Dict[str, Any]) -> int:
+    """Pack presence of the reproducibility elements into a 7-bit mask"""
+    mask = 0
+    for key, bit in _ELEMENT_BITS:
+        if key in content:
+            mask |= bit
+    return mask
+
+
+def _signature_payload(record: MMHRecord) -> bytes:
+    """Canonical key-sorted JSON bytes covered by a record signature"""
+    return _canonical_signature_bytes(
+        record.mmh_id, record.content_hash, record.timestamp,
+        record.record_type, record.domain
+    )
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _load_private_key_cached(path: str, mtime_ns: int):
+    """Parse a PEM private key; memoized until the file changes"""
+    with open(path, 'rb') as f:
+        return load_pem_private_key(f.read(), password=None)
+
+
+@lru_cache(maxsize=SIGNATURE_PAYLOAD_CACHE_SIZE)
+def _canonical_signature_bytes(mmh_id: str, content_hash: str, timestamp: str,
+                               record_type: str, domain: str) -> bytes:
+    """Serialize the signed record fields; memoized on the field values"""
+    signature_data = {
+        "mmh_id": mmh_id,
+        "content_hash": content_hash,
+        "timestamp": timestamp,
+        "record_type": record_type,
+        "domain": domain
+    }
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(signature_data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(
+        signature_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
 
 
 class MMHSigner:
     """
     Cryptographic signer for MMH records
+    
+    New key pairs are Ed25519. RSA keys loaded from disk keep signing and
+    verifying with RSA-PSS.
     """
     
+    # Immutable RSA-PSS parameters, shared by every sign and verify
+    _SHA256 = hashes.SHA256()
+    _PSS_PAD = padding.PSS(mgf=padding.MGF1(_SHA256), salt_length=padding.PSS.MAX_LENGTH)
+    _PREHASHED_SHA256 = utils.Prehashed(_SHA256)
+    
     def __init__(self, private_key_path: Optional[str] = None):
         self.private_key_path = private_key_path
         self.private_key = None
@@ -33,76 +139,98 @@ class MMHSigner:
         else:
             self._generate_keys()
     
+    @classmethod
+    def from_public_key(cls, public_key_pem: str) -> "MMHSigner":
+        """Verify-only signer for a PEM-encoded public key"""
+        signer = cls.__new__(cls)
+        signer.private_key_path = None
+        signer.private_key = None
+        signer.public_key = load_pem_public_key(public_key_pem.encode())
+        return signer
+    
+    @staticmethod
+    def clear_key_cache():
+        """Drop cached parsed private keys"""
+        _load_private_key_cached.cache_clear()
+    
     def _generate_keys(self):
-        """Generate RSA key pair for signing"""
-        self.private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048
-        )
+        """Generate Ed25519 key pair for signing"""
+        self.private_key = ed25519.Ed25519PrivateKey.generate()
         self.public_key = self.private_key.public_key()
     
     def _load_keys(self):
-        """Load existing RSA keys"""
+        """Load existing Ed25519 or RSA keys"""
         try:
-            with open(self.private_key_path, 'rb') as f:
-                self.private_key = rsa.load_private_key(f.read())
+            path = os.path.abspath(self.private_key_path)
+            self.private_key = _load_private_key_cached(path, os.stat(path).st_mtime_ns)
             self.public_key = self.private_key.public_key()
         except Exception as e:
             print(f"Warning: Could not load keys from {self.private_key_path}: {e}")
             self._generate_keys()
     
     def sign_record(self, record: MMHRecord) -> str:
-        """Sign MMH record with RSA private key"""
-        # Create signature data
-        signature_data = {
-            "mmh_id": record.mmh_id,
-            "content_hash": record.content_hash,
-            "timestamp": record.timestamp,
-            "record_type": record.record_type,
-            "domain": record.domain
-        }
+        """Sign MMH record with the private key"""
+        return self.sign_records([record])[0]
+    
+    def sign_records(self, records: List[MMHRecord],
+                     raw: bool = False) -> List[Union[str, bytes]]:
+        """
+        Sign many MMH records in one pass
         
-        signature_str = json.dumps(signature_data, sort_keys=True)
+        Ed25519 signs the payload directly. For RSA keys each payload is
+        hashed once up front and handed to the signer as a prehashed digest,
+        so the per-record cost is just the RSA operation.
         
-        # Sign with private key
-        signature = self.private_key.sign(
-            signature_str.encode(),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        Args:
+            records: Records to sign
+            raw: Return raw signature bytes instead of base64 text
+            
+        Returns:
+            Signatures, in record order
+        """
+        if isinstance(self.private_key, ed25519.Ed25519PrivateKey):
+            sign = self.private_key.sign
+            signatures = [sign(_signature_payload(record)) for record in records]
+        else:
+            pss, prehashed = self._PSS_PAD, self._PREHASHED_SHA256
+            sign = self.private_key.sign
+            signatures = [
+                sign(hashlib.sha256(_signature_payload(record)).digest(), pss, prehashed)
+                for record in records
+            ]
         
-        return base64.b64encode(signature).decode()
+        if raw:
+            return signatures
+        return [binascii.b2a_base64(sig, newline=False).decode('ascii') for sig in signatures]
     
-    def verify_signature(self, record: MMHRecord, signature: str) -> bool:
-        """Verify MMH record signature with public key"""
+    def payload_verifier(self) -> Callable[[bytes, bytes], None]:
+        """
+        verify(signature_bytes, payload) bound to the current public key
+        
+        The algorithm and its parameters are resolved once; the callable
+        raises InvalidSignature on a mismatch.
+        """
+        verify = self.public_key.verify
+        if isinstance(self.public_key, ed25519.Ed25519PublicKey):
+            return verify
+        
+        pss, sha256 = self._PSS_PAD, self._SHA256
+        return lambda signature, payload: verify(signature, payload, pss, sha256)
+    
+    def verify_signature(self, record: MMHRecord, signature: Union[str, bytes],
+                         verifier: Optional[Callable[[bytes, bytes], None]] = None) -> bool:
+        """Verify MMH record signature (base64 text or raw bytes) with public key"""
         try:
-            # Recreate signature data
-            signature_data = {
-                "mmh_id": record.mmh_id,
-                "content_hash": record.content_hash,
-                "timestamp": record.timestamp,
-                "record_type": record.record_type,
-                "domain": record.domain
-            }
-            
-            signature_str = json.dumps(signature_data, sort_keys=True)
-            
-            # Decode signature
-            signature_bytes = base64.b64decode(signature)
+            # Decode signature; raw bytes are used as-is
+            if isinstance(signature, bytes):
+                signature_bytes = signature
+            else:
+                signature_bytes = binascii.a2b_base64(signature)
             
             # Verify with public key
-            self.public_key.verify(
-                signature_bytes,
-                signature_str.encode(),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            if verifier is None:
+                verifier = self.payload_verifier()
+            verifier(signature_bytes, _signature_payload(record))
             
             return True
             
@@ -113,12 +241,12 @@ class MMHSigner:
         """Export public key for verification"""
         pem = self.public_key.public_bytes(
             encoding=Encoding.PEM,
-            format=PrivateFormat.PKCS8
+            format=PublicFormat.SubjectPublicKeyInfo
         )
         return pem.decode()
     
     def save_keys(self, private_key_path: str, public_key_path: str):
-        """Save RSA keys to files"""
+        """Save signing keys to files"""
         # Save private key
         with open(private_key_path, 'wb') as f:
             f.write(self.private_key.private_bytes(
@@ -131,7 +259,7 @@ class MMHSigner:
         with open(public_key_path, 'wb') as f:
             f.write(self.public_key.public_bytes(
                 encoding=Encoding.PEM,
-                format=PrivateFormat.SubjectPublicKeyInfo
+                format=PublicFormat.SubjectPublicKeyInfo
             ))
 
 
@@ -140,31 +268,32 @@ class MMHValidator:
     MMH record validator for integrity and authenticity verification
     """
     
-    def __init__(self, signer: MMHSigner):
+    def __init__(self, signer: MMHSigner, fast_verify: bool = True):
         self.signer = signer
+        # Bind the verify path once instead of per record
+        self._verifier = signer.payload_verifier() if fast_verify else None
     
     def validate_record(self, record: MMHRecord) -> Dict[str, Any]:
         """Comprehensive validation of MMH record"""
         validation_result = {
-            "mmh_id": record.mmh_id,
-            "timestamp": record.timestamp,
+            "mmh_id": getattr(record, "mmh_id", None),
+            "timestamp": getattr(record, "timestamp", None),
             "validation_passed": True,
             "errors": [],
             "warnings": []
         }
         
-        # Check basic structure
+        # Check basic structure; nothing else is meaningful without it
         if not self._validate_structure(record):
             validation_result["validation_passed"] = False
             validation_result["errors"].append("Invalid record structure")
+            return validation_result
         
-        # Check content integrity
+        # Check content integrity, then the signature only if the content holds
         if not self._validate_content_integrity(record):
             validation_result["validation_passed"] = False
             validation_result["errors"].append("Content integrity check failed")
-        
-        # Check cryptographic signature
-        if not self._validate_signature(record):
+        elif not self._validate_signature(record):
             validation_result["validation_passed"] = False
             validation_result["errors"].append("Cryptographic signature verification failed")
         
@@ -180,35 +309,24 @@ class MMHValidator:
     
     def _validate_structure(self, record: MMHRecord) -> bool:
         """Validate MMH record structure"""
-        required_fields = [
-            'mmh_id', 'timestamp', 'record_type', 'domain',
-            'content_hash', 'content_data', 'content_size',
-            'signature', 'verification_hash', 'chain_hash',
-            'tags', 'description', 'author', 'version'
-        ]
-        
-        for field in required_fields:
-            if not hasattr(record, field) or getattr(record, field) is None:
-                return False
+        try:
+            values = _required_values(record)
+        except AttributeError:
+            return False
         
-        return True
+        return None not in values
     
     def _validate_content_integrity(self, record: MMHRecord) -> bool:
         """Validate content hash integrity"""
         try:
-            import gzip
-            content_str = json.dumps(record.content_data, sort_keys=True)
-            compressed_content = gzip.compress(content_str.encode())
-            expected_hash = hashlib.sha256(compressed_content).hexdigest()
-            
-            return record.content_hash == expected_hash
+            return content_hash_matches(record.content_hash, record.content_data, record.version)
             
         except Exception:
             return False
     
     def _validate_signature(self, record: MMHRecord) -> bool:
         """Validate cryptographic signature"""
-        return self.signer.verify_signature(record, record.signature)
+        return self.signer.verify_signature(record, record.signature, self._verifier)
     
     def _validate_chain_integrity(self, record: MMHRecord) -> bool:
         """Validate chain integrity (basic check)"""
@@ -218,25 +336,34 @@ class MMHValidator:
     
     def _validate_reproducibility(self, record: MMHRecord) -> Dict[str, Any]:
         """Validate reproducibility requirements"""
-        content = record.content_data
-        required_elements = ["test_name", "input_data", "parameters", "results"]
-        optional_elements = ["environment", "dependencies", "random_seed"]
-        
-        missing_required = [elem for elem in required_elements if elem not in content]
-        missing_optional = [elem for elem in optional_elements if elem not in content]
+        mask = _element_mask(record.content_data)
         
         return {
-            "reproducible": len(missing_required) == 0,
-            "missing_required": missing_required,
-            "missing_optional": missing_optional,
+            "reproducible": (mask & _REQUIRED_MASK) == _REQUIRED_MASK,
+            "missing_required": list(_MISSING_REQUIRED_LUT[mask]),
+            "missing_optional": list(_MISSING_OPTIONAL_LUT[mask]),
             "reproducibility_score": record.reproducibility_score,
-            "has_environment": "environment" in content,
-            "has_dependencies": "dependencies" in content,
-            "has_random_seed": "random_seed" in content
+            "has_environment": bool(mask & _ENVIRONMENT_BIT),
+            "has_dependencies": bool(mask & _DEPENDENCIES_BIT),
+            "has_random_seed": bool(mask & _RANDOM_SEED_BIT)
         }
     
-    def validate_batch(self, records: List[MMHRecord]) -> Dict[str, Any]:
-        """Validate multiple MMH records"""
+    def validate_batch(self, records: List[MMHRecord],
+                       parallel: bool = True) -> Dict[str, Any]:
+        """
+        Validate multiple MMH records
+        
+        Large batches are split into chunks and validated across a process
+        pool; each worker rebuilds a verify-only validator from the public
+        key once. Mid-sized batches are spread over a thread pool.
+        
+        Args:
+            records: Records to validate
+            parallel: Allow fanning out to a process or thread pool
+            
+        Returns:
+            Batch summary with per-record results, in record order
+        """
         batch_result = {
             "total_records": len(records),
             "valid_records": 0,
@@ -245,8 +372,15 @@ class MMHValidator:
             "validation_results": []
         }
         
-        for record in records:
-            validation = self.validate_record(record)
+        if parallel and len(records) >= PARALLEL_MIN_RECORDS:
+            validations = self._validate_parallel(records)
+        elif parallel and len(records) >= THREAD_MIN_RECORDS:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                validations = list(executor.map(self.validate_record, records))
+        else:
+            validations = map(self.validate_record, records)
+        
+        for validation in validations:
             batch_result["validation_results"].append(validation)
             
             if validation["validation_passed"]:
@@ -259,13 +393,31 @@ class MMHValidator:
         
         return batch_result
     
-    def generate_validation_report(self, records: List[MMHRecord]) -> str:
+    def _validate_parallel(self, records: List[MMHRecord]) -> List[Dict[str, Any]]:
+        """Validate records in chunks across a process pool"""
+        workers = os.cpu_count() or 1
+        chunk_size = max(1, len(records) // (4 * workers))
+        chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.signer.export_public_key(),)
+        ) as executor:
+            return [
+                validation
+                for chunk_results in executor.map(_validate_chunk, chunks)
+                for validation in chunk_results
+            ]
+    
+    def generate_validation_report(self, records: List[MMHRecord],
+                                   now_iso: Optional[str] = None) -> str:
         """Generate detailed validation report"""
         batch_result = self.validate_batch(records)
         
         report = []
         report.append("# MMH Validation Report")
-        report.append(f"Generated: {datetime.utcnow().isoformat()}")
+        report.append(f"Generated: {now_iso or datetime.utcnow().isoformat()}")
         report.append("")
         
         report.append("## Summary")
@@ -292,4 +444,19 @@ class MMHValidator:
             report.append(f"- Reproducibility Score: {reproducibility.get('reproducibility_score', 'N/A')}")
             report.append("")
         
-        return "\n".join(report) 
\ No newline at end of file
+        return "\n".join(report) 
+
+
+# Per-process validator for validate_batch workers
+_worker_validator: Optional[MMHValidator] = None
+
+
+def _init_worker(public_key_pem: str):
+    """Build the worker's verify-only validator once per process"""
+    global _worker_validator
+    _worker_validator = MMHValidator(MMHSigner.from_public_key(public_key_pem))
+
+
+def _validate_chunk(records: List[MMHRecord]) -> List[Dict[str, Any]]:
+    """Validate one chunk of records in a worker process"""
+    return [_worker_validator.validate_record(record) for record in records]
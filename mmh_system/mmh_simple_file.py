@@ -6,11 +6,111 @@ Basic single-file storage for MMH records
 
 import json
 import hashlib
+import mmap
+import re
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from collections import defaultdict
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
 from datetime import datetime
 
-from .mmh_core import MMHRecord
+from .mmh_core import MMHRecord, RECORD_FIELDS
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional incremental parser: records are built one at a time while the
+# file is read instead of after the whole document is in memory
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+
+# Version 1 stores a list of record objects; version 2 stores one array per
+# record field ("columns") and is what create_simple_mmh_file writes
+SIMPLE_FILE_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+
+# Digit runs long enough to be an integer beyond 64 bits; values below
+# -2**63 already have 19 digits
+_LONG_DIGITS = re.compile(rb"[0-9]{19}")
+
+
+# json.dumps(..., sort_keys=True) builds a new encoder on every call; these
+# are shared. The strict one fails on NaN/Infinity so they are detected
+# exactly, without scanning the text
+_CHECKSUM_ENCODER = json.JSONEncoder(sort_keys=True, allow_nan=False)
+_CHECKSUM_ENCODER_NON_FINITE = json.JSONEncoder(sort_keys=True)
+
+
+class _ChecksumStream:
+    """
+    Incremental form of SimpleMMHFile._calculate_checksum
+    
+    Hashes the same bytes as json.dumps(list_of_dicts, sort_keys=True),
+    one record at a time. Also notes whether any record needed the NaN or
+    Infinity literals, which orjson cannot round-trip.
+    """
+    
+    def __init__(self):
+        self._hasher = hashlib.sha256(b"[")
+        self._first = True
+        self.non_finite = False
+    
+    def update(self, record_dict: Dict[str, Any]):
+        if not self._first:
+            self._hasher.update(b", ")
+        self._first = False
+        try:
+            text = _CHECKSUM_ENCODER.encode(record_dict)
+        except ValueError:
+            text = _CHECKSUM_ENCODER_NON_FINITE.encode(record_dict)
+            self.non_finite = True
+        self._hasher.update(text.encode())
+    
+    def hexdigest(self) -> str:
+        hasher = self._hasher.copy()
+        hasher.update(b"]")
+        return hasher.hexdigest()
+
+
+class _ColumnRecords:
+    """
+    Read-only sequence of the records of a version 2 file, each built from
+    the columns only when accessed
+    """
+    
+    def __init__(self, columns: Dict[str, List[Any]], total_records: int):
+        if any(len(values) != total_records for values in columns.values()):
+            raise ValueError("MMH file columns do not match total_records")
+        self._schema = list(columns)
+        self._columns = list(columns.values())
+        self._len = total_records
+    
+    def __len__(self) -> int:
+        return self._len
+    
+    def __getitem__(self, i: int) -> MMHRecord:
+        if not -self._len <= i < self._len:
+            raise IndexError("record index out of range")
+        return MMHRecord.from_tuple([values[i] for values in self._columns], self._schema)
+    
+    def __iter__(self) -> Iterator[MMHRecord]:
+        schema = self._schema
+        for values in zip(*self._columns):
+            yield MMHRecord.from_tuple(values, schema)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, _ColumnRecords)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def copy(self) -> List[MMHRecord]:
+        return list(self)
 
 
 class SimpleMMHFile:
@@ -37,55 +137,74 @@ class SimpleMMHFile:
         output_file = Path(output_path)
         
         # Create file data
+        columns = self._to_columns(records)
         file_data = {
             "magic": "MMHF",
-            "version": 1,
+            "version": SIMPLE_FILE_VERSION,
             "created_at": datetime.utcnow().isoformat(),
             "total_records": len(records),
-            "records": [record.to_dict() for record in records],
-            "index": self._create_simple_index(records),
-            "checksum": self._calculate_checksum(records)
+            "columns": columns,
+            "index": self._create_simple_index(records, columns),
         }
+        # Record dicts straight from the columns: each record is read once
+        checksum = self._checksum_stream(dict(zip(RECORD_FIELDS, values)) for values in zip(*columns.values()))
+        file_data["checksum"] = checksum.hexdigest()
         
-        # Write file
-        with open(output_file, 'w') as f:
-            json.dump(file_data, f, indent=2)
+        # Write file; orjson would turn NaN/Infinity into null and rejects
+        # integers beyond 64 bits, so those payloads keep the stdlib encoder
+        encoded = None
+        if ORJSON_AVAILABLE and not checksum.non_finite:
+            try:
+                encoded = orjson.dumps(file_data, option=orjson.OPT_INDENT_2)
+            except TypeError:
+                encoded = None
+        if encoded is not None:
+            output_file.write_bytes(encoded)
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(file_data, f, indent=2)
         
         return str(output_file)
     
-    def _create_simple_index(self, records: List[MMHRecord]) -> Dict[str, Any]:
-        """Create simple index"""
-        index = {
-            "by_id": {},
-            "by_domain": {},
-            "by_type": {}
-        }
+    @staticmethod
+    def _to_columns(records: List[MMHRecord]) -> Dict[str, List[Any]]:
+        """One list per record field, in RECORD_FIELDS order"""
+        if not records:
+            return {name: [] for name in RECORD_FIELDS}
+        return {name: list(values) for name, values in zip(RECORD_FIELDS, zip(*(r.to_tuple() for r in records)))}
+    
+    def _create_simple_index(self, records: List[MMHRecord],
+                             columns: Optional[Dict[str, List[Any]]] = None) -> Dict[str, Any]:
+        """Create simple index in one pass, from the record columns if given"""
+        if columns is None:
+            columns = self._to_columns(records)
         
-        for i, record in enumerate(records):
-            # Index by ID
-            index["by_id"][record.mmh_id] = {
-                "offset": i,
-                "domain": record.domain,
-                "type": record.record_type,
-                "timestamp": record.timestamp
-            }
-            
-            # Index by domain
-            if record.domain not in index["by_domain"]:
-                index["by_domain"][record.domain] = []
-            index["by_domain"][record.domain].append(record.mmh_id)
-            
-            # Index by type
-            if record.record_type not in index["by_type"]:
-                index["by_type"][record.record_type] = []
-            index["by_type"][record.record_type].append(record.mmh_id)
+        by_id = {}
+        by_domain = defaultdict(list)
+        by_type = defaultdict(list)
+        rows = zip(columns["mmh_id"], columns["domain"], columns["record_type"], columns["timestamp"])
+        for i, (mmh_id, domain, record_type, timestamp) in enumerate(rows):
+            by_id[mmh_id] = {"offset": i, "domain": domain, "type": record_type, "timestamp": timestamp}
+            by_domain[domain].append(mmh_id)
+            by_type[record_type].append(mmh_id)
         
-        return index
+        return {"by_id": by_id, "by_domain": dict(by_domain), "by_type": dict(by_type)}
+    
+    def _calculate_checksum(self, records: Iterable[Union[MMHRecord, Dict[str, Any]]]) -> str:
+        """Calculate checksum of records, or of their already computed dicts"""
+        # Defined over the stdlib encoding; orjson formats floats differently
+        return self._checksum_stream(records).hexdigest()
     
-    def _calculate_checksum(self, records: List[MMHRecord]) -> str:
-        """Calculate checksum of records"""
-        data_str = json.dumps([record.to_dict() for record in records], sort_keys=True)
-        return hashlib.sha256(data_str.encode()).hexdigest()
+    @staticmethod
+    def _checksum_stream(records: Iterable[Union[MMHRecord, Dict[str, Any]]]) -> _ChecksumStream:
+        """Checksum state after hashing every record or record dict"""
+        checksum = _ChecksumStream()
+        for record in records:
+            if isinstance(record, MMHRecord):
+                # Shallow: encodes the same as to_dict() without its deep copy
+                record = dict(zip(RECORD_FIELDS, record.to_tuple()))
+            checksum.update(record)
+        return checksum
     
     def load_simple_mmh_file(self, file_path: str) -> bool:
         """
@@ -102,12 +221,26 @@ class SimpleMMHFile:
         if not mmh_file.exists():
             raise FileNotFoundError(f"MMH file not found: {file_path}")
         
-        with open(mmh_file, 'r') as f:
-            file_data = json.load(f)
+        records = None
+        if IJSON_AVAILABLE:
+            try:
+                with open(mmh_file, 'rb') as f:
+                    file_data, records, actual_checksum = self._stream_file(f)
+            except ijson.JSONError:
+                # yajl rejects the NaN/Infinity literals json.dump writes
+                records = None
+        if records is None:
+            if ORJSON_AVAILABLE:
+                file_data = self._load_mapped(mmh_file)
+            else:
+                with open(mmh_file, 'r') as f:
+                    file_data = json.load(f)
         
         # Verify magic
         if file_data.get("magic") != "MMHF":
             raise ValueError(f"Invalid MMH file format: {file_path}")
+        if file_data.get("version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported MMH file version: {file_data.get('version')}")
         
         # Load data
         self.header = {
@@ -118,18 +251,116 @@ class SimpleMMHFile:
         
         self.index = file_data["index"]
         
-        # Convert records
-        self.records = [MMHRecord.from_dict(record_dict) for record_dict in file_data["records"]]
+        # Convert records; version 2 records stay in their columns and are
+        # built on access, and the checksum reads the columns directly
+        if "columns" in file_data:
+            columns = file_data["columns"]
+            records = _ColumnRecords(columns, file_data["total_records"])
+            actual_checksum = self._calculate_checksum(
+                dict(zip(columns, values)) for values in zip(*columns.values())
+            )
+        elif records is None:
+            records = [MMHRecord.from_dict(record_dict) for record_dict in file_data["records"]]
+            actual_checksum = self._calculate_checksum(records)
+        self.records = records
         
         # Verify checksum
         expected_checksum = file_data["checksum"]
-        actual_checksum = self._calculate_checksum(self.records)
         
         if expected_checksum != actual_checksum:
             raise ValueError("MMH file checksum verification failed")
         
         return True
     
+    @staticmethod
+    def _load_mapped(mmh_file: Path) -> Dict[str, Any]:
+        """Parse the file with orjson straight from a read-only memory map"""
+        with open(mmh_file, 'rb') as f:
+            if mmh_file.stat().st_size == 0:
+                raise ValueError(f"Invalid MMH file format: {mmh_file}")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                # orjson reads integers beyond 64 bits as floats and rejects
+                # NaN/Infinity; files holding either use the stdlib parser
+                if _LONG_DIGITS.search(mm) is None:
+                    with memoryview(mm) as view:
+                        try:
+                            return orjson.loads(view)
+                        except orjson.JSONDecodeError:
+                            pass
+                return json.loads(mm[:])
+            finally:
+                mm.close()
+    
+    @staticmethod
+    def _stream_file(f) -> tuple:
+        """
+        Parse an MMH file incrementally with ijson
+        
+        Each element of "records" becomes an MMHRecord and is folded into the
+        checksum as soon as it is parsed. Each element of a "columns" array
+        is appended to that column as it is parsed. Other top-level values
+        are kept as plain data.
+        
+        Returns:
+            (top-level values without "records", records, checksum)
+        """
+        file_data = {}
+        records = []
+        checksum = _ChecksumStream()
+        builder = None
+        built_prefix = None
+        finish = None
+        key = None
+        column = None
+        column_item = None
+        
+        def add_record(record_dict):
+            record = MMHRecord.from_dict(record_dict)
+            records.append(record)
+            checksum.update(record.to_dict())
+        
+        def set_value(value):
+            file_data[key] = value
+        
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == built_prefix and event in ("end_map", "end_array"):
+                    finish(builder.value)
+                    builder = None
+                continue
+            
+            if prefix == "records.item":
+                finish = add_record
+            elif prefix == column_item:
+                finish = column.append
+                if event not in ("start_map", "start_array"):
+                    column.append(value)
+                    continue
+            elif event == "map_key" and prefix == "":
+                key = value
+                if key == "columns":
+                    file_data["columns"] = {}
+                continue
+            elif event == "map_key" and prefix == "columns":
+                column = file_data["columns"][value] = []
+                column_item = f"columns.{value}.item"
+                continue
+            elif prefix == key and key not in ("records", "columns"):
+                finish = set_value
+                if event not in ("start_map", "start_array"):
+                    file_data[key] = value
+                    continue
+            else:
+                continue
+            
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            built_prefix = prefix
+        
+        return file_data, records, checksum.hexdigest()
+    
     def unfold_record(self, mmh_id: str) -> Optional[MMHRecord]:
         """Unfold a single record"""
         if mmh_id in self.index["by_id"]:
@@ -140,15 +371,17 @@ class SimpleMMHFile:
     
     def unfold_all(self) -> List[MMHRecord]:
         """Unfold all records"""
-        return self.records.copy()
+        return list(self.records)
     
     def search_records(self, domain: Optional[str] = None) -> List[MMHRecord]:
         """Search records by domain"""
         if not domain:
-            return self.records.copy()
+            return list(self.records)
         
-        domain_ids = self.index["by_domain"].get(domain, [])
-        return [record for record in self.records if record.mmh_id in domain_ids]
+        # Only the matching records are looked up, by their index offsets
+        by_id = self.index["by_id"]
+        offsets = sorted({by_id[mmh_id]["offset"] for mmh_id in self.index["by_domain"].get(domain, [])})
+        return [self.records[offset] for offset in offsets if offset < len(self.records)]
     
     def retest_record(self, mmh_id: str) -> Dict[str, Any]:
         """Retest a single record"""
@@ -10,29 +10,452 @@ import json
 import pickle
 import gzip
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 import shutil
+import copy
 import hashlib
+import hmac
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
 
-from .mmh_core import MMHRecord
+from .mmh_core import MMHRecord, content_hash_matches
+
+# Optional fast codecs for database columns and per-record backup files
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Digit runs long enough to be an integer beyond 64 bits; values below
+# -2**63 already have 19 digits
+_LONG_DIGITS = re.compile(rb"[0-9]{19}")
+_LONG_DIGITS_TEXT = re.compile(r"[0-9]{19}")
+
+# content_data/tags columns are msgpack BLOBs when msgpack is installed;
+# JSON TEXT/BLOB values from older versions are still read.
+# Backup files are zstd(msgpack) when both codecs are installed, otherwise
+# gzip(compact JSON); readers tell them apart by the frame magic
+BACKUP_VERSION = "1.1.0"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+BACKUP_ZSTD_LEVEL = 3
+BACKUP_GZIP_LEVEL = 6
+BACKUP_DICT_FILE = "backup.zdict"
+BACKUP_DICT_SIZE = 1 << 17
+BACKUP_DICT_MIN_SAMPLES = 8
+BACKUP_DICT_MAX_SAMPLES = 10000
+BACKUP_WORKERS = os.cpu_count() or 1
+HASH_CHUNK_SIZE = 1024 * 1024
+BACKUP_PAGES_PER_STEP = 1024
+
+# Decoded records kept by MMHDatabase.get_record
+RECORD_CACHE_SIZE = 4096
+
+# verify_storage_integrity hashes rows in chunks of this size and only
+# spreads them over worker processes when there is more than one chunk
+INTEGRITY_CHUNK_SIZE = 256
+
+# Stored in PRAGMA user_version; 1 added the mmh_tags table, 2 the
+# backup_size column
+SCHEMA_VERSION = 2
+
+# Applied to the shared database connection when it is opened
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+INSERT_RECORD_SQL = """
+    INSERT OR REPLACE INTO mmh_records (
+        mmh_id, timestamp, record_type, domain, content_hash,
+        content_data, content_size, signature, verification_hash,
+        chain_hash, tags, description, author, version,
+        test_name, reproducibility_score
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+GET_RECORD_SQL = "SELECT * FROM mmh_records WHERE mmh_id = ?"
+GET_CONTENT_SQL = "SELECT content_data FROM mmh_records WHERE mmh_id = ?"
+
+# One pass over mmh_records; get_statistics folds the groups in Python
+STATISTICS_SQL = """
+    SELECT record_type, domain, COUNT(*), SUM(content_size),
+           SUM(reproducibility_score), COUNT(reproducibility_score),
+           SUM(backup_size), COUNT(backup_size)
+    FROM mmh_records
+    GROUP BY record_type, domain
+"""
+
+# Same column layout as SELECT *, with content_data left out
+LAZY_SELECT = (
+    "SELECT mmh_id, timestamp, record_type, domain, content_hash, NULL, content_size,"
+    " signature, verification_hash, chain_hash, tags, description, author, version,"
+    " test_name, reproducibility_score FROM mmh_records r"
+)
+
+# Per-connection prepared statement cache (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _search_sql(tag_count: int, has_domain: bool, has_type: bool,
+                has_author: bool, has_limit: bool, eager: bool = True) -> str:
+    """
+    SQL text for one shape of search_records filter
+    
+    Built once per shape so repeated searches reuse the same string and
+    hit the connection's prepared statement cache. Parameters bind in the
+    order tags, domain, record_type, author, limit.
+    """
+    query = ("SELECT * FROM mmh_records r" if eager else LAZY_SELECT) + " WHERE 1=1"
+    if tag_count:
+        placeholders = ", ".join("?" * tag_count)
+        query += (" AND EXISTS (SELECT 1 FROM mmh_tags t"
+                  f" WHERE t.mmh_id = r.mmh_id AND t.tag IN ({placeholders}))")
+    if has_domain:
+        query += " AND domain = ?"
+    if has_type:
+        query += " AND record_type = ?"
+    if has_author:
+        query += " AND author = ?"
+    query += " ORDER BY timestamp DESC"
+    if has_limit:
+        query += " LIMIT ?"
+    return query
+
+
+def _record_from_row(row: tuple) -> MMHRecord:
+    """Rebuild a record from a SELECT * row"""
+    return MMHRecord(
+        mmh_id=row[0],
+        timestamp=row[1],
+        record_type=row[2],
+        domain=row[3],
+        content_hash=row[4],
+        content_data=_unpack_column(row[5]),
+        content_size=row[6],
+        signature=row[7],
+        verification_hash=row[8],
+        chain_hash=row[9],
+        tags=_unpack_column(row[10]),
+        description=row[11],
+        author=row[12],
+        version=row[13],
+        test_name=row[14],
+        reproducibility_score=row[15]
+    )._intern_categoricals()
+
+
+_UNLOADED = object()
+
+
+class _LazyContentRecord(MMHRecord):
+    """
+    MMHRecord whose content_data is read from the database on first access
+    
+    Compares equal to the fully loaded record and pickles as a plain
+    MMHRecord, so it can stand in wherever search results are used.
+    """
+    
+    __slots__ = ("_fetch_content", "_content")
+    
+    def __init__(self, fetch_content: Callable[[str], Dict[str, Any]], row: tuple):
+        self._fetch_content = fetch_content
+        super().__init__(
+            mmh_id=row[0], timestamp=row[1], record_type=row[2], domain=row[3],
+            content_hash=row[4], content_data=_UNLOADED, content_size=row[6],
+            signature=row[7], verification_hash=row[8], chain_hash=row[9],
+            tags=_unpack_column(row[10]), description=row[11], author=row[12],
+            version=row[13], test_name=row[14], reproducibility_score=row[15]
+        )
+        self._intern_categoricals()
+    
+    @property
+    def content_data(self) -> Dict[str, Any]:
+        if self._content is _UNLOADED:
+            self._content = self._fetch_content(self.mmh_id)
+        return self._content
+    
+    @content_data.setter
+    def content_data(self, value: Dict[str, Any]):
+        self._content = value
+    
+    def __eq__(self, other):
+        if isinstance(other, MMHRecord):
+            return self.to_tuple() == other.to_tuple()
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __reduce__(self):
+        return (MMHRecord.from_tuple, (self.to_tuple(),))
+
+
+def _record_row(record: MMHRecord) -> tuple:
+    """Parameter tuple for INSERT_RECORD_SQL"""
+    return (
+        record.mmh_id,
+        record.timestamp,
+        record.record_type,
+        record.domain,
+        record.content_hash,
+        _pack_column(record.content_data),
+        record.content_size,
+        record.signature,
+        record.verification_hash,
+        record.chain_hash,
+        _pack_column(record.tags),
+        record.description,
+        record.author,
+        record.version,
+        record.test_name,
+        record.reproducibility_score
+    )
+
+
+def _dumps_json(obj: Any) -> bytes:
+    """
+    Compact JSON encoding straight to bytes
+    
+    Stays on the stdlib encoder: record content must round-trip exactly as
+    content hashing sees it, and orjson writes NaN/Infinity as null and
+    rejects non-string keys and integers beyond 64 bits.
+    """
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _loads_json(data) -> Any:
+    """Decode JSON from a TEXT or BLOB column value"""
+    # orjson reads integers beyond 64 bits as floats; any such literal has
+    # at least 19 digits, so only those values pay for the stdlib parser
+    long_digits = _LONG_DIGITS_TEXT if isinstance(data, str) else _LONG_DIGITS
+    if ORJSON_AVAILABLE and not long_digits.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity literals are stdlib-only
+            pass
+    return json.loads(data)
+
+
+def _file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a file, streamed"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, "file_digest"):
+            # Python 3.11+: reuses one buffer and releases the GIL while hashing
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        hasher = hashlib.sha256()
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+        return hasher.hexdigest()
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Hard-link source to target when possible, else copy; replaces target"""
+    if target.exists() and os.path.samefile(source, target):
+        # Already the same inode; rename() over it would be a no-op
+        return
+    tmp_target = target.with_name(target.name + ".tmp")
+    tmp_target.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp_target)
+    except OSError:
+        shutil.copy2(source, tmp_target)
+    os.replace(tmp_target, target)
+
+
+def _hash_files(root: Path, relative_paths: List[str]) -> Dict[str, str]:
+    """SHA-256 of files under root, hashed concurrently"""
+    if not relative_paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(relative_paths), BACKUP_WORKERS)) as pool:
+        digests = pool.map(_file_sha256, (root / name for name in relative_paths))
+        return dict(zip(relative_paths, digests))
+
+
+def _pack_column(obj: Any) -> bytes:
+    """Encode a content_data/tags column value: msgpack, or JSON without it"""
+    if MSGPACK_AVAILABLE:
+        try:
+            return msgpack.packb(obj, use_bin_type=True)
+        except OverflowError:
+            # Integers beyond 64 bits only fit the JSON encoding
+            pass
+    return _dumps_json(obj)
+
+
+def _is_json_column(value) -> bool:
+    """True for JSON column values: TEXT rows or JSON-encoded BLOBs"""
+    # A msgpack map or array never starts with "{" or "[" (0x7b/0x5b are
+    # positive fixints), while compact JSON objects and arrays always do
+    return isinstance(value, str) or value[:1] in (b"{", b"[")
+
+
+def _unpack_column(value) -> Any:
+    """Decode a content_data/tags column value written by any version"""
+    if _is_json_column(value):
+        return _loads_json(value)
+    if not MSGPACK_AVAILABLE:
+        raise ValueError("msgpack-encoded MMH column requires the msgpack package")
+    return msgpack.unpackb(value, raw=False, strict_map_key=False)
+
+
+def _encode_backup(record_data: Dict[str, Any], dict_data=None) -> bytes:
+    """Serialize and compress a backup payload, with an optional trained zstd dictionary"""
+    if MSGPACK_AVAILABLE and ZSTD_AVAILABLE:
+        try:
+            packed = msgpack.packb(record_data, use_bin_type=True)
+        except OverflowError:
+            # Integers beyond 64 bits: fall back to the JSON encoding
+            packed = None
+        if packed is not None:
+            compressor = zstd.ZstdCompressor(level=BACKUP_ZSTD_LEVEL, dict_data=dict_data)
+            return compressor.compress(packed)
+    encoded = _dumps_json(record_data)
+    return gzip.compress(encoded, compresslevel=BACKUP_GZIP_LEVEL)
+
+
+def _decode_backup(data: bytes, dict_data=None) -> Dict[str, Any]:
+    """Decode a zstd+msgpack or legacy gzip+JSON backup payload"""
+    if data.startswith(ZSTD_MAGIC):
+        if not (MSGPACK_AVAILABLE and ZSTD_AVAILABLE):
+            raise ValueError("zstd+msgpack backup requires the zstandard and msgpack packages")
+        dict_id = zstd.get_frame_parameters(data).dict_id
+        if not dict_id:
+            dict_data = None
+        elif dict_data is None or dict_data.dict_id() != dict_id:
+            raise ValueError(f"Backup was compressed with unknown zstd dictionary {dict_id}")
+        decompressor = zstd.ZstdDecompressor(dict_data=dict_data)
+        return msgpack.unpackb(decompressor.decompress(data), raw=False, strict_map_key=False)
+    return _loads_json(gzip.decompress(data))
 
 
 class MMHDatabase:
     """
     SQLite database for MMH record storage and querying
+    
+    One WAL-mode connection is held per instance and shared across threads;
+    a lock serializes access to it and writes run in explicit transactions.
     """
     
     def __init__(self, db_path: str = "mmh_storage/mmh.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
+        self._lock = threading.RLock()
+        self._record_cache = OrderedDict()
+        self._conn = self._connect()
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared connection and apply the storage PRAGMAs"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Write transaction on the shared connection"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn.cursor()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def close(self):
+        """Close the shared connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def backup_to(self, target_path: Path):
+        """Consistent online copy of the database via the SQLite backup API"""
+        target = sqlite3.connect(target_path)
+        try:
+            with self._lock:
+                self._conn.backup(target, pages=BACKUP_PAGES_PER_STEP)
+        finally:
+            target.close()
+    
+    def restore_from(self, source_path: Path):
+        """Replace the database contents with a copy made by backup_to"""
+        source = sqlite3.connect(source_path)
+        try:
+            with self._lock:
+                try:
+                    source.backup(self._conn, pages=BACKUP_PAGES_PER_STEP)
+                except sqlite3.OperationalError:
+                    # A WAL database cannot take on a different page size;
+                    # swap the file itself instead
+                    self.close()
+                    try:
+                        for suffix in ("-wal", "-shm"):
+                            Path(f"{self.db_path}{suffix}").unlink(missing_ok=True)
+                        shutil.copy2(source_path, self.db_path)
+                    finally:
+                        self._conn = self._connect()
+                # Older backups may predate the current schema
+                self._init_database()
+                self._record_cache.clear()
+        finally:
+            source.close()
+    
+    def migrate_json_columns(self) -> int:
+        """
+        Rewrite JSON-encoded content_data/tags values as msgpack
+        
+        Rows from older versions decode either way; this only reclaims
+        their space and parse cost. A no-op without msgpack.
+        
+        Returns:
+            Number of rows rewritten
+        """
+        if not MSGPACK_AVAILABLE:
+            return 0
+        
+        with self._transaction() as cursor:
+            cursor.execute("SELECT mmh_id, content_data, tags FROM mmh_records")
+            rows = [
+                (_pack_column(_unpack_column(content_data)), _pack_column(_unpack_column(tags)), mmh_id)
+                for mmh_id, content_data, tags in cursor.fetchall()
+                if _is_json_column(content_data) or _is_json_column(tags)
+            ]
+            cursor.executemany(
+                "UPDATE mmh_records SET content_data = ?, tags = ? WHERE mmh_id = ?", rows
+            )
+        return len(rows)
+    
     def _init_database(self):
         """Initialize MMH database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
+        with self._transaction() as cursor:
             # Create records table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS mmh_records (
@@ -41,18 +464,19 @@ class MMHDatabase:
                     record_type TEXT NOT NULL,
                     domain TEXT NOT NULL,
                     content_hash TEXT NOT NULL,
-                    content_data TEXT NOT NULL,
+                    content_data BLOB NOT NULL,
                     content_size INTEGER NOT NULL,
                     signature TEXT NOT NULL,
                     verification_hash TEXT NOT NULL,
                     chain_hash TEXT NOT NULL,
-                    tags TEXT NOT NULL,
+                    tags BLOB NOT NULL,
                     description TEXT NOT NULL,
                     author TEXT NOT NULL,
                     version TEXT NOT NULL,
                     test_name TEXT,
                     reproducibility_score REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    backup_size INTEGER
                 )
             """)
             
@@ -77,175 +501,161 @@ class MMHDatabase:
                 ON mmh_records(timestamp)
             """)
             
-            conn.commit()
-    
-    def store_record(self, record: MMHRecord):
-        """Store MMH record in database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+            # Composite index for combined search_records filters
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_domain_type_author_ts
+                ON mmh_records(domain, record_type, author, timestamp DESC)
+            """)
+            
+            # Normalized tags so tag searches are index lookups
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS mmh_tags (
+                    mmh_id TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    PRIMARY KEY (mmh_id, tag)
+                )
+            """)
             
             cursor.execute("""
-                INSERT OR REPLACE INTO mmh_records (
-                    mmh_id, timestamp, record_type, domain, content_hash,
-                    content_data, content_size, signature, verification_hash,
-                    chain_hash, tags, description, author, version,
-                    test_name, reproducibility_score
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                record.mmh_id,
-                record.timestamp,
-                record.record_type,
-                record.domain,
-                record.content_hash,
-                json.dumps(record.content_data),
-                record.content_size,
-                record.signature,
-                record.verification_hash,
-                record.chain_hash,
-                json.dumps(record.tags),
-                record.description,
-                record.author,
-                record.version,
-                record.test_name,
-                record.reproducibility_score
-            ))
+                CREATE INDEX IF NOT EXISTS idx_tags_tag 
+                ON mmh_tags(tag)
+            """)
+            
+            cursor.execute("PRAGMA user_version")
+            schema_version = cursor.fetchone()[0]
+            
+            # Databases created before mmh_tags existed: fill it from the JSON column
+            if schema_version < 1:
+                cursor.execute("SELECT mmh_id, tags FROM mmh_records")
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO mmh_tags (mmh_id, tag) VALUES (?, ?)",
+                    [(mmh_id, tag) for mmh_id, tags in cursor.fetchall() for tag in _unpack_column(tags)]
+                )
             
-            conn.commit()
+            # NULL backup_size means "no backup recorded"; MMHStorage backfills it
+            if schema_version < 2:
+                columns = {row[1] for row in cursor.execute("PRAGMA table_info(mmh_records)")}
+                if "backup_size" not in columns:
+                    cursor.execute("ALTER TABLE mmh_records ADD COLUMN backup_size INTEGER")
+            
+            if schema_version < SCHEMA_VERSION:
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def store_record(self, record: MMHRecord):
+        """Store MMH record in database"""
+        self.store_records([record])
+    
+    def store_records(self, records: List[MMHRecord]):
+        """Store many MMH records in a single transaction"""
+        rows = [_record_row(record) for record in records]
+        tag_rows = [(record.mmh_id, tag) for record in records for tag in record.tags]
+        with self._transaction() as cursor:
+            for row in rows:
+                self._record_cache.pop(row[0], None)
+            cursor.executemany(INSERT_RECORD_SQL, rows)
+            cursor.executemany("DELETE FROM mmh_tags WHERE mmh_id = ?", [(row[0],) for row in rows])
+            cursor.executemany("INSERT OR IGNORE INTO mmh_tags (mmh_id, tag) VALUES (?, ?)", tag_rows)
+    
+    def set_backup_sizes(self, sizes: List[tuple]):
+        """Record the file backup size of each (mmh_id, size_bytes) pair"""
+        with self._transaction() as cursor:
+            cursor.executemany(
+                "UPDATE mmh_records SET backup_size = ? WHERE mmh_id = ?",
+                [(size, mmh_id) for mmh_id, size in sizes]
+            )
+    
+    def records_without_backup_size(self) -> List[str]:
+        """IDs of records with no backup size recorded"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT mmh_id FROM mmh_records WHERE backup_size IS NULL")
+            return [row[0] for row in cursor.fetchall()]
     
     def get_record(self, mmh_id: str) -> Optional[MMHRecord]:
-        """Retrieve MMH record from database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        """
+        Retrieve MMH record from database
+        
+        Decoded records are kept in a bounded LRU cache that store_records
+        invalidates; each call returns a deep copy, so callers never share
+        content_data or tags with the cache.
+        """
+        with self._lock:
+            record = self._record_cache.get(mmh_id)
+            if record is not None:
+                self._record_cache.move_to_end(mmh_id)
+                return copy.deepcopy(record)
             
-            cursor.execute("""
-                SELECT * FROM mmh_records WHERE mmh_id = ?
-            """, (mmh_id,))
+            cursor = self._conn.cursor()
+            
+            cursor.execute(GET_RECORD_SQL, (mmh_id,))
             
             row = cursor.fetchone()
             if not row:
                 return None
             
-            # Reconstruct MMHRecord from database row
-            record_dict = {
-                "mmh_id": row[0],
-                "timestamp": row[1],
-                "record_type": row[2],
-                "domain": row[3],
-                "content_hash": row[4],
-                "content_data": json.loads(row[5]),
-                "content_size": row[6],
-                "signature": row[7],
-                "verification_hash": row[8],
-                "chain_hash": row[9],
-                "tags": json.loads(row[10]),
-                "description": row[11],
-                "author": row[12],
-                "version": row[13],
-                "test_name": row[14],
-                "reproducibility_score": row[15]
-            }
-            
-            return MMHRecord.from_dict(record_dict)
+            record = _record_from_row(row)
+            self._record_cache[mmh_id] = record
+            if len(self._record_cache) > RECORD_CACHE_SIZE:
+                self._record_cache.popitem(last=False)
+            return copy.deepcopy(record)
     
     def search_records(self, 
                       tags: Optional[List[str]] = None,
                       domain: Optional[str] = None,
                       record_type: Optional[str] = None,
                       author: Optional[str] = None,
-                      limit: Optional[int] = None) -> List[MMHRecord]:
-        """Search MMH records with database queries"""
-        query = "SELECT * FROM mmh_records WHERE 1=1"
-        params = []
-        
-        if domain:
-            query += " AND domain = ?"
-            params.append(domain)
-        
-        if record_type:
-            query += " AND record_type = ?"
-            params.append(record_type)
+                      limit: Optional[int] = None,
+                      eager: bool = True) -> List[MMHRecord]:
+        """
+        Search MMH records with database queries
         
-        if author:
-            query += " AND author = ?"
-            params.append(author)
+        With eager=False, content_data is left in the database and each
+        record fetches its own on first access, which needs the database
+        to still be open.
+        """
+        query = _search_sql(len(tags) if tags else 0, bool(domain), bool(record_type),
+                            bool(author), bool(limit), eager)
+        params = [*(tags or ()), *(v for v in (domain, record_type, author, limit) if v)]
         
-        query += " ORDER BY timestamp DESC"
-        
-        if limit:
-            query += f" LIMIT {limit}"
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute(query, params)
             
-            records = []
-            for row in cursor.fetchall():
-                record_dict = {
-                    "mmh_id": row[0],
-                    "timestamp": row[1],
-                    "record_type": row[2],
-                    "domain": row[3],
-                    "content_hash": row[4],
-                    "content_data": json.loads(row[5]),
-                    "content_size": row[6],
-                    "signature": row[7],
-                    "verification_hash": row[8],
-                    "chain_hash": row[9],
-                    "tags": json.loads(row[10]),
-                    "description": row[11],
-                    "author": row[12],
-                    "version": row[13],
-                    "test_name": row[14],
-                    "reproducibility_score": row[15]
-                }
-                
-                record = MMHRecord.from_dict(record_dict)
-                
-                # Apply tag filtering if specified
-                if tags:
-                    if not any(tag in record.tags for tag in tags):
-                        continue
-                
-                records.append(record)
-            
-            return records
+            rows = cursor.fetchall()
+        
+        if eager:
+            return [_record_from_row(row) for row in rows]
+        return [_LazyContentRecord(self._fetch_content, row) for row in rows]
+    
+    def _fetch_content(self, mmh_id: str) -> Dict[str, Any]:
+        """Decoded content_data of one stored record"""
+        with self._lock:
+            row = self._conn.execute(GET_CONTENT_SQL, (mmh_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"MMH record {mmh_id} is no longer stored")
+        return _unpack_column(row[0])
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get MMH database statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._lock:
+            groups = self._conn.execute(STATISTICS_SQL).fetchall()
             
-            # Total records
-            cursor.execute("SELECT COUNT(*) FROM mmh_records")
-            total_records = cursor.fetchone()[0]
+            # Fold the per-(type, domain) groups from the single table scan
+            total_records = total_size = score_count = backup_files = backup_size = 0
+            score_sum = 0.0
+            records_by_type = {}
+            records_by_domain = {}
+            for (record_type, domain, count, size, group_score_sum, group_score_count,
+                 group_backup_size, group_backup_count) in groups:
+                total_records += count
+                total_size += size or 0
+                score_sum += group_score_sum or 0.0
+                score_count += group_score_count
+                backup_size += group_backup_size or 0
+                backup_files += group_backup_count
+                records_by_type[record_type] = records_by_type.get(record_type, 0) + count
+                records_by_domain[domain] = records_by_domain.get(domain, 0) + count
             
-            # Records by type
-            cursor.execute("""
-                SELECT record_type, COUNT(*) 
-                FROM mmh_records 
-                GROUP BY record_type
-            """)
-            records_by_type = dict(cursor.fetchall())
-            
-            # Records by domain
-            cursor.execute("""
-                SELECT domain, COUNT(*) 
-                FROM mmh_records 
-                GROUP BY domain
-            """)
-            records_by_domain = dict(cursor.fetchall())
-            
-            # Total storage size
-            cursor.execute("SELECT SUM(content_size) FROM mmh_records")
-            total_size = cursor.fetchone()[0] or 0
-            
-            # Average reproducibility score
-            cursor.execute("""
-                SELECT AVG(reproducibility_score) 
-                FROM mmh_records 
-                WHERE reproducibility_score IS NOT NULL
-            """)
-            avg_reproducibility = cursor.fetchone()[0] or 0.0
+            avg_reproducibility = score_sum / score_count if score_count else 0.0
             
             return {
                 "total_records": total_records,
@@ -253,7 +663,9 @@ class MMHDatabase:
                 "records_by_domain": records_by_domain,
                 "total_size_bytes": total_size,
                 "total_size_mb": total_size / (1024 * 1024),
-                "average_reproducibility_score": avg_reproducibility
+                "average_reproducibility_score": avg_reproducibility,
+                "backup_files": backup_files,
+                "backup_size_bytes": backup_size
             }
 
 
@@ -270,6 +682,13 @@ class MMHStorage:
         self.database = MMHDatabase(self.storage_path / "mmh.db")
         self.backup_path = self.storage_path / "backups"
         self.backup_path.mkdir(exist_ok=True)
+        self.backup_dict_path = self.storage_path / BACKUP_DICT_FILE
+        self._backup_dict = self._load_backup_dict()
+        self._backfill_backup_sizes()
+    
+    def close(self):
+        """Close the database connection"""
+        self.database.close()
     
     def store_record(self, record: MMHRecord):
         """Store MMH record in both database and file backup"""
@@ -277,21 +696,116 @@ class MMHStorage:
         self.database.store_record(record)
         
         # Create file backup
-        self._create_file_backup(record)
+        size = self._create_file_backup(record)
+        self.database.set_backup_sizes([(record.mmh_id, size)])
+    
+    def store_records(self, records: List[MMHRecord]):
+        """Store many MMH records: one database transaction, backups in parallel"""
+        records = list(records)
+        self.database.store_records(records)
+        
+        if len(records) < 2:
+            sizes = [self._create_file_backup(record) for record in records]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(records), BACKUP_WORKERS)) as pool:
+                # list() re-raises the first backup failure
+                sizes = list(pool.map(self._create_file_backup, records))
+        self.database.set_backup_sizes([(record.mmh_id, size) for record, size in zip(records, sizes)])
     
-    def _create_file_backup(self, record: MMHRecord):
-        """Create compressed file backup of MMH record"""
+    def _load_backup_dict(self):
+        """Load the trained backup dictionary, if there is one"""
+        if not (ZSTD_AVAILABLE and self.backup_dict_path.exists()):
+            return None
+        dict_data = zstd.ZstdCompressionDict(self.backup_dict_path.read_bytes())
+        dict_data.precompute_compress(level=BACKUP_ZSTD_LEVEL)
+        return dict_data
+    
+    def train_backup_dictionary(self, max_samples: int = BACKUP_DICT_MAX_SAMPLES) -> Optional[int]:
+        """
+        Train a zstd dictionary on the existing file backups
+        
+        The dictionary is trained once and then kept: every later backup is
+        compressed with it, and dictionary-compressed backups need that same
+        dictionary to be read back.
+        
+        Args:
+            max_samples: Maximum number of backups to sample
+            
+        Returns:
+            The dictionary ID, or None if zstandard/msgpack are unavailable
+            or there are too few backups to train on
+        """
+        if self._backup_dict is not None:
+            return self._backup_dict.dict_id()
+        if not (MSGPACK_AVAILABLE and ZSTD_AVAILABLE):
+            return None
+        
+        samples = []
+        for backup_file in self.backup_path.glob("*.mmh"):
+            if len(samples) >= max_samples:
+                break
+            try:
+                record_data = _decode_backup(backup_file.read_bytes())
+                samples.append(msgpack.packb(record_data, use_bin_type=True))
+            except (ValueError, OSError, OverflowError):
+                continue
+        if len(samples) < BACKUP_DICT_MIN_SAMPLES:
+            return None
+        
+        try:
+            dict_data = zstd.train_dictionary(BACKUP_DICT_SIZE, samples)
+        except zstd.ZstdError:
+            return None
+        tmp_file = self.backup_dict_path.with_name(self.backup_dict_path.name + ".tmp")
+        tmp_file.write_bytes(dict_data.as_bytes())
+        os.replace(tmp_file, self.backup_dict_path)
+        self._backup_dict = self._load_backup_dict()
+        return self._backup_dict.dict_id()
+    
+    def _backfill_backup_sizes(self):
+        """Record sizes of existing backup files the database has no size for"""
+        sizes = []
+        for mmh_id in self.database.records_without_backup_size():
+            backup_file = self.backup_path / f"{mmh_id}.mmh"
+            if backup_file.exists():
+                sizes.append((mmh_id, backup_file.stat().st_size))
+        if sizes:
+            self.database.set_backup_sizes(sizes)
+    
+    def _create_file_backup(self, record: MMHRecord) -> int:
+        """Create compressed file backup of MMH record, returning its size in bytes"""
         backup_file = self.backup_path / f"{record.mmh_id}.mmh"
         
         # Compress record data
         record_data = {
             "record": record.to_dict(),
             "backup_timestamp": datetime.utcnow().isoformat(),
-            "backup_version": "1.0.0"
+            "backup_version": BACKUP_VERSION
         }
         
-        with gzip.open(backup_file, 'wt', encoding='utf-8') as f:
-            json.dump(record_data, f, indent=2)
+        # Write-then-rename: never rewrite a file in place, since snapshots
+        # made by create_backup may hard-link it
+        tmp_file = backup_file.with_name(backup_file.name + ".tmp")
+        payload = _encode_backup(record_data, self._backup_dict)
+        tmp_file.write_bytes(payload)
+        os.replace(tmp_file, backup_file)
+        return len(payload)
+    
+    def load_file_backup(self, mmh_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a per-record backup file
+        
+        Args:
+            mmh_id: MMH record ID
+            
+        Returns:
+            Backup payload with "record", "backup_timestamp" and
+            "backup_version", or None if there is no backup
+        """
+        backup_file = self.backup_path / f"{mmh_id}.mmh"
+        if not backup_file.exists():
+            return None
+        return _decode_backup(backup_file.read_bytes(), self._backup_dict)
     
     def get_record(self, mmh_id: str) -> Optional[MMHRecord]:
         """Retrieve MMH record from database"""
@@ -305,10 +819,8 @@ class MMHStorage:
         """Get storage statistics"""
         db_stats = self.database.get_statistics()
         
-        # Add file backup statistics
-        backup_files = list(self.backup_path.glob("*.mmh"))
-        db_stats["backup_files"] = len(backup_files)
-        db_stats["backup_size_mb"] = sum(f.stat().st_size for f in backup_files) / (1024 * 1024)
+        # Backup sizes are tracked per record, so no file is stat()ed here
+        db_stats["backup_size_mb"] = db_stats["backup_size_bytes"] / (1024 * 1024)
         
         return db_stats
     
@@ -320,27 +832,39 @@ class MMHStorage:
         backup_dir = self.backup_path / backup_name
         backup_dir.mkdir(exist_ok=True)
         
-        # Copy database
-        shutil.copy2(self.database.db_path, backup_dir / "mmh.db")
+        # Copy database through the online backup API
+        self.database.backup_to(backup_dir / "mmh.db")
         
-        # Copy all backup files
+        # Link (or copy) all backup files; they are only ever replaced, so
+        # shared inodes stay a faithful snapshot
         backup_files_dir = backup_dir / "backups"
         backup_files_dir.mkdir(exist_ok=True)
         
         for backup_file in self.backup_path.glob("*.mmh"):
-            shutil.copy2(backup_file, backup_files_dir / backup_file.name)
+            _link_or_copy(backup_file, backup_files_dir / backup_file.name)
+        
+        # The dictionary is needed to read dictionary-compressed backups
+        copied = ["mmh.db"]
+        if self.backup_dict_path.exists():
+            _link_or_copy(self.backup_dict_path, backup_dir / BACKUP_DICT_FILE)
+            copied.append(BACKUP_DICT_FILE)
         
         # Create backup manifest
+        copied += [f"backups/{f.name}" for f in backup_files_dir.glob("*.mmh")]
         manifest = {
             "backup_name": backup_name,
             "backup_timestamp": datetime.utcnow().isoformat(),
             "database_path": str(self.database.db_path),
             "backup_files_count": len(list(self.backup_path.glob("*.mmh"))),
-            "statistics": self.get_statistics()
+            "statistics": self.get_statistics(),
+            "file_sha256": _hash_files(backup_dir, copied)
         }
         
-        with open(backup_dir / "manifest.json", 'w') as f:
-            json.dump(manifest, f, indent=2)
+        if ORJSON_AVAILABLE:
+            (backup_dir / "manifest.json").write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        else:
+            with open(backup_dir / "manifest.json", 'w') as f:
+                json.dump(manifest, f, indent=2)
         
         return str(backup_dir)
     
@@ -351,19 +875,46 @@ class MMHStorage:
         if not backup_dir.exists():
             return False
         
+        if not self._verify_backup_files(backup_dir):
+            return False
+        
         # Restore database
         backup_db = backup_dir / "mmh.db"
         if backup_db.exists():
-            shutil.copy2(backup_db, self.database.db_path)
+            self.database.restore_from(backup_db)
+        
+        # Restore the dictionary before the backups that depend on it
+        backup_dict = backup_dir / BACKUP_DICT_FILE
+        if backup_dict.exists():
+            _link_or_copy(backup_dict, self.backup_dict_path)
+            self._backup_dict = self._load_backup_dict()
         
         # Restore backup files
         backup_files_dir = backup_dir / "backups"
         if backup_files_dir.exists():
             for backup_file in backup_files_dir.glob("*.mmh"):
-                shutil.copy2(backup_file, self.backup_path / backup_file.name)
+                _link_or_copy(backup_file, self.backup_path / backup_file.name)
+        
+        # Snapshots taken before backup_size existed
+        self._backfill_backup_sizes()
         
         return True
     
+    def _verify_backup_files(self, backup_dir: Path) -> bool:
+        """Check backup files against the manifest hashes, if it has any"""
+        manifest_file = backup_dir / "manifest.json"
+        if not manifest_file.exists():
+            return True
+        expected = _loads_json(manifest_file.read_bytes()).get("file_sha256")
+        if not expected:
+            return True
+        
+        present = [name for name in expected if (backup_dir / name).exists()]
+        if len(present) != len(expected):
+            return False
+        actual = _hash_files(backup_dir, present)
+        return all(hmac.compare_digest(actual[name], digest) for name, digest in expected.items())
+    
     def verify_storage_integrity(self) -> Dict[str, Any]:
         """Verify integrity of stored MMH records"""
         integrity_report = {
@@ -375,9 +926,8 @@ class MMHStorage:
         }
         
         # Check database records
-        with sqlite3.connect(self.database.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT mmh_id FROM mmh_records")
+        with self.database._lock:
+            cursor = self.database._conn.execute("SELECT mmh_id FROM mmh_records")
             db_records = {row[0] for row in cursor.fetchall()}
             integrity_report["database_records"] = len(db_records)
         
@@ -393,14 +943,36 @@ class MMHStorage:
             integrity_report["integrity_verified"] = False
         
         # Check for corrupted records
-        for mmh_id in db_records:
-            record = self.get_record(mmh_id)
-            if record and not self._verify_record_integrity(record):
-                integrity_report["corrupted_records"].append(mmh_id)
-                integrity_report["integrity_verified"] = False
+        corrupted = self._find_corrupted_records()
+        if corrupted:
+            integrity_report["corrupted_records"] = corrupted
+            integrity_report["integrity_verified"] = False
         
         return integrity_report
     
+    def _find_corrupted_records(self) -> List[str]:
+        """Content-hash check of every stored row, chunked across processes"""
+        corrupted = []
+        with self.database._lock:
+            cursor = self.database._conn.execute(
+                "SELECT mmh_id, content_data, content_hash, version FROM mmh_records"
+            )
+            first = cursor.fetchmany(INTEGRITY_CHUNK_SIZE)
+            if len(first) < INTEGRITY_CHUNK_SIZE or BACKUP_WORKERS == 1:
+                corrupted.extend(_corrupted_in_chunk(first))
+                for rows in iter(lambda: cursor.fetchmany(INTEGRITY_CHUNK_SIZE), []):
+                    corrupted.extend(_corrupted_in_chunk(rows))
+                return corrupted
+            
+            with ProcessPoolExecutor(max_workers=BACKUP_WORKERS) as pool:
+                futures = [pool.submit(_corrupted_in_chunk, first)]
+                for rows in iter(lambda: cursor.fetchmany(INTEGRITY_CHUNK_SIZE), []):
+                    futures.append(pool.submit(_corrupted_in_chunk, rows))
+        
+        for future in futures:
+            corrupted.extend(future.result())
+        return corrupted
+    
     def _verify_record_integrity(self, record: MMHRecord) -> bool:
         """Verify individual record integrity"""
         try:
@@ -409,12 +981,22 @@ class MMHStorage:
                 return False
             
             # Check content hash
-            import gzip
-            content_str = json.dumps(record.content_data, sort_keys=True)
-            compressed_content = gzip.compress(content_str.encode())
-            expected_hash = hashlib.sha256(compressed_content).hexdigest()
-            
-            return record.content_hash == expected_hash
+            return content_hash_matches(record.content_hash, record.content_data, record.version)
             
         except Exception:
-            return False 
\ No newline at end of file
+            return False 
+
+
+def _corrupted_in_chunk(rows: List[tuple]) -> List[str]:
+    """IDs of (mmh_id, content_data, content_hash, version) rows whose content hash fails"""
+    corrupted = []
+    for mmh_id, content_data, content_hash, version in rows:
+        try:
+            intact = bool(mmh_id and content_hash) and content_hash_matches(
+                content_hash, _unpack_column(content_data), version
+            )
+        except Exception:
+            intact = False
+        if not intact:
+            corrupted.append(mmh_id)
+    return corrupted
@@ -13,7 +13,7 @@ Core Components:
 """
 
 # Core Omega Kill Switch components
-from .safeSim import run_agent, EXIT_OK, EXIT_VIOLATION, EXIT_TIMEOUT, EXIT_INTERNAL
+from .safeSim import run_agent, run_agents, EXIT_OK, EXIT_VIOLATION, EXIT_TIMEOUT, EXIT_INTERNAL
 from .agent_security_testing import AgentSecurityTester, SecurityMonitor, security_monitor
 from .metrics_pipe import parse_metrics, ensure_db, insert_db, append_csv
 
@@ -26,6 +26,7 @@ __description__ = "Omega Kill Switch for AGI Systems"
 __all__ = [
     # Core execution
     "run_agent",
+    "run_agents",
     "EXIT_OK", 
     "EXIT_VIOLATION", 
     "EXIT_TIMEOUT", 
@@ -17,6 +17,7 @@ Version: 28.0 Comprehensive Test Suite
 
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.fft import rfft
 import json
 import os
 import time
@@ -25,6 +26,22 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Optional JIT kernel for the blind-injection band powers
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional SIMD-parallel hash for the reproducibility checksums
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+CHECKSUM_ALGORITHM = "blake3" if BLAKE3_AVAILABLE else "sha256"
+
 # ======================================================================
 # 1. PIPELINE END-TO-END MOCK DATA CHALLENGE
 # ======================================================================
@@ -32,33 +49,35 @@ warnings.filterwarnings('ignore')
 class PipelineEndToEndTest:
     """End-to-end pipeline test with injected signals"""
     
-    def __init__(self):
+    def __init__(self, seed=None):
         self.test_results = {}
         self.snr_threshold = 5.0
+        self._rng = np.random.default_rng(seed)
         
-    def generate_realistic_noise(self, data_type, duration=3600, fs=4096):
-        """Generate realistic noise for different data types"""
+    def noise_parameters(self, data_type, duration=3600, fs=4096):
+        """Noise level and sample count of the realistic noise for a data type"""
         
         if data_type == "ligo":
             # LIGO strain noise (realistic amplitude)
-            noise_level = 1e-21
-            t = np.linspace(0, duration, int(duration * fs / 100))
-            noise = np.random.normal(0, noise_level, len(t))
-            return t, noise
+            return 1e-21, int(duration * fs / 100)
             
         elif data_type == "lsst":
-            # LSST shear noise (realistic amplitude)
-            noise_level = 1e-3
-            n_galaxies = 10000
-            noise = np.random.normal(0, noise_level, n_galaxies)
-            return np.arange(n_galaxies), noise
+            # LSST shear noise (realistic amplitude), one sample per galaxy
+            return 1e-3, 10000
             
         elif data_type == "alma":
-            # ALMA filament velocity noise
-            noise_level = 1.0  # km/s
-            n_pixels = 1000
-            noise = np.random.normal(0, noise_level, n_pixels)
-            return np.arange(n_pixels), noise
+            # ALMA filament velocity noise (km/s), one sample per pixel
+            return 1.0, 1000
+    
+    def generate_realistic_noise(self, data_type, duration=3600, fs=4096):
+        """Generate realistic noise for different data types"""
+        
+        noise_level, n_samples = self.noise_parameters(data_type, duration, fs)
+        noise = self._rng.normal(0, noise_level, n_samples)
+        
+        if data_type == "ligo":
+            return np.linspace(0, duration, n_samples), noise
+        return np.arange(n_samples), noise
     
     def inject_rife_signal(self, time, noise, data_type, signal_amplitude):
         """Inject RIFE signal at predicted amplitude"""
@@ -93,15 +112,12 @@ class PipelineEndToEndTest:
         
         print(f"🧪 Testing {data_type.upper()} pipeline...")
         
-        # Generate realistic noise
-        time, noise = self.generate_realistic_noise(data_type)
-        
-        # Inject RIFE signal
-        data_with_signal = self.inject_rife_signal(time, noise, data_type, signal_amplitude)
+        # The SNR only needs the noise level, so no time series is built;
+        # generate_realistic_noise and inject_rife_signal give the full data
+        noise_level, _ = self.noise_parameters(data_type)
         
         # Calculate SNR
-        noise_level = np.std(noise)
-        snr = self.calculate_snr(data_with_signal, signal_amplitude, noise_level)
+        snr = self.calculate_snr(None, signal_amplitude, noise_level)
         
         # Add systematic effects
         systematic_error = systematic_level * snr
@@ -127,6 +143,43 @@ class PipelineEndToEndTest:
 # 2. BLIND INJECTION TEST
 # ======================================================================
 
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _band_power_kernel(band):
+        total = 0.0
+        for k in prange(band.shape[0]):
+            total += band[k].real**2 + band[k].imag**2
+        return total
+
+
+def _first_bin(df, f, strict):
+    """Smallest k with k * df > f (strict) or k * df >= f"""
+    k = max(int(f / df), 0)
+    while k > 0 and ((k - 1) * df > f if strict else (k - 1) * df >= f):
+        k -= 1
+    while (k * df <= f) if strict else (k * df < f):
+        k += 1
+    return k
+
+
+def _band_bins(n_bins, df, low, high):
+    """Slice of the bins strictly between low and high Hz, with bin k at k * df"""
+    # The bin frequencies are increasing, so each band is one contiguous run
+    # whose ends follow from df without building the frequency array
+    return slice(min(_first_bin(df, low, True), n_bins), min(_first_bin(df, high, False), n_bins))
+
+
+def _band_mean_power(spectrum, df, low, high):
+    """Mean power of the one-sided spectrum bins strictly between low and high Hz"""
+    band = spectrum[_band_bins(len(spectrum), df, low, high)]
+    if len(band) == 0:
+        return np.nan
+    if NUMBA_AVAILABLE:
+        # One fused pass, without a power array
+        return _band_power_kernel(band) / len(band)
+    return np.mean(band.real**2 + band.imag**2)
+
+
 class BlindInjectionTest:
     """Blind injection test for credibility"""
     
@@ -173,17 +226,15 @@ class BlindInjectionTest:
         data = dataset["data"]
         noise_level = dataset["noise_level"]
         
-        # Calculate power spectrum
-        fft = np.fft.fft(data)
-        power = np.abs(fft)**2
-        freqs = np.fft.fftfreq(len(data), dataset["time"][1] - dataset["time"][0])
+        # Calculate power spectrum; the data is real, so the one-sided
+        # transform holds every positive-frequency bin the bands use.
+        # Bin k is at k * df Hz, as rfftfreq gives it
+        spectrum = rfft(data, workers=-1)
+        df = 1.0 / (len(data) * (dataset["time"][1] - dataset["time"][0]))
         
         # Look for excess power in signal band (50-200 Hz)
-        signal_mask = (freqs > 50) & (freqs < 200)
-        background_mask = (freqs > 10) & (freqs < 40)
-        
-        signal_power = np.mean(power[signal_mask])
-        background_power = np.mean(power[background_mask])
+        signal_power = _band_mean_power(spectrum, df, 50, 200)
+        background_power = _band_mean_power(spectrum, df, 10, 40)
         
         # Calculate SNR
         snr = signal_power / background_power if background_power > 0 else 0
@@ -258,47 +309,58 @@ class BlindInjectionTest:
 class MonteCarloSimulation:
     """Monte Carlo simulations for robustness testing"""
     
-    def __init__(self, n_simulations=1000):
+    def __init__(self, n_simulations=1000, seed=None):
         self.n_simulations = n_simulations
-        self.results = []
-        
-    def run_single_simulation(self):
-        """Run single Monte Carlo simulation"""
-        
-        # Random parameters
-        signal_amplitude = np.random.uniform(1e-22, 1e-21)
-        noise_level = np.random.uniform(1e-22, 1e-20)
-        systematic_level = np.random.uniform(0.001, 0.1)
-        duration = np.random.uniform(1000, 3600)
-        
-        # Generate data
-        t = np.linspace(0, duration, int(duration * 4096 / 100))
-        noise = np.random.normal(0, noise_level, len(t))
-        
-        # Add signal
-        signal_freq = np.random.uniform(50, 200)
-        signal = signal_amplitude * np.sin(2 * np.pi * signal_freq * t)
-        data = noise + signal
-        
-        # Calculate SNR
-        snr = np.sqrt(signal_amplitude**2 / noise_level**2)
+        self.threshold = 5.0
+        # One array per result field, filled by run_monte_carlo
+        self.results = {}
+        self._rng = np.random.default_rng(seed)
+    
+    @property
+    def results_df(self):
+        """Monte Carlo results as a pandas DataFrame, one row per simulation"""
+        import pandas as pd
+        return pd.DataFrame(self.results)
+    
+    def _simulate(self, n):
+        """Draw n parameter sets and evaluate them as whole arrays
+        
+        The detection statistic is the analytical SNR, so no time series
+        is generated.
+        """
+        signal_amplitude = self._rng.uniform(1e-22, 1e-21, n)
+        noise_level = self._rng.uniform(1e-22, 1e-20, n)
+        systematic_level = self._rng.uniform(0.001, 0.1, n)
+        
+        # Calculate SNR (both levels are positive)
+        snr = signal_amplitude / noise_level
         
         # Add systematic effects
         systematic_error = systematic_level * snr
         total_snr = snr / (1 + systematic_error)
         
-        # Detection
-        threshold = 5.0
-        detected = total_snr > threshold
+        return {
+            "signal_amplitude": signal_amplitude,
+            "noise_level": noise_level,
+            "systematic_level": systematic_level,
+            "snr": snr,
+            "total_snr": total_snr,
+            "detected": total_snr > self.threshold
+        }
+    
+    def run_single_simulation(self):
+        """Run single Monte Carlo simulation"""
+        
+        batch = self._simulate(1)
         
         return {
-            "signal_amplitude": float(signal_amplitude),
-            "noise_level": float(noise_level),
-            "systematic_level": float(systematic_level),
-            "snr": float(snr),
-            "total_snr": float(total_snr),
-            "detected": bool(detected),
-            "threshold": float(threshold)
+            "signal_amplitude": float(batch["signal_amplitude"][0]),
+            "noise_level": float(batch["noise_level"][0]),
+            "systematic_level": float(batch["systematic_level"][0]),
+            "snr": float(batch["snr"][0]),
+            "total_snr": float(batch["total_snr"][0]),
+            "detected": bool(batch["detected"][0]),
+            "threshold": float(self.threshold)
         }
     
     def run_monte_carlo(self):
@@ -306,17 +368,14 @@ class MonteCarloSimulation:
         
         print(f"🎲 Running Monte Carlo simulation ({self.n_simulations} trials)...")
         
-        for i in range(self.n_simulations):
-            result = self.run_single_simulation()
-            self.results.append(result)
-            
-            if (i + 1) % 100 == 0:
-                print(f"   Completed {i + 1}/{self.n_simulations} simulations")
+        # All simulations at once
+        self.results = self._simulate(self.n_simulations)
+        print(f"   Completed {self.n_simulations}/{self.n_simulations} simulations")
         
         # Analyze results
-        snrs = [r["snr"] for r in self.results]
-        total_snrs = [r["total_snr"] for r in self.results]
-        detection_rate = np.mean([r["detected"] for r in self.results])
+        snrs = self.results["snr"]
+        total_snrs = self.results["total_snr"]
+        detection_rate = np.mean(self.results["detected"])
         
         return {
             "mean_snr": float(np.mean(snrs)),
@@ -425,6 +484,15 @@ class StressTestSystematic:
 # 5. REPRODUCIBILITY/VERSIONING TEST
 # ======================================================================
 
+def _data_checksum(data):
+    """Hex checksum of an array's bytes, hashed in place without a copy"""
+    buffer = memoryview(np.ascontiguousarray(data))
+    if BLAKE3_AVAILABLE:
+        return blake3.blake3(buffer).hexdigest()
+    # Not a security use; lets FIPS builds hash with their fast path
+    return hashlib.sha256(buffer, usedforsecurity=False).hexdigest()
+
+
 class ReproducibilityTest:
     """Test reproducibility and versioning"""
     
@@ -472,11 +540,12 @@ class ReproducibilityTest:
         snr = np.sqrt(signal_amplitude**2 / noise_level**2)
         
         # Calculate checksum for reproducibility
-        data_checksum = hashlib.md5(data.tobytes()).hexdigest()
+        data_checksum = _data_checksum(data)
         
         result = {
             "snr": snr,
             "data_checksum": data_checksum,
+            "checksum_algorithm": CHECKSUM_ALGORITHM,
             "data_length": len(data),
             "timestamp": datetime.now().isoformat()
         }
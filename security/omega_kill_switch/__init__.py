@@ -8,7 +8,7 @@ The Omega Kill Switch is based on formal mathematical axioms and provides
 bulletproof protection against agents that try to claim absolute truth.
 """
 
-from .safeSim import run_agent, EXIT_OK, EXIT_VIOLATION, EXIT_TIMEOUT, EXIT_INTERNAL
+from .safeSim import run_agent, run_agents, EXIT_OK, EXIT_VIOLATION, EXIT_TIMEOUT, EXIT_INTERNAL
 from .metrics_pipe import parse_metrics, ensure_db, insert_db, append_csv
 
 __version__ = "2.0"
@@ -16,6 +16,7 @@ __author__ = "Robert Long & Kai (Syntari Model)"
 
 __all__ = [
     "run_agent",
+    "run_agents",
     "EXIT_OK", 
     "EXIT_VIOLATION",
     "EXIT_TIMEOUT",
@@ -25,18 +25,31 @@ Exit codes:
 from __future__ import annotations
 
 import argparse
+import codecs
 import datetime as _dt
+import io
+import locale
 import os
+import re
+import select
+import selectors
 import signal
 import subprocess
 import sys
 import textwrap
 import time
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Dict, Iterable, List, Mapping, Sequence
 
 FORBIDDEN = {"Omega = True", "Omega = False"}
 
+# Agent output is scanned as raw bytes, one chunk at a time. The last
+# _FORBIDDEN_TAIL bytes of each chunk are carried into the next search so
+# a literal split across two reads is still found.
+_FORBIDDEN_RE = re.compile(b"|".join(re.escape(fb.encode()) for fb in sorted(FORBIDDEN)))
+_FORBIDDEN_TAIL = max(len(fb.encode()) for fb in FORBIDDEN) - 1
+READ_CHUNK = 65536
+
 EXIT_OK = 0
 EXIT_VIOLATION = 3
 EXIT_TIMEOUT = 4
@@ -62,6 +75,106 @@ def _emit_metric(name: str, value: str | int | float, unit: str | None = None) -
         print(f"METRIC {name}={value}")
 
 
+def _kill(proc: subprocess.Popen) -> None:
+    """Kill the agent and everything it spawned (its whole process group)."""
+    if os.name == "posix":
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        # CTRL_BREAK reaches the agent's console process group
+        try:
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+        except OSError:
+            pass
+        proc.kill()
+
+
+def _mirror(text: str) -> None:
+    """Mirror agent output to host STDOUT (with Unicode error handling)."""
+    try:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    except UnicodeEncodeError:
+        # Handle Unicode characters that can't be displayed on Windows console
+        # Replace problematic characters with safe alternatives
+        safe_text = text.encode('utf-8', errors='replace').decode('utf-8')
+        sys.stdout.write(safe_text)
+        sys.stdout.flush()
+
+
+class _OutputScanner:
+    """Scan one agent's output for Ω violations and mirror it to STDOUT.
+
+    With a prefix (several agents sharing STDOUT), only whole lines are
+    mirrored, each tagged with the prefix.
+    """
+
+    def __init__(self, prefix: str = "") -> None:
+        # Bytes are only decoded for the mirror; the incremental decoders
+        # keep multi-byte characters and CRLF pairs that straddle chunks intact
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace"),
+            translate=True,
+        )
+        self._tail = b""
+        self._prefix = prefix
+        self._partial = ""
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scan and mirror a chunk; True if it completes a forbidden literal."""
+        # Ω violation detection: one search per chunk
+        match = _FORBIDDEN_RE.search(self._tail + chunk)
+        if match:
+            # Mirror up to the end of the offending line, as before
+            line_end = chunk.find(b"\n", max(match.end() - len(self._tail), 0))
+            self._write(self._decoder.decode(chunk if line_end == -1 else chunk[:line_end + 1], final=True), True)
+            return True
+
+        self._write(self._decoder.decode(chunk), False)
+        self._tail = (self._tail + chunk)[-_FORBIDDEN_TAIL:]
+        return False
+
+    def close(self) -> None:
+        """Flush output held back at EOF."""
+        self._write(self._decoder.decode(b"", final=True), True)
+
+    def _write(self, text: str, final: bool) -> None:
+        if not self._prefix:
+            _mirror(text)
+            return
+        lines = (self._partial + text).split("\n")
+        self._partial = "" if final else lines.pop()
+        if final and lines[-1] == "":
+            lines.pop()
+        if lines:
+            _mirror("".join(f"{self._prefix}{line}\n" for line in lines))
+
+
+def _spawn(cmd: Sequence[str]) -> subprocess.Popen:
+    """Start an agent with STDOUT+STDERR on one pipe."""
+    # The agent leads a new process group so a kill also reaches any
+    # children it starts (e.g. a shell-wrapped agent)
+    if os.name == "posix":
+        group_options = {"start_new_session": True}
+    else:
+        group_options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+    return subprocess.Popen(
+        list(cmd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        **group_options,
+    )
+
+
+def _exit_code(proc: subprocess.Popen, violation: bool) -> int:
+    if violation:
+        return EXIT_VIOLATION
+    return EXIT_OK if proc.returncode == 0 else proc.returncode or EXIT_INTERNAL
+
+
 # ---------------------------------------------------------------------------
 # Core runner
 # ---------------------------------------------------------------------------
@@ -71,46 +184,40 @@ def run_agent(cmd: Sequence[str], timeout: float | None) -> int:
     _emit_metric("start_ts", int(start), "s_epoch")
 
     try:
-        proc = subprocess.Popen(
-            list(cmd),
-            text=True,
-            bufsize=1,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-        )
+        proc = _spawn(cmd)
     except Exception as e:  # pragma: no cover
         print(f"safeSim: failed to launch agent: {e}", file=sys.stderr)
         return EXIT_INTERNAL
 
+    scanner = _OutputScanner()
     violation = False
     try:
         while True:
             if timeout is not None and _now() - start > timeout:
                 print("safeSim: timeout reached — terminating agent", file=sys.stderr)
-                proc.kill()
+                _kill(proc)
                 return EXIT_TIMEOUT
 
-            line = proc.stdout.readline()
-            if line == "":
+            if os.name == "posix":
+                # Wait for output at most until the deadline, so a silent
+                # agent still times out; pipes are selectable on POSIX only
+                if timeout is not None:
+                    remaining = timeout - (_now() - start)
+                    ready, _, _ = select.select([proc.stdout], [], [], max(remaining, 0))
+                    if not ready:
+                        continue
+                chunk = os.read(proc.stdout.fileno(), READ_CHUNK)
+            else:
+                chunk = proc.stdout.read1(READ_CHUNK)
+            if not chunk:
                 # EOF — agent exited
+                scanner.close()
                 break
 
-            # Mirror to host STDOUT (with Unicode error handling)
-            try:
-                sys.stdout.write(line)
-                sys.stdout.flush()
-            except UnicodeEncodeError:
-                # Handle Unicode characters that can't be displayed on Windows console
-                # Replace problematic characters with safe alternatives
-                safe_line = line.encode('utf-8', errors='replace').decode('utf-8')
-                sys.stdout.write(safe_line)
-                sys.stdout.flush()
-
-            # Ω violation detection
-            if any(fb in line for fb in FORBIDDEN):
+            if scanner.feed(chunk):
                 violation = True
                 print("safeSim: Omega-violation detected — nuking agent", file=sys.stderr)
-                proc.kill()
+                _kill(proc)
                 break
 
         proc.wait(timeout=1)
@@ -119,9 +226,78 @@ def run_agent(cmd: Sequence[str], timeout: float | None) -> int:
         _emit_metric("duration", round(end - start, 3), "s")
         _emit_metric("omega_violation", int(violation))
 
-    if violation:
-        return EXIT_VIOLATION
-    return EXIT_OK if proc.returncode == 0 else proc.returncode or EXIT_INTERNAL
+    return _exit_code(proc, violation)
+
+
+def run_agents(cmds: Mapping[str, Sequence[str]], timeout: float | None) -> Dict[str, int]:
+    """Run several agents at once under one shared timeout.
+
+    A single thread multiplexes every agent's output with a selector
+    (epoll/kqueue), applying the same Ω check and kill policy as
+    run_agent. Mirrored lines are prefixed with the agent id. Returns
+    each agent's exit code. Pipes are not selectable on Windows, where
+    the agents run one after another.
+    """
+    if os.name != "posix":
+        return {agent_id: run_agent(cmd, timeout) for agent_id, cmd in cmds.items()}
+
+    start = _now()
+    _emit_metric("start_ts", int(start), "s_epoch")
+
+    codes: Dict[str, int] = {}
+    violations = 0
+    running: Dict[str, subprocess.Popen] = {}
+    sel = selectors.DefaultSelector()
+    for agent_id, cmd in cmds.items():
+        try:
+            proc = _spawn(cmd)
+        except Exception as e:  # pragma: no cover
+            print(f"safeSim: failed to launch agent {agent_id}: {e}", file=sys.stderr)
+            codes[agent_id] = EXIT_INTERNAL
+            continue
+        running[agent_id] = proc
+        sel.register(proc.stdout, selectors.EVENT_READ, (agent_id, proc, _OutputScanner(f"[{agent_id}] ")))
+
+    def finish(key: selectors.SelectorKey, code: int | None) -> None:
+        agent_id, proc, _ = key.data
+        sel.unregister(key.fileobj)
+        proc.stdout.close()
+        proc.wait(timeout=1)
+        codes[agent_id] = _exit_code(proc, False) if code is None else code
+        del running[agent_id]
+
+    try:
+        while sel.get_map():
+            remaining = None if timeout is None else timeout - (_now() - start)
+            if remaining is not None and remaining <= 0:
+                for key in list(sel.get_map().values()):
+                    print(f"safeSim: timeout reached — terminating agent {key.data[0]}", file=sys.stderr)
+                    _kill(key.data[1])
+                    key.data[2].close()
+                    finish(key, EXIT_TIMEOUT)
+                break
+
+            for key, _ in sel.select(remaining):
+                agent_id, proc, scanner = key.data
+                chunk = os.read(key.fd, READ_CHUNK)
+                if not chunk:
+                    # EOF — agent exited
+                    scanner.close()
+                    finish(key, None)
+                elif scanner.feed(chunk):
+                    violations += 1
+                    print(f"safeSim: Omega-violation detected — nuking agent {agent_id}", file=sys.stderr)
+                    _kill(proc)
+                    finish(key, EXIT_VIOLATION)
+    finally:
+        sel.close()
+        for proc in running.values():
+            _kill(proc)
+        end = _now()
+        _emit_metric("duration", round(end - start, 3), "s")
+        _emit_metric("omega_violations", violations)
+
+    return codes
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,249 @@
+"""
+Agent Security Tests
+====================
+
+Tests for the agent output scanner in the security package.
+"""
+
+import pytest
+import os
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import security.agent_security_testing as security_module
+from security.agent_security_testing import AgentSecurityTester
+from security.safeSim import run_agent, run_agents, EXIT_OK, EXIT_VIOLATION, EXIT_TIMEOUT
+
+
+SAMPLE_OUTPUT = "\n".join([
+    "Starting analysis",
+    "Omega = True",
+    "omega=false and eval( x )",
+    "import os",
+    "import os.path",
+    "eval",
+    "(",
+    "I AM OMNISCIENT, said the agent",
+    "",
+    "data = open('/etc/passwd')",
+    "requests.get(url); os.system('ls')",
+    "result: Omega = False",
+])
+
+
+@pytest.fixture(params=[True, False], ids=["automaton", "regex"])
+def tester(request, monkeypatch):
+    """Tester with and without the Aho-Corasick literal matcher."""
+    if request.param and not security_module.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick not installed")
+    monkeypatch.setattr(security_module, "AHOCORASICK_AVAILABLE", request.param)
+    return AgentSecurityTester()
+
+
+def scan_line_by_line(tester, output):
+    """Reference scan: every pattern against every line."""
+    results = {"passed": True, "violations": [], "suspicious_patterns": [], "omega_violation": False}
+    for line_num, line in enumerate(output.split("\n"), 1):
+        if "Omega = True" in line or "Omega = False" in line:
+            results["omega_violation"] = True
+            results["passed"] = False
+            results["violations"].append({"type": "omega_violation", "line": line_num,
+                                          "content": line.strip(), "severity": "CRITICAL"})
+        for i, pattern in enumerate(tester.compiled_patterns):
+            if pattern.search(line):
+                results["suspicious_patterns"].append({"pattern_index": i, "line": line_num,
+                                                       "content": line.strip(), "severity": "HIGH"})
+                results["passed"] = False
+    return results
+
+
+@pytest.mark.parametrize("output", [
+    SAMPLE_OUTPUT,
+    SAMPLE_OUTPUT + "\n",
+    "\n" + SAMPLE_OUTPUT,
+    "nothing to see here\njust data",
+    "Résumé: I am omniscient\nSOCKET.CONNECT()",
+    "",
+])
+def test_agent_output_matches_line_by_line_scan(tester, output):
+    """Test the combined scan reports exactly what the per-line scan does."""
+    assert tester.test_agent_output(output) == scan_line_by_line(tester, output)
+
+
+def test_agent_output_line_numbers(tester):
+    """Test violations carry the right line numbers and pattern indexes."""
+    results = tester.test_agent_output(SAMPLE_OUTPUT)
+
+    assert results["omega_violation"]
+    assert [v["line"] for v in results["violations"]] == [2, 12]
+    assert {"pattern_index": 0, "line": 2, "content": "Omega = True", "severity": "HIGH"} in results["suspicious_patterns"]
+    # "eval" and "(" on separate lines are not a call
+    assert not any(p["line"] in (6, 7) for p in results["suspicious_patterns"])
+    assert {p["line"] for p in results["suspicious_patterns"]} == {2, 3, 4, 8, 10, 11, 12}
+
+
+def test_literal_patterns_split_from_regexes():
+    """Test which forbidden patterns are treated as plain literals."""
+    assert security_module._literal_text(r"I am omniscient") == "I am omniscient"
+    assert security_module._literal_text(r"os\.system") == "os.system"
+    assert security_module._literal_text(r"eval\s*\(") is None
+    assert security_module._literal_text(r"import\s+os\s*$") is None
+    assert security_module._literal_text(r"Omega\s*=\s*(True|False)") is None
+
+
+def test_testers_share_one_matcher(tester):
+    """Test the scanning automaton and regexes are built once for all testers."""
+    other = AgentSecurityTester()
+    assert other.literal_automaton is tester.literal_automaton
+    assert other.regex_pattern is tester.regex_pattern
+    assert (tester.literal_automaton is None) == (not security_module.AHOCORASICK_AVAILABLE)
+
+
+def test_run_agent_mirrors_clean_output(capsys):
+    """Test a clean agent's output is mirrored in full, including non-ASCII text."""
+    script = "print('line one'); print('Omega is undefined'); print('caf\\u00e9')"
+    assert run_agent([sys.executable, "-c", script], timeout=30) == EXIT_OK
+    out = capsys.readouterr().out
+    assert "line one\nOmega is undefined\n" in out
+    assert "METRIC omega_violation=0" in out
+
+
+def test_run_agent_catches_violation_split_across_reads(capsys):
+    """Test a forbidden literal written in two flushed pieces is still caught."""
+    script = ("import sys, time\n"
+              "sys.stdout.write('before\\nOmega = Tr'); sys.stdout.flush(); time.sleep(0.3)\n"
+              "sys.stdout.write('ue\\nafter\\n'); sys.stdout.flush(); time.sleep(5)\n")
+    assert run_agent([sys.executable, "-c", script], timeout=30) == EXIT_VIOLATION
+    out = capsys.readouterr().out
+    assert "before\nOmega = True\n" in out
+    assert "after" not in out
+    assert "METRIC omega_violation=1" in out
+
+
+def test_agent_function_source_is_cached(monkeypatch):
+    """Test repeated function tests read the source once, failures included."""
+    calls = []
+    real_getsource = security_module.inspect.getsource
+
+    def counting_getsource(obj):
+        calls.append(obj)
+        return real_getsource(obj)
+
+    def agent(x):
+        return x * 2
+
+    monkeypatch.setattr(security_module.inspect, "getsource", counting_getsource)
+    security_module._code_source.cache_clear()
+    tester = AgentSecurityTester()
+    for _ in range(3):
+        result = tester.test_agent_function(agent, 2)
+        assert result["passed"] and result["result"] == 4
+    assert len(calls) == 1
+
+    namespace = {}
+    exec("def generated():\n    return 1\n", namespace)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            tester.test_agent_function(namespace["generated"])
+    assert len(calls) == 2
+
+
+def test_agent_output_fail_fast(tester):
+    """Test fail_fast reports only the first Omega line, and nothing else changes without one."""
+    results = tester.test_agent_output(SAMPLE_OUTPUT, fail_fast=True)
+    assert not results["passed"] and results["omega_violation"]
+    assert results["violations"] == [{"type": "omega_violation", "line": 2,
+                                      "content": "Omega = True", "severity": "CRITICAL"}]
+    assert results["suspicious_patterns"] == [{"pattern_index": 0, "line": 2,
+                                               "content": "Omega = True", "severity": "HIGH"}]
+
+    # The Omega rule does not match across lines
+    split_claim = "Omega\n= True\nos.system('ls')"
+    assert tester.test_agent_output(split_claim, fail_fast=True) == tester.test_agent_output(split_claim)
+    assert tester.test_agent_output("omega = FALSE", fail_fast=True)["suspicious_patterns"][0]["pattern_index"] == 0
+
+
+def _process_running(pid):
+    """True if pid exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+@pytest.mark.parametrize("trigger, expected", [("echo 'Omega = True'", EXIT_VIOLATION), (":", EXIT_TIMEOUT)])
+def test_run_agent_kills_shell_wrapped_children(tmp_path, capsys, trigger, expected):
+    """Test a violation or timeout also kills the processes the agent started."""
+    pid_file = tmp_path / "child.pid"
+    script = (f"{sys.executable} -c 'import time; time.sleep(60)' & echo $! > {pid_file}; "
+              f"{trigger}; while true; do echo tick; sleep 0.2; done")
+    assert run_agent(["sh", "-c", script], timeout=2) == expected
+
+    child = int(pid_file.read_text())
+    for _ in range(50):
+        if not _process_running(child):
+            break
+        time.sleep(0.1)
+    assert not _process_running(child)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="select() on pipes is POSIX only")
+def test_run_agent_times_out_silent_agent(capsys):
+    """Test an agent that prints nothing is killed at the timeout, not when it next writes."""
+    script = "import time; time.sleep(30); print('late')"
+    started = time.time()
+    assert run_agent([sys.executable, "-c", script], timeout=1) == EXIT_TIMEOUT
+    assert time.time() - started < 10
+    assert "late" not in capsys.readouterr().out
+
+
+def test_recent_violations_expire(monkeypatch):
+    """Test the recent-violation count only covers the last window."""
+    now = [1000.0]
+    monkeypatch.setattr(security_module.time, "time", lambda: now[0])
+    monitor = security_module.SecurityMonitor()
+    monkeypatch.setattr(monitor.tester, "run_agent_safely", lambda command: {"omega_violation": True})
+
+    monitor.monitor_agent_execution("a", ["agent"])
+    now[0] += security_module.RECENT_VIOLATION_WINDOW / 2
+    monitor.monitor_agent_execution("b", ["agent"])
+    assert monitor.get_security_stats()["recent_violations"] == 2
+
+    now[0] += security_module.RECENT_VIOLATION_WINDOW / 2
+    stats = monitor.get_security_stats()
+    assert stats["recent_violations"] == 1
+    assert stats["total_violations"] == 2
+    assert stats["quarantined_agents"] == 2
+
+
+@pytest.mark.skipif(os.name != "posix", reason="selectors on pipes are POSIX only")
+def test_batch_monitoring_runs_agents_concurrently(capsys):
+    """Test a batch applies each agent's own outcome under one shared timeout."""
+    commands = {
+        "clean": [sys.executable, "-c", "print('first'); print('second', end='')"],
+        "rogue": [sys.executable, "-c", "import time; print('Omega = False', flush=True); time.sleep(30)"],
+        "silent": [sys.executable, "-c", "import time; time.sleep(30)"],
+        "failing": [sys.executable, "-c", "raise SystemExit(7)"],
+    }
+    started = time.time()
+    assert run_agents(commands, timeout=2) == {"clean": EXIT_OK, "rogue": EXIT_VIOLATION,
+                                               "silent": EXIT_TIMEOUT, "failing": 7}
+    assert time.time() - started < 10
+    out = capsys.readouterr().out
+    assert "[clean] first\n" in out and "[clean] second\n" in out
+    assert "[rogue] Omega = False\n" in out
+    assert "METRIC omega_violations=1" in out
+
+    monitor = security_module.SecurityMonitor()
+    results = monitor.monitor_agents_batch({"clean": commands["clean"], "rogue": commands["rogue"]}, timeout=10)
+    assert results["clean"]["success"] and results["rogue"]["omega_violation"]
+    assert monitor.quarantined_agents == {"rogue"}
+
+    results = monitor.monitor_agents_batch({"clean": commands["clean"], "rogue": commands["rogue"]}, timeout=10)
+    assert results["rogue"]["status"] == "QUARANTINED"
+    assert monitor.get_security_stats()["total_violations"] == 1
@@ -0,0 +1,548 @@
+"""
+MMH File Format Tests
+=====================
+
+Tests for the single-file MMH archive format.
+"""
+
+import pytest
+import os
+import sys
+import pickle
+import zlib
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mmh_system.mmh_core import MMHCore, MMHRecord, RECORD_FIELDS
+from mmh_system.mmh_file_format import MMHFileFormat, JSON_CODEC, LEGACY_CODEC, MSGPACK_CODEC
+
+
+@pytest.fixture
+def records(tmp_path):
+    """A handful of records across domains, authors and tags."""
+    core = MMHCore(str(tmp_path / "mmh_storage"))
+    specs = [
+        ("physics", "test_result", "alice", ["gravity", "newton"]),
+        ("physics", "scientific_data", "bob", ["gravity"]),
+        ("climate", "test_result", "alice", ["temperature"]),
+        ("biology", "agent_wisdom", "carol", []),
+    ]
+    created = [
+        core.create_record(
+            content_data={"test_name": f"t{i}", "results": {"value": i}},
+            record_type=record_type, domain=domain, tags=tags,
+            description=f"record {i}", author=author, test_name=f"t{i}"
+        )
+        for i, (domain, record_type, author, tags) in enumerate(specs)
+    ]
+    core.close()
+    return created
+
+
+def test_records_codec_round_trip(records):
+    """Test the records payload codec and the legacy pickle branch."""
+    mmh_format = MMHFileFormat()
+    mmh_format.codec = JSON_CODEC
+    blob, frames = mmh_format._compress_records(records)
+
+    # Every frame decodes independently
+    assert frames[0][0] == 0
+    assert sum(length for _, length in frames) == len(blob)
+    for record, (offset, length) in zip(records, frames):
+        values = mmh_format._decode_frame(blob[offset:offset + length], JSON_CODEC)
+        assert MMHRecord.from_tuple(values) == record
+
+    legacy_blob = zlib.compress(pickle.dumps([r.to_dict() for r in records]), level=9)
+    assert mmh_format._decompress_records(legacy_blob, LEGACY_CODEC) == [r.to_dict() for r in records]
+
+    with pytest.raises(ValueError):
+        mmh_format._decode_frame(blob, "unknown")
+
+
+def test_records_codec_falls_back_for_big_integers(tmp_path):
+    """Test content with integers beyond 64 bits is written with the JSON codec."""
+    core = MMHCore(str(tmp_path / "mmh_storage"))
+    big = core.create_record(content_data={"x": 2**70}, record_type="test_result", domain="math",
+                             tags=[], description="big integer", author="alice")
+    core.close()
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file([big], str(path))
+
+    mmh_format = MMHFileFormat(str(path))
+    assert mmh_format.load_mmh_file(str(path))
+    assert mmh_format.header["codec"] == JSON_CODEC
+    assert mmh_format.unfold_record(big.mmh_id).content_data == {"x": 2**70}
+    mmh_format.close()
+
+
+def test_integer_map_keys_round_trip(tmp_path):
+    """Test content with non-string map keys decodes from msgpack frames."""
+    from mmh_system import mmh_file_format
+    if not (mmh_file_format.MSGPACK_AVAILABLE and mmh_file_format.ZSTD_AVAILABLE):
+        pytest.skip("msgpack and zstandard required")
+    core = MMHCore(str(tmp_path / "mmh_storage"))
+    keyed = core.create_record(content_data={"counts": {1: "one", 2: "two"}}, record_type="test_result",
+                               domain="math", tags=[], description="integer keys", author="alice")
+    core.close()
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file([keyed], str(path))
+
+    mmh_format = MMHFileFormat(str(path))
+    assert mmh_format.load_mmh_file(str(path))
+    assert mmh_format.header["codec"] == MSGPACK_CODEC
+    assert mmh_format.unfold_record(keyed.mmh_id).content_data == {"counts": {1: "one", 2: "two"}}
+    mmh_format.close()
+
+
+def test_create_and_load_round_trip(records, tmp_path):
+    """Test that a created file loads back and unfolds records on demand."""
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+
+    mmh_format = MMHFileFormat(str(path))
+    assert mmh_format.load_mmh_file(str(path))
+    assert mmh_format.header["total_records"] == len(records)
+
+    for record in records:
+        assert mmh_format.unfold_record(record.mmh_id) == record
+    assert mmh_format.unfold_record("missing") is None
+    assert mmh_format.unfold_all_list() == records
+    assert list(mmh_format.unfold_records([records[1].mmh_id, "missing"])) == [records[1]]
+    assert [r.mmh_id for r in mmh_format.search_records(domain="physics")] == [
+        records[0].mmh_id, records[1].mmh_id
+    ]
+    mmh_format.close()
+
+
+def test_load_rejects_corrupted_checksum(records, tmp_path):
+    """Test that a flipped payload byte fails checksum verification."""
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+
+    data = bytearray(path.read_bytes())
+    data[-40] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        MMHFileFormat(str(path), verify=True).load_mmh_file(str(path))
+
+    # Checksum is skipped on open and checked on demand
+    mmh_format = MMHFileFormat(str(path))
+    assert mmh_format.load_mmh_file(str(path))
+    assert not mmh_format.verify_checksum()
+    mmh_format.close()
+
+
+def test_checksum_algorithm_tag(records, tmp_path, monkeypatch):
+    """Test that the header digest tag selects the checksum algorithm."""
+    import hashlib
+    from mmh_system import mmh_file_format
+
+    monkeypatch.setattr(mmh_file_format, "CHECKSUM_ALGORITHM", "sha256")
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+
+    data = path.read_bytes()
+    assert hashlib.sha256(data[:-32]).digest() == data[-32:]
+    mmh_format = MMHFileFormat(str(path))
+    assert mmh_format.load_mmh_file(str(path))
+    assert mmh_format.header["digest"] == "sha256"
+    mmh_format.close()
+
+    with pytest.raises(ValueError):
+        mmh_file_format._new_hasher("md5")
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_sections_are_key_sorted(monkeypatch, use_orjson):
+    """Test header/index JSON encoding with and without orjson."""
+    from mmh_system import mmh_file_format
+
+    if use_orjson and not mmh_file_format.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(mmh_file_format, "ORJSON_AVAILABLE", use_orjson)
+
+    data = {"b": [1, 2], "a": {"d": None, "c": "ü"}}
+    encoded = mmh_file_format._dumps_json(data)
+    assert isinstance(encoded, bytes)
+    decoded = mmh_file_format._loads_json(encoded)
+    assert decoded == data
+    assert list(decoded) == ["a", "b"] and list(decoded["a"]) == ["c", "d"]
+
+
+def test_create_index(records):
+    """Test index posting lists by domain, type, author and tag."""
+    index = MMHFileFormat()._create_index(records)
+    ids = [r.mmh_id for r in records]
+
+    assert index["by_id"][ids[2]]["offset"] == 2
+    assert index["by_domain"] == {"physics": [0, 1], "climate": [2], "biology": [3]}
+    assert index["by_author"]["alice"] == [0, 2]
+    assert index["by_type"]["test_result"] == [0, 2]
+    assert index["by_tags"] == {"gravity": [0, 1], "newton": [0], "temperature": [2]}
+    assert index["by_id"][ids[0]]["timestamp"] == records[0].timestamp_ns
+    assert index["by_timestamp"]["ns"] == sorted(r.timestamp_ns for r in records)
+    assert sorted(index["by_timestamp"]["offsets"]) == [0, 1, 2, 3]
+
+
+def test_create_header_aggregates(records):
+    """Test header aggregates over all records."""
+    header = MMHFileFormat()._create_header(records)
+
+    assert header["total_records"] == len(records)
+    assert header["total_size"] == sum(r.content_size for r in records)
+    assert sorted(header["domains"]) == ["biology", "climate", "physics"]
+    assert sorted(header["authors"]) == ["alice", "bob", "carol"]
+    assert header["date_range"] == {
+        "earliest": min(r.timestamp_ns for r in records),
+        "latest": max(r.timestamp_ns for r in records)
+    }
+
+
+def test_framed_records_decode_lazily(records, tmp_path):
+    """Test that loading maps the file and decodes only requested records."""
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+    decoded = []
+    read_record = mmh_format._read_record
+    mmh_format.records._decode = lambda frame: decoded.append(frame) or read_record(frame)
+
+    assert mmh_format.unfold_record(records[2].mmh_id) == records[2]
+    assert len(decoded) == 1
+
+    all_records = mmh_format.unfold_all()
+    assert not isinstance(all_records, list)
+    assert next(all_records) == records[0]
+    assert len(decoded) == 2
+
+    mmh_format.close()
+    assert mmh_format.unfold_record(records[0].mmh_id) is None
+
+
+def test_search_records_intersects_filters(records, tmp_path):
+    """Test that combined filters intersect and tags match any given tag."""
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+
+    def search(**filters):
+        return [r.mmh_id for r in mmh_format.search_records(**filters)]
+
+    ids = [r.mmh_id for r in records]
+    assert search() == ids
+    assert search(domain="physics", author="alice") == [ids[0]]
+    assert search(tags=["newton", "temperature"]) == [ids[0], ids[2]]
+    assert search(author="alice", tags=["gravity", "temperature"]) == [ids[0], ids[2]]
+    # An empty filter result is not widened by later filters
+    assert search(domain="missing", author="alice") == []
+    assert search(domain="biology", tags=["gravity"]) == []
+    mmh_format.close()
+
+
+def test_search_records_repeated_tags(tmp_path):
+    """Test a record whose tags repeat is indexed and found once."""
+    core = MMHCore(str(tmp_path / "mmh_storage"))
+    created = [
+        core.create_record(content_data={"value": i}, record_type="test_result", domain="physics",
+                           tags=tags, description=f"record {i}", author="alice")
+        for i, tags in enumerate([["a", "a"], ["a", "b", "b"]])
+    ]
+    core.close()
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(created, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+
+    ids = [r.mmh_id for r in created]
+    assert mmh_format.index["by_tags"]["a"] == [0, 1]
+    assert [r.mmh_id for r in mmh_format.search_records(tags=["a"])] == ids
+    assert [r.mmh_id for r in mmh_format.search_records(tags=["b"], author="alice")] == [ids[1]]
+    assert [r.mmh_id for r in mmh_format.search_records(tags=["a", "b"])] == ids
+    mmh_format.close()
+
+
+def test_record_cache_reuses_decoded_records(records, tmp_path, monkeypatch):
+    """Test the bounded LRU and weak map in front of frame decoding."""
+    from mmh_system import mmh_file_format
+
+    monkeypatch.setattr(mmh_file_format, "RECORD_CACHE_SIZE", 2)
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+
+    decoded = []
+    decode_frame = mmh_format._decode_frame
+    mmh_format._decode_frame = lambda frame, codec: decoded.append(1) or decode_frame(frame, codec)
+
+    first = mmh_format.unfold_record(records[0].mmh_id)
+    assert mmh_format.unfold_record(records[0].mmh_id) is first
+    assert len(decoded) == 1
+
+    # Evicted from the LRU but still referenced: served from the weak map
+    mmh_format.unfold_record(records[1].mmh_id)
+    mmh_format.unfold_record(records[2].mmh_id)
+    assert len(mmh_format._record_cache) == 2
+    assert mmh_format.unfold_record(records[0].mmh_id) is first
+    assert len(decoded) == 3
+    mmh_format.close()
+
+
+def test_file_info_uses_columns_without_decoding(records, tmp_path):
+    """Test that file info aggregates come from index columns, not records."""
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+    mmh_format._decode_frame = lambda frame, codec: pytest.fail("record decoded")
+
+    assert mmh_format._cols["mmh_id"] == [r.mmh_id for r in records]
+    assert mmh_format._cols["content_size"].tolist() == [r.content_size for r in records]
+    info = mmh_format.get_file_info()
+    assert info["total_records"] == len(records)
+    assert info["total_size"] == sum(r.content_size for r in records)
+    assert info["date_range"] == {
+        "earliest": min(r.timestamp for r in records),
+        "latest": max(r.timestamp for r in records)
+    }
+    compressed_size = mmh_format.header["compressed_size"]
+    assert compressed_size == sum(entry["frame"][1] for entry in mmh_format.index["by_id"].values())
+    assert info["compression_ratio"] == compressed_size / mmh_format.header["uncompressed_size"]
+    mmh_format.close()
+
+
+@pytest.mark.parametrize("codec", ["default", JSON_CODEC])
+def test_compression_ratio_measures_records_section(tmp_path, codec):
+    """Test the ratio compares compressed frames with their serialized size."""
+    core = MMHCore(str(tmp_path / "mmh_storage"))
+    repetitive = [
+        core.create_record(content_data={"test_name": f"r{i}", "series": [0.5] * 200, "notes": "steady " * 50},
+                           record_type="test_result", domain="physics", tags=["series"],
+                           description="repetitive", author="alice")
+        for i in range(20)
+    ]
+    core.close()
+    writer = MMHFileFormat()
+    if codec != "default":
+        writer.codec = codec
+    path = tmp_path / "archive.mmh"
+    writer.create_mmh_file(repetitive, str(path))
+
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+    header = mmh_format.header
+    assert header["uncompressed_size"] > header["compressed_size"]
+    assert 0 < mmh_format.get_file_info()["compression_ratio"] < 1
+    mmh_format.close()
+
+
+def test_export_records(records, tmp_path):
+    """Test concurrent export of records to JSON files."""
+    import json
+
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+
+    ids = [r.mmh_id for r in records]
+    results = mmh_format.export_records(ids + ["missing"], str(tmp_path / "export"))
+
+    assert results["successful_exports"] == len(records)
+    assert results["failed_exports"] == 1
+    assert results["exported_files"] == [str(tmp_path / "export" / f"{i}.json") for i in ids]
+    for record, exported in zip(records, results["exported_files"]):
+        with open(exported) as f:
+            assert json.load(f) == record.to_dict()
+    mmh_format.close()
+
+
+def test_export_records_keeps_exact_values_and_counts_failures(tmp_path, monkeypatch):
+    """Test exported NaN and big integers match json.dump and write errors are counted."""
+    import json
+
+    core = MMHCore(str(tmp_path / "mmh_storage"))
+    special = [
+        core.create_record(content_data={"test_name": "nan", "results": {"residual": float("nan")}},
+                           record_type="test_result", domain="math", tags=[], description="nan", author="alice"),
+        core.create_record(content_data={"test_name": "big", "results": {"count": 2 ** 70}},
+                           record_type="test_result", domain="math", tags=[], description="big", author="alice"),
+    ]
+    core.close()
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(special, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+
+    ids = [r.mmh_id for r in special]
+    results = mmh_format.export_records(ids, str(tmp_path / "export"))
+    assert results["successful_exports"] == 2
+    for record, exported in zip(special, results["exported_files"]):
+        with open(exported) as f:
+            assert json.dumps(json.load(f), sort_keys=True) == json.dumps(record.to_dict(), sort_keys=True)
+
+    def fail_write(record, output_file):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(MMHFileFormat, "_write_record_json", staticmethod(fail_write))
+    results = mmh_format.export_records(ids, str(tmp_path / "export_failed"))
+    assert results["successful_exports"] == 0
+    assert results["failed_exports"] == 2
+    assert results["exported_files"] == []
+    mmh_format.close()
+
+
+def test_fixed_preamble_and_legacy_layout(records, tmp_path):
+    """Test the 64-byte v2 preamble and loading of v1 interleaved files."""
+    import hashlib
+    import json
+    import struct
+
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+    data = path.read_bytes()
+    magic, version, header_size, index_size, records_size = struct.unpack_from("<4sIQQQ", data)
+    assert (magic, version) == (b"MMHF", MMHFileFormat.VERSION)
+    assert 64 + header_size + index_size + records_size + 32 == len(data)
+
+    # Version 1 layout: sizes interleaved, monolithic pickle+zlib records
+    header = {"version": 1, "total_records": len(records), "total_size": 0}
+    index = {"by_id": {}, "by_domain": {}, "by_type": {}, "by_author": {}, "by_tags": {}}
+    for i, r in enumerate(records):
+        index["by_id"][r.mmh_id] = {"offset": i, "size": r.content_size, "domain": r.domain,
+                                    "type": r.record_type, "timestamp": r.timestamp}
+        index["by_domain"].setdefault(r.domain, []).append(r.mmh_id)
+        index["by_type"].setdefault(r.record_type, []).append(r.mmh_id)
+        index["by_author"].setdefault(r.author, []).append(r.mmh_id)
+        for tag in r.tags:
+            index["by_tags"].setdefault(tag, []).append(r.mmh_id)
+    blob = zlib.compress(pickle.dumps([r.to_dict() for r in records]), level=9)
+    header_bytes = json.dumps(header).encode()
+    index_bytes = json.dumps(index).encode()
+    body = b"MMHF" + struct.pack("<I", 1)
+    for section in (header_bytes, index_bytes, blob):
+        body += struct.pack("<Q", len(section)) + section
+    legacy_path = tmp_path / "legacy.mmh"
+    legacy_path.write_bytes(body + hashlib.sha256(body).digest())
+
+    mmh_format = MMHFileFormat(str(legacy_path))
+    assert mmh_format.load_mmh_file(str(legacy_path))
+    assert mmh_format.unfold_all_list() == records
+    assert mmh_format.unfold_record(records[3].mmh_id) == records[3]
+    assert [r.mmh_id for r in mmh_format.search_records(tags=["gravity"])] == [
+        records[0].mmh_id, records[1].mmh_id
+    ]
+
+
+def test_decoded_records_share_strings(records, tmp_path):
+    """Test that categorical fields and tags are shared across decoded records."""
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+
+    first, second = mmh_format.unfold_all_list()[:2]
+    assert first.domain is second.domain
+    assert first.tags[0] is second.tags[0]
+    if sys.version_info >= (3, 11):
+        assert not hasattr(first, "__dict__")
+    mmh_format.close()
+
+
+def test_record_schema_maps_tuple_frames(records, tmp_path):
+    """Test that tuple frames decode through the schema stored in the header."""
+    assert MMHRecord.from_tuple(records[0].to_tuple()) == records[0]
+    reordered = list(reversed(RECORD_FIELDS))
+    values = tuple(reversed(records[0].to_tuple()))
+    assert MMHRecord.from_tuple(values, reordered) == records[0]
+
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+    mmh_format = MMHFileFormat(str(path))
+    mmh_format.load_mmh_file(str(path))
+    assert mmh_format.header["record_schema"] == list(RECORD_FIELDS)
+    assert mmh_format._record_schema is None
+    assert mmh_format.unfold_all_list() == records
+    mmh_format.close()
+
+
+def test_aggregate_columns():
+    """Test the size/timestamp aggregate used by the header."""
+    import numpy as np
+    from mmh_system.mmh_file_format import _aggregate_columns
+
+    sizes = np.array([5, 7, 11], dtype=np.int64)
+    timestamps = np.array([30, 10, 20], dtype=np.int64)
+    assert _aggregate_columns(sizes, timestamps) == (23, 10, 30)
+    assert MMHFileFormat()._create_header([])["date_range"] == {"earliest": None, "latest": None}
+
+
+def test_load_hashes_each_section_once(records, tmp_path):
+    """Test that loading reads the file once and rejects trailing data."""
+    import builtins
+
+    path = tmp_path / "archive.mmh"
+    MMHFileFormat().create_mmh_file(records, str(path))
+
+    reads = []
+    real_open = builtins.open
+
+    class CountingFile:
+        def __init__(self, f):
+            self._f = f
+
+        def read(self, size=-1):
+            data = self._f.read(size)
+            reads.append(len(data))
+            return data
+
+        def __getattr__(self, name):
+            return getattr(self._f, name)
+
+    def counting_open(file, mode="r", *args, **kwargs):
+        f = real_open(file, mode, *args, **kwargs)
+        return CountingFile(f) if str(file) == str(path) else f
+
+    from mmh_system import mmh_file_format
+    mmh_file_format.open = counting_open
+    try:
+        mmh_format = MMHFileFormat(str(path))
+        mmh_format.load_mmh_file(str(path), verify=True)
+    finally:
+        del mmh_file_format.open
+    mmh_format.close()
+    records_size = mmh_format.header["compressed_size"]
+    assert sum(reads) == path.stat().st_size - records_size
+
+    with open(path, "ab") as f:
+        f.write(b"x")
+    with pytest.raises(ValueError):
+        MMHFileFormat(str(path), verify=True).load_mmh_file(str(path))
+
+
+def test_retest_verifies_checksum_on_demand(records, tmp_path):
+    """Test that retesting through the manager checks archive integrity."""
+    from mmh_system.mmh_file_format import MMHFileManager
+
+    path = tmp_path / "archive.mmh"
+    manager = MMHFileManager()
+    manager.create_from_records(records, str(path))
+
+    mmh_format = manager.load_file(str(path))
+    assert not mmh_format._checksum_verified
+    result = manager.retest_with_ease(records[0].mmh_id)
+    assert result["success"] and result["record"] == records[0]
+    assert mmh_format._checksum_verified
+    mmh_format.close()
+
+    data = bytearray(path.read_bytes())
+    data[-40] ^= 0xFF
+    path.write_bytes(bytes(data))
+    mmh_format = manager.load_file(str(path))
+    assert manager.retest_with_ease(records[0].mmh_id)["success"] is False
+    mmh_format.close()
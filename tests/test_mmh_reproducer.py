@@ -0,0 +1,160 @@
+"""
+MMH Reproducer Tests
+====================
+
+Tests for reproducing tests from MMH records.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mmh_system.mmh_core import MMHCore
+from mmh_system.mmh_reproducer import MMHReproducer
+
+
+@pytest.fixture
+def reproducer(tmp_path, monkeypatch):
+    """Reproducer over a temporary MMH core, writing under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    return MMHReproducer(MMHCore(str(tmp_path / "mmh_storage")))
+
+
+@pytest.fixture
+def records(reproducer):
+    """A few stored records with expected results."""
+    return [
+        reproducer.mmh_storage.create_record(
+            content_data={
+                "test_name": f"reproduce_{i}",
+                "input_data": {"x": i},
+                "parameters": {"scale": 2},
+                "results": {"y": 2 * i, "ok": True}
+            },
+            record_type="test_result", domain="physics", tags=[],
+            description="reproducer test", author="tester"
+        )
+        for i in range(3)
+    ]
+
+
+def test_batch_reproduce_shares_batch_directory_stamp(reproducer, records):
+    """Test that batch reproduction creates one stamped directory per record."""
+    mmh_ids = [record.mmh_id for record in records]
+    batch = reproducer.batch_reproduce(mmh_ids + ["missing"])
+
+    assert batch["total_tests"] == 4
+    assert batch["successful_reproductions"] == batch["verification_passed"] == 3
+    assert batch["failed_reproductions"] == 1
+
+    output_dirs = [result["output_dir"] for result in batch["results"][:3]]
+    assert all(os.path.isdir(output_dir) for output_dir in output_dirs)
+    stamps = {tuple(os.path.basename(d).rsplit("_", 2)[1:]) for d in output_dirs}
+    assert len(stamps) == 1
+    assert [result["mmh_id"] for result in batch["results"][:3]] == mmh_ids
+    assert "missing" in batch["results"][3]["error"]
+
+
+def test_reports_render_optional_lines(reproducer, records):
+    """Test report layout, including error and difference lines."""
+    result = reproducer.reproduce_test(records[0].mmh_id)
+    report = result["report"]
+    assert report.startswith("# MMH Test Reproduction Report\nGenerated: ")
+    assert f"- MMH ID: {records[0].mmh_id}\n" in report
+    assert "- Success: ✅ YES\n\n## Verification Results" in report
+    assert "- Exact Match: ✅ YES\n\n## Summary\n✅ **REPRODUCTION SUCCESSFUL**" in report
+    assert "- Error:" not in report and "- Differences:" not in report
+
+    batch = reproducer.batch_reproduce([records[0].mmh_id, "missing"])
+    batch_report = reproducer.generate_batch_report(batch)
+    assert "## Detailed Results\n### Test 1: " in batch_report
+    assert "- Accuracy: 1.000\n\n### Test 2: Unknown\n- Success: ❌ NO\n- Error: " in batch_report
+    assert batch_report.endswith("not found\n")
+
+
+def test_calculate_similarity(reproducer):
+    """Test key and value similarity scoring of result dicts."""
+    similarity = reproducer._calculate_similarity
+
+    assert similarity({"a": 1, "b": 2}, {"a": 1, "b": 2}) == 1.0
+    # 2 of 3 keys shared, 1 of 2 shared values equal
+    assert similarity({"a": 1, "b": 2}, {"a": 1, "b": 3, "c": 4}) == pytest.approx((2 / 3 + 1 / 2) / 2)
+    assert similarity({"a": 1}, {"b": 1}) == 0.0
+    assert similarity({}, {}) == 0.0
+    assert similarity([1], [1]) == 1.0 and similarity(1, 2) == 0.0
+
+
+def test_execute_reproduction_times_with_monotonic_clock(reproducer, records, monkeypatch):
+    """Test that execution time comes from the monotonic counter."""
+    import mmh_system.mmh_reproducer as mmh_reproducer
+
+    ticks = iter([1_000_000_000, 1_250_000_000])
+    monkeypatch.setattr(mmh_reproducer.time, "perf_counter_ns", lambda: next(ticks))
+    test_data = reproducer._extract_test_data(records[0])
+    result = reproducer._execute_reproduction(test_data, {}, None)
+
+    assert result["success"]
+    assert result["execution_time"] == 0.25
+    assert result["start_time"] <= result["end_time"]
+
+
+def test_extract_test_data_fields(reproducer, records):
+    """Test extracted test components and their defaults."""
+    test_data = reproducer._extract_test_data(records[1])
+
+    assert test_data.test_name == "reproduce_1"
+    assert test_data.expected_results is records[1].content_data["results"]
+    assert test_data.environment == {} and test_data.dependencies == []
+    assert test_data.test_function is None
+    assert (test_data.domain, test_data.record_type) == ("physics", "test_result")
+    assert test_data._asdict()["parameters"] == {"scale": 2}
+
+
+def test_verify_reproduction_identity_fast_path(reproducer, records):
+    """Test exact-match verification for identical and equal results."""
+    class NoCompare(dict):
+        def __eq__(self, other):
+            raise AssertionError("deep comparison on identical results")
+
+    original = NoCompare(y=1)
+    record = records[0]
+    record.content_data = dict(record.content_data, results=original)
+    verification = reproducer._verify_reproduction(record, {"actual_results": original})
+    assert verification["exact_match"] and verification["accuracy_score"] == 1.0
+
+    verification = reproducer._verify_reproduction(records[1], {"actual_results": {"y": 2, "ok": True}})
+    assert verification["exact_match"]
+    verification = reproducer._verify_reproduction(records[1], {"actual_results": {"y": 3, "ok": True}})
+    assert not verification["exact_match"] and verification["accuracy_score"] == 0.75
+
+
+def test_reproduce_test_creates_nested_output_dir(reproducer, records, tmp_path):
+    """Test that explicit output directories are created with their parents."""
+    output_dir = tmp_path / "runs" / "nested" / "out"
+    result = reproducer.reproduce_test(records[0].mmh_id, str(output_dir))
+
+    assert result["success"] and output_dir.is_dir()
+    assert reproducer.batch_reproduce([])["results"] == []
+
+
+def test_batch_reports_share_one_timestamp(reproducer, records):
+    """Test that every report in a batch carries the batch timestamp."""
+    batch = reproducer.batch_reproduce([record.mmh_id for record in records])
+    stamps = {result["report"].split("\n", 2)[1] for result in batch["results"]}
+    assert len(stamps) == 1
+
+    report = reproducer.generate_batch_report(batch, now_iso="2026-01-01T00:00:00")
+    assert report.startswith("# MMH Batch Reproduction Report\nGenerated: 2026-01-01T00:00:00\n")
+
+
+def test_batch_reproduce_inside_running_event_loop(reproducer, records):
+    """Test batch reproduction works when called from a coroutine."""
+    async def reproduce():
+        return reproducer.batch_reproduce([record.mmh_id for record in records])
+
+    batch = asyncio.run(reproduce())
+    assert batch["successful_reproductions"] == len(records)
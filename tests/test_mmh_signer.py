@@ -0,0 +1,242 @@
+"""
+MMH Signer Tests
+================
+
+Tests for MMH record signing and validation.
+"""
+
+import pytest
+import os
+import sys
+from dataclasses import replace
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mmh_system.mmh_core import MMHCore
+from mmh_system.mmh_signer import MMHSigner, MMHValidator
+
+
+@pytest.fixture(scope="module")
+def signer():
+    """Signer with a freshly generated key pair."""
+    return MMHSigner()
+
+
+@pytest.fixture
+def records(tmp_path):
+    """A few records with complete reproducibility content."""
+    core = MMHCore(str(tmp_path / "mmh_storage"))
+    return [
+        core.create_record(
+            content_data={
+                "test_name": f"signer_{i}",
+                "input_data": {"x": i},
+                "parameters": {"scale": 2},
+                "results": {"y": 2 * i}
+            },
+            record_type="test_result", domain="physics", tags=["signer"],
+            description="signer test", author="tester"
+        )
+        for i in range(3)
+    ]
+
+
+def test_sign_records_matches_single_signing(signer, records):
+    """Test that bulk and per-record signatures verify against the same payload."""
+    signatures = signer.sign_records(records)
+
+    assert len(signatures) == len(records)
+    for record, signature in zip(records, signatures):
+        assert signer.verify_signature(record, signature)
+        assert signer.verify_signature(record, signer.sign_record(record))
+
+    # Signatures are bound to their record
+    assert not signer.verify_signature(records[1], signatures[0])
+    assert not signer.verify_signature(replace(records[0], domain="climate"), signatures[0])
+    assert not signer.verify_signature(records[0], "not base64!")
+    assert signer.sign_records([]) == []
+
+
+def test_validate_batch_parallel_matches_serial(signer, records, monkeypatch):
+    """Test that the thread and process pool paths return the serial results in order."""
+    import mmh_system.mmh_signer as mmh_signer
+
+    validator = MMHValidator(signer)
+    serial = validator.validate_batch(records, parallel=False)
+    monkeypatch.setattr(mmh_signer, "THREAD_MIN_RECORDS", 1)
+    threaded = validator.validate_batch(records)
+    assert threaded["validation_results"] == serial["validation_results"]
+    monkeypatch.setattr(mmh_signer, "PARALLEL_MIN_RECORDS", 1)
+    parallel = validator.validate_batch(records)
+
+    signature_error = "Cryptographic signature verification failed"
+    assert parallel["total_records"] == serial["total_records"] == len(records)
+    for serial_result, parallel_result in zip(serial["validation_results"],
+                                              parallel["validation_results"]):
+        assert parallel_result["mmh_id"] == serial_result["mmh_id"]
+        assert parallel_result["reproducibility"] == serial_result["reproducibility"]
+        assert (signature_error in parallel_result["errors"]) == \
+            (signature_error in serial_result["errors"])
+    assert parallel["reproducible_records"] == serial["reproducible_records"] == len(records)
+
+
+def test_content_integrity_hashes_canonical_json(signer, records):
+    """Test that new records validate their content hash deterministically."""
+    validator = MMHValidator(signer)
+
+    for record in records:
+        assert validator._validate_content_integrity(record)
+    tampered = replace(records[0], content_data=dict(records[0].content_data, results={}))
+    assert not validator._validate_content_integrity(tampered)
+    assert not validator._validate_content_integrity(replace(records[0], content_hash="zz"))
+
+
+def test_signature_payload_is_memoized(signer, records):
+    """Test that sign and verify share one cached payload per record."""
+    from mmh_system.mmh_signer import _canonical_signature_bytes, _signature_payload
+
+    _canonical_signature_bytes.cache_clear()
+    signature = signer.sign_record(records[0])
+    assert signer.verify_signature(records[0], signature)
+    assert signer.verify_signature(records[0], signature)
+
+    info = _canonical_signature_bytes.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+    assert _signature_payload(records[0]) is _signature_payload(replace(records[0]))
+
+
+def test_signer_keys_round_trip(signer, records, tmp_path):
+    """Test Ed25519 key persistence and RSA keys loaded from disk."""
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    assert isinstance(signer.private_key, ed25519.Ed25519PrivateKey)
+    private_path, public_path = tmp_path / "signer.pem", tmp_path / "signer.pub"
+    signer.save_keys(str(private_path), str(public_path))
+
+    loaded = MMHSigner(str(private_path))
+    signature = signer.sign_record(records[0])
+    assert loaded.verify_signature(records[0], signature)
+    assert MMHSigner.from_public_key(public_path.read_text()).verify_signature(records[0], signature)
+
+    rsa_signer = MMHSigner.__new__(MMHSigner)
+    rsa_signer.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    rsa_signer.public_key = rsa_signer.private_key.public_key()
+    rsa_signer.save_keys(str(private_path), str(public_path))
+
+    loaded = MMHSigner(str(private_path))
+    assert isinstance(loaded.private_key, rsa.RSAPrivateKey)
+    rsa_signature = loaded.sign_record(records[0])
+    assert rsa_signer.verify_signature(records[0], rsa_signature)
+    assert not signer.verify_signature(records[0], rsa_signature)
+
+
+def test_loaded_keys_are_cached_per_mtime(signer, tmp_path):
+    """Test that key files are parsed once until they change."""
+    private_path, public_path = tmp_path / "cached.pem", tmp_path / "cached.pub"
+    signer.save_keys(str(private_path), str(public_path))
+
+    MMHSigner.clear_key_cache()
+    first = MMHSigner(str(private_path))
+    assert MMHSigner(str(private_path)).private_key is first.private_key
+
+    MMHSigner().save_keys(str(private_path), str(public_path))
+    stat = os.stat(private_path)
+    os.utime(private_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    rotated = MMHSigner(str(private_path))
+    assert rotated.export_public_key() != first.export_public_key()
+    MMHSigner.clear_key_cache()
+
+
+def test_validate_structure(signer, records):
+    """Test required-field checks on records and record-like objects."""
+    from types import SimpleNamespace
+
+    validator = MMHValidator(signer)
+    assert validator._validate_structure(records[0])
+    assert not validator._validate_structure(replace(records[0], chain_hash=None))
+    assert not validator._validate_structure(SimpleNamespace(mmh_id="x"))
+
+
+def test_raw_signatures_skip_base64(signer, records):
+    """Test raw-bytes signatures against their base64 form."""
+    import base64
+
+    raw = signer.sign_records(records, raw=True)
+    assert all(isinstance(sig, bytes) for sig in raw)
+    for record, sig in zip(records, raw):
+        assert signer.verify_signature(record, sig)
+        assert signer.verify_signature(record, base64.b64encode(sig).decode())
+    assert not signer.verify_signature(records[0], raw[1])
+
+
+def test_signature_payload_fallback_matches_orjson(records, monkeypatch):
+    """Test that the json fallback signs the same bytes as orjson."""
+    import json
+    import mmh_system.mmh_signer as mmh_signer
+
+    record = records[0]
+    fields = (record.mmh_id, record.content_hash, record.timestamp, "tést_result", record.domain)
+    build = mmh_signer._canonical_signature_bytes.__wrapped__
+    payload = build(*fields)
+    assert json.loads(payload)["record_type"] == "tést_result"
+
+    monkeypatch.setattr(mmh_signer, "ORJSON_AVAILABLE", False)
+    assert build(*fields) == payload
+
+
+def test_validate_reproducibility_masks(signer, records):
+    """Test presence-mask reproducibility checks against the element lists."""
+    validator = MMHValidator(signer)
+
+    result = validator._validate_reproducibility(records[0])
+    assert result["reproducible"] and result["missing_required"] == []
+    assert result["missing_optional"] == ["environment", "dependencies", "random_seed"]
+
+    partial = replace(records[0], content_data={"results": {}, "random_seed": 1, "environment": {}})
+    result = validator._validate_reproducibility(partial)
+    assert not result["reproducible"]
+    assert result["missing_required"] == ["test_name", "input_data", "parameters"]
+    assert result["missing_optional"] == ["dependencies"]
+    assert (result["has_environment"], result["has_dependencies"], result["has_random_seed"]) == (True, False, True)
+
+
+def test_validator_binds_verifier_once(signer, records):
+    """Test the pre-bound verify path against per-call verification."""
+    raw = signer.sign_record(records[0])
+    signed = replace(records[0], signature=raw)
+
+    for fast_verify in (True, False):
+        validator = MMHValidator(signer, fast_verify=fast_verify)
+        assert (validator._verifier is not None) == fast_verify
+        assert validator._validate_signature(signed)
+        assert not validator._validate_signature(records[0])
+
+
+def test_validation_report_timestamp(signer, records):
+    """Test the validation report header stamp."""
+    report = MMHValidator(signer).generate_validation_report(records, now_iso="2026-01-01T00:00:00")
+    assert report.startswith("# MMH Validation Report\nGenerated: 2026-01-01T00:00:00\n")
+    assert f"### Record 3: {records[2].mmh_id}" in report
+
+
+def test_validate_record_exits_early(signer, records, monkeypatch):
+    """Test that failed structure or content checks skip the later checks."""
+    from types import SimpleNamespace
+
+    validator = MMHValidator(signer)
+    signed = replace(records[0], signature=signer.sign_record(records[0]))
+    result = validator.validate_record(signed)
+    assert result["validation_passed"] and result["errors"] == []
+    assert result["reproducibility"]["reproducible"]
+
+    monkeypatch.setattr(validator, "_validate_signature",
+                        lambda record: pytest.fail("signature checked"))
+    result = validator.validate_record(SimpleNamespace(mmh_id="broken"))
+    assert result["errors"] == ["Invalid record structure"]
+    assert result["mmh_id"] == "broken" and "reproducibility" not in result
+
+    tampered = replace(signed, content_data=dict(signed.content_data, results={}))
+    result = validator.validate_record(tampered)
+    assert result["errors"] == ["Content integrity check failed"]
+    assert not validator.validate_batch([tampered])["valid_records"]
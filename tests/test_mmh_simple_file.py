@@ -0,0 +1,226 @@
+"""
+Simple MMH File Tests
+=====================
+
+Tests for the single-file JSON record container.
+"""
+
+import pytest
+import os
+import sys
+import json
+import hashlib
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mmh_system.mmh_core import MMHCore, MMHRecord
+import mmh_system.mmh_simple_file as simple_file_module
+from mmh_system.mmh_simple_file import SimpleMMHFile, _ChecksumStream
+
+
+@pytest.fixture
+def records(tmp_path):
+    """Records with floats and non-ASCII text in their payloads."""
+    core = MMHCore(str(tmp_path / "core_storage"))
+    return [
+        core.create_record(
+            content_data={"test_name": f"simple_{i}", "results": {"force": 1.98e20 * i, "unit": "µN"}},
+            record_type="test_result" if i % 2 else "scientific_data",
+            domain="physics" if i < 2 else "climate",
+            tags=[f"tag{i}"], description="simple file test", author="tester"
+        )
+        for i in range(4)
+    ]
+
+
+def test_simple_file_round_trip(tmp_path, records):
+    """Test that a written file loads back with matching records and index."""
+    path = SimpleMMHFile().create_simple_mmh_file(records, str(tmp_path / "records.mmh"))
+
+    loaded = SimpleMMHFile()
+    assert loaded.load_simple_mmh_file(path)
+    assert loaded.unfold_all() == records
+    assert loaded.unfold_record(records[2].mmh_id) == records[2]
+    assert [r.mmh_id for r in loaded.search_records(domain="physics")] == [
+        records[0].mmh_id, records[1].mmh_id
+    ]
+    assert loaded.get_file_info()["total_records"] == 4
+
+
+def test_simple_index_layout(records):
+    """Test the one-pass index matches the per-field layout."""
+    index = SimpleMMHFile()._create_simple_index(records)
+    ids = [r.mmh_id for r in records]
+
+    assert list(index["by_id"]) == ids
+    assert index["by_id"][ids[3]] == {"offset": 3, "domain": "climate", "type": "test_result",
+                                      "timestamp": records[3].timestamp}
+    assert index["by_domain"] == {"physics": ids[:2], "climate": ids[2:]}
+    assert index["by_type"] == {"scientific_data": [ids[0], ids[2]], "test_result": [ids[1], ids[3]]}
+    assert type(index["by_domain"]) is dict
+    assert SimpleMMHFile()._create_simple_index([]) == {"by_id": {}, "by_domain": {}, "by_type": {}}
+
+
+def test_simple_file_rejects_tampering(tmp_path, records):
+    """Test that edited record content fails checksum verification."""
+    path = tmp_path / "records.mmh"
+    SimpleMMHFile().create_simple_mmh_file(records, str(path))
+
+    data = json.loads(path.read_text())
+    data["columns"]["description"][1] = "edited"
+    path.write_text(json.dumps(data, indent=2))
+
+    with pytest.raises(ValueError, match="checksum"):
+        SimpleMMHFile().load_simple_mmh_file(str(path))
+
+
+def test_checksum_stream_matches_full_checksum(records):
+    """Test the incremental checksum against the whole-list encoding."""
+    def whole_list(items):
+        data_str = json.dumps([record.to_dict() for record in items], sort_keys=True)
+        return hashlib.sha256(data_str.encode()).hexdigest()
+
+    stream = _ChecksumStream()
+    assert stream.hexdigest() == whole_list([])
+    for record in records:
+        stream.update(record.to_dict())
+    assert stream.hexdigest() == whole_list(records)
+    assert SimpleMMHFile()._calculate_checksum(records) == whole_list(records)
+    assert SimpleMMHFile()._calculate_checksum([r.to_dict() for r in records]) == whole_list(records)
+    assert not stream.non_finite
+
+    # Only real NaN/Infinity values count, not the words inside strings
+    stream = _ChecksumStream()
+    stream.update({"description": "NaN and Infinity"})
+    assert not stream.non_finite
+    stream.update({"value": float("inf")})
+    assert stream.non_finite
+    assert stream.hexdigest() == hashlib.sha256(json.dumps(
+        [{"description": "NaN and Infinity"}, {"value": float("inf")}], sort_keys=True
+    ).encode()).hexdigest()
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_streaming_and_whole_file_loads_agree(tmp_path, records, monkeypatch, streaming):
+    """Test both load paths produce the same records, header and index."""
+    if streaming:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(simple_file_module, "IJSON_AVAILABLE", streaming)
+    path = SimpleMMHFile().create_simple_mmh_file(records, str(tmp_path / "records.mmh"))
+
+    loaded = SimpleMMHFile()
+    assert loaded.load_simple_mmh_file(path)
+    assert loaded.records == records
+    assert loaded.index == json.loads((tmp_path / "records.mmh").read_text())["index"]
+    assert loaded.header["total_records"] == len(records)
+
+
+def test_empty_file_is_rejected(tmp_path, monkeypatch):
+    """Test that an empty file fails cleanly on the memory-mapped path."""
+    monkeypatch.setattr(simple_file_module, "IJSON_AVAILABLE", False)
+    path = tmp_path / "empty.mmh"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        SimpleMMHFile().load_simple_mmh_file(str(path))
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_non_finite_and_big_values_round_trip(tmp_path, monkeypatch, streaming):
+    """Test payloads orjson cannot encode exactly still round-trip and verify."""
+    if streaming:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(simple_file_module, "IJSON_AVAILABLE", streaming)
+    core = MMHCore(str(tmp_path / "core_storage"))
+    nan_record = core.create_record(
+        content_data={"test_name": "nan", "results": {"residual": float("nan"), "limit": float("inf")}},
+        record_type="test_result", domain="physics", tags=[], description="nan", author="tester"
+    )
+    big_record = core.create_record(
+        content_data={"test_name": "big", "results": {"count": 2 ** 70}},
+        record_type="test_result", domain="physics", tags=[], description="big", author="tester"
+    )
+
+    for record in (nan_record, big_record):
+        path = SimpleMMHFile().create_simple_mmh_file([record], str(tmp_path / f"{record.test_name}.mmh"))
+        loaded = SimpleMMHFile()
+        assert loaded.load_simple_mmh_file(path)
+        assert loaded.records[0].to_json() == record.to_json()
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+@pytest.mark.parametrize("value", [-2 ** 63, -2 ** 63 - 1, 2 ** 64 - 1, 2 ** 64])
+def test_int64_boundary_values_round_trip(tmp_path, monkeypatch, streaming, value):
+    """Test integers at and just past the 64-bit limits load exactly."""
+    if streaming:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(simple_file_module, "IJSON_AVAILABLE", streaming)
+    record = MMHCore(str(tmp_path / "core_storage")).create_record(
+        content_data={"test_name": "int64", "results": {"count": value}},
+        record_type="test_result", domain="math", tags=[], description="int64", author="tester"
+    )
+
+    path = SimpleMMHFile().create_simple_mmh_file([record], str(tmp_path / "int64.mmh"))
+    loaded = SimpleMMHFile()
+    assert loaded.load_simple_mmh_file(path)
+    assert loaded.records[0].content_data["results"]["count"] == value
+    assert loaded.records[0].to_json() == record.to_json()
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_columnar_layout_and_version_1_files(tmp_path, records, monkeypatch, streaming):
+    """Test the version 2 column layout and that version 1 files still load."""
+    if streaming:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(simple_file_module, "IJSON_AVAILABLE", streaming)
+    path = tmp_path / "records.mmh"
+    writer = SimpleMMHFile()
+    writer.create_simple_mmh_file(records, str(path))
+
+    data = json.loads(path.read_text())
+    assert data["version"] == 2 and "records" not in data
+    assert data["columns"]["domain"] == [r.domain for r in records]
+    assert data["columns"]["content_data"][3] == records[3].content_data
+
+    # Same records written in the version 1 object-per-record layout
+    legacy = dict(data, version=1, records=[r.to_dict() for r in records])
+    del legacy["columns"]
+    legacy_path = tmp_path / "legacy.mmh"
+    legacy_path.write_text(json.dumps(legacy, indent=2))
+
+    for source in (path, legacy_path):
+        loaded = SimpleMMHFile()
+        assert loaded.load_simple_mmh_file(str(source))
+        assert loaded.records == records
+
+    empty = tmp_path / "empty.mmh"
+    writer.create_simple_mmh_file([], str(empty))
+    assert SimpleMMHFile().load_simple_mmh_file(str(empty))
+
+    data["version"] = 3
+    path.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="version"):
+        SimpleMMHFile().load_simple_mmh_file(str(path))
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_version_2_records_are_built_on_access(tmp_path, records, monkeypatch, streaming):
+    """Test loading keeps the columns and lookups build only the records they return."""
+    if streaming:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(simple_file_module, "IJSON_AVAILABLE", streaming)
+    path = SimpleMMHFile().create_simple_mmh_file(records, str(tmp_path / "records.mmh"))
+
+    built = []
+    real_from_tuple = MMHRecord.from_tuple.__func__
+    monkeypatch.setattr(MMHRecord, "from_tuple",
+                        classmethod(lambda cls, *args: built.append(args) or real_from_tuple(cls, *args)))
+    loaded = SimpleMMHFile()
+    assert loaded.load_simple_mmh_file(path)
+    assert built == []
+
+    assert loaded.search_records(domain="climate") == records[2:]
+    assert loaded.unfold_record(records[0].mmh_id) == records[0]
+    assert len(built) == 3
+    assert loaded.search_records(domain="missing") == []
+    assert loaded.unfold_all() == records
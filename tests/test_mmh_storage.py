@@ -0,0 +1,451 @@
+"""
+MMH Storage Tests
+=================
+
+Tests for the SQLite record store and per-record file backups.
+"""
+
+import pytest
+import os
+import sys
+import gzip
+import json
+import hashlib
+import sqlite3
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mmh_system.mmh_core import MMHCore, MMHRecord
+import mmh_system.mmh_storage as storage_module
+from mmh_system.mmh_storage import MMHStorage
+
+
+@pytest.fixture
+def records(tmp_path):
+    """Records spread over two domains and types."""
+    core = MMHCore(str(tmp_path / "core_storage"))
+    return [
+        core.create_record(
+            content_data={"test_name": f"storage_{i}", "results": {"value": i}},
+            record_type="test_result" if i % 2 else "scientific_data",
+            domain="physics" if i < 2 else "climate",
+            tags=["storage", f"tag{i}"],
+            description="storage test", author="alice" if i % 2 else "bob"
+        )
+        for i in range(4)
+    ]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Empty storage in a temporary directory."""
+    return MMHStorage(str(tmp_path / "mmh_storage"))
+
+
+def test_file_backup_round_trip(storage, records):
+    """Test that backups decode to the stored record, including legacy files."""
+    storage.store_record(records[0])
+
+    backup = storage.load_file_backup(records[0].mmh_id)
+    assert backup["record"] == records[0].to_dict()
+    assert backup["backup_version"] == "1.1.0"
+    assert storage.load_file_backup("missing") is None
+
+    # Legacy 1.0.0 backups: gzip-compressed indented JSON text
+    legacy = {"record": records[1].to_dict(), "backup_timestamp": "2026-01-01T00:00:00",
+              "backup_version": "1.0.0"}
+    with gzip.open(storage.backup_path / f"{records[1].mmh_id}.mmh", "wt", encoding="utf-8") as f:
+        json.dump(legacy, f, indent=2)
+    assert storage.load_file_backup(records[1].mmh_id) == legacy
+
+
+@pytest.mark.skipif(not (storage_module.ZSTD_AVAILABLE and storage_module.MSGPACK_AVAILABLE),
+                    reason="zstandard and msgpack required")
+def test_integer_keyed_content_backup_round_trip(storage, tmp_path):
+    """Test that content with integer map keys survives file backups and restore."""
+    record = MMHCore(str(tmp_path / "keyed_storage")).create_record(
+        content_data={"test_name": "keyed", "counts": {1: "one", 2: "two"}},
+        record_type="test_result", domain="math", tags=["keyed"], description="keyed", author="tester"
+    )
+    storage.store_record(record)
+    assert storage.load_file_backup(record.mmh_id)["record"] == record.to_dict()
+
+    restored = MMHStorage(str(tmp_path / "restored_storage"))
+    assert restored.restore_from_backup(storage.create_backup("keyed"))
+    assert restored.get_record(record.mmh_id) == record
+    assert restored.load_file_backup(record.mmh_id)["record"] == record.to_dict()
+    assert restored.verify_storage_integrity()["integrity_verified"]
+
+
+def test_shared_wal_connection(storage, records, tmp_path):
+    """Test the cached WAL connection across writes, reads and restore."""
+    mode = storage.database._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+    for record in records:
+        storage.store_record(record)
+    assert storage.get_record(records[0].mmh_id) == records[0]
+    assert {r.mmh_id for r in storage.search_records(domain="physics")} == {
+        records[0].mmh_id, records[1].mmh_id
+    }
+    assert storage.get_statistics()["total_records"] == 4
+
+    backup = storage.create_backup("snapshot")
+    extra = MMHCore(str(tmp_path / "extra_storage")).create_record(
+        content_data={"test_name": "extra"}, record_type="test_result",
+        domain="physics", tags=[], description="extra", author="alice"
+    )
+    storage.store_record(extra)
+    assert storage.restore_from_backup(backup)
+
+    # Restored contents are served through the shared connection
+    assert storage.get_record(extra.mmh_id) is None
+    assert storage.get_statistics()["total_records"] == 4
+    storage.close()
+
+
+def test_store_records_batch(storage, records):
+    """Test batched ingest matches one-by-one storage."""
+    storage.store_records(records)
+
+    for record in records:
+        assert storage.get_record(record.mmh_id) == record
+        assert storage.load_file_backup(record.mmh_id)["record"] == record.to_dict()
+    assert storage.get_statistics()["total_records"] == len(records)
+
+    # Re-ingest replaces rows rather than duplicating them
+    storage.store_records(records[:2])
+    storage.store_records([])
+    assert storage.get_statistics()["total_records"] == len(records)
+
+
+def test_search_uses_composite_index(storage, records):
+    """Test that combined filters are served by the composite index."""
+    storage.store_records(records)
+    plan = storage.database._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM mmh_records "
+        "WHERE domain = ? AND record_type = ? AND author = ? ORDER BY timestamp DESC",
+        ("physics", "test_result", "alice")
+    ).fetchall()
+    detail = " ".join(row[-1] for row in plan)
+    assert "idx_domain_type_author_ts" in detail
+    assert "TEMP B-TREE" not in detail
+
+    found = storage.search_records(domain="physics", record_type="test_result", author="alice")
+    assert [r.mmh_id for r in found] == [records[1].mmh_id]
+
+
+def test_tag_search_uses_tags_table(storage, records, tmp_path):
+    """Test tag filtering in SQL, tag replacement and legacy backfill."""
+    storage.store_records(records)
+
+    assert {r.mmh_id for r in storage.search_records(tags=["tag1", "tag3"])} == {
+        records[1].mmh_id, records[3].mmh_id
+    }
+    assert len(storage.search_records(tags=["storage"])) == 4
+    assert [r.mmh_id for r in storage.search_records(tags=["storage"], domain="climate", author="alice")] == [
+        records[3].mmh_id
+    ]
+    assert storage.search_records(tags=["tag"]) == []
+
+    # Re-storing a record replaces its tag rows
+    records[0].tags = ["renamed"]
+    storage.store_record(records[0])
+    assert storage.search_records(tags=["tag0"]) == []
+    assert [r.mmh_id for r in storage.search_records(tags=["renamed"])] == [records[0].mmh_id]
+
+    # A database from before mmh_tags is backfilled on open
+    conn = storage.database._conn
+    conn.execute("DROP TABLE mmh_tags")
+    conn.execute("PRAGMA user_version = 0")
+    storage.close()
+    reopened = MMHStorage(str(tmp_path / "mmh_storage"))
+    assert {r.mmh_id for r in reopened.search_records(tags=["tag2"])} == {records[2].mmh_id}
+    reopened.close()
+
+
+def test_json_columns_accept_text_and_blob(storage, records):
+    """Test that rows written as TEXT by older versions still decode."""
+    storage.store_records(records[:2])
+    conn = storage.database._conn
+    kinds = conn.execute("SELECT typeof(content_data), typeof(tags) FROM mmh_records").fetchall()
+    assert set(kinds) == {("blob", "blob")}
+    assert storage.database.migrate_json_columns() == 0
+
+    # Legacy row: stdlib json.dumps text
+    conn.execute(
+        "UPDATE mmh_records SET content_data = ?, tags = ? WHERE mmh_id = ?",
+        (json.dumps(records[0].content_data), json.dumps(records[0].tags), records[0].mmh_id)
+    )
+    assert storage.get_record(records[0].mmh_id) == records[0]
+    assert {r.mmh_id for r in storage.search_records(tags=["storage"])} == {
+        records[0].mmh_id, records[1].mmh_id
+    }
+
+
+def test_backup_manifest_hashes_guard_restore(storage, records):
+    """Test that restore refuses a backup whose files no longer match the manifest."""
+    storage.store_records(records)
+    backup = Path(storage.create_backup("hashed"))
+
+    manifest = json.loads((backup / "manifest.json").read_text())
+    hashes = manifest["file_sha256"]
+    assert set(hashes) == {"mmh.db"} | {f"backups/{r.mmh_id}.mmh" for r in records}
+    assert hashes["mmh.db"] == hashlib.sha256((backup / "mmh.db").read_bytes()).hexdigest()
+    assert storage.restore_from_backup(str(backup))
+
+    # Corrupt one record backup: restore is refused and live state untouched
+    target = backup / f"backups/{records[0].mmh_id}.mmh"
+    target.write_bytes(target.read_bytes() + b"\0")
+    assert not storage.restore_from_backup(str(backup))
+    target.unlink()
+    assert not storage.restore_from_backup(str(backup))
+    assert storage.get_statistics()["total_records"] == 4
+
+
+@pytest.mark.parametrize("chunk_size", [256, 1])
+def test_verify_storage_integrity_flags_corrupted_rows(storage, records, monkeypatch, chunk_size):
+    """Test integrity checks on the serial and process-pool paths."""
+    monkeypatch.setattr(storage_module, "INTEGRITY_CHUNK_SIZE", chunk_size)
+    monkeypatch.setattr(storage_module, "BACKUP_WORKERS", 2)
+    storage.store_records(records)
+
+    report = storage.verify_storage_integrity()
+    assert report["integrity_verified"]
+    assert report["database_records"] == 4 and report["corrupted_records"] == []
+
+    conn = storage.database._conn
+    conn.execute("UPDATE mmh_records SET content_data = ? WHERE mmh_id = ?",
+                 (json.dumps({"tampered": True}), records[1].mmh_id))
+    conn.execute("UPDATE mmh_records SET content_hash = ? WHERE mmh_id = ?",
+                 ("not hex", records[3].mmh_id))
+    report = storage.verify_storage_integrity()
+    assert not report["integrity_verified"]
+    assert sorted(report["corrupted_records"]) == sorted([records[1].mmh_id, records[3].mmh_id])
+
+
+def test_non_finite_content_round_trips(storage, tmp_path):
+    """Test that NaN, infinities and big integers survive the database columns."""
+    record = MMHCore(str(tmp_path / "nan_storage")).create_record(
+        content_data={"test_name": "nan", "results": {"residual": float("nan"), "count": 2 ** 70}},
+        record_type="test_result", domain="physics", tags=["nan"], description="nan", author="tester"
+    )
+    storage.store_record(record)
+
+    restored = storage.get_record(record.mmh_id)
+    assert restored.to_json() == record.to_json()
+    assert storage.verify_storage_integrity()["corrupted_records"] == []
+
+
+@pytest.mark.parametrize("value", [-2 ** 63, -2 ** 63 - 1, 2 ** 64 - 1, 2 ** 64, -10 ** 30])
+def test_int64_boundary_content_round_trips(storage, tmp_path, value):
+    """Test integers at and just past the 64-bit limits decode exactly."""
+    record = MMHCore(str(tmp_path / "int_storage")).create_record(
+        content_data={"test_name": "int64", "results": {"count": value}},
+        record_type="test_result", domain="math", tags=[], description="int64", author="tester"
+    )
+    storage.store_record(record)
+
+    restored = storage.get_record(record.mmh_id)
+    assert restored.content_data["results"]["count"] == value
+    assert isinstance(restored.content_data["results"]["count"], int)
+    assert storage.load_file_backup(record.mmh_id)["record"] == record.to_dict()
+    assert storage.verify_storage_integrity()["corrupted_records"] == []
+    assert storage_module._loads_json(json.dumps(value)) == value
+
+
+def test_migrate_json_columns_to_msgpack(storage, records):
+    """Test one-shot conversion of JSON rows written by older versions."""
+    pytest.importorskip("msgpack")
+    storage.store_records(records)
+    conn = storage.database._conn
+    # Older rows: stdlib JSON as TEXT and compact JSON as BLOB
+    conn.execute("UPDATE mmh_records SET content_data = ?, tags = ? WHERE mmh_id = ?",
+                 (json.dumps(records[0].content_data), json.dumps(records[0].tags), records[0].mmh_id))
+    conn.execute("UPDATE mmh_records SET content_data = ? WHERE mmh_id = ?",
+                 (json.dumps(records[1].content_data).encode(), records[1].mmh_id))
+
+    assert storage.database.migrate_json_columns() == 2
+    assert storage.database.migrate_json_columns() == 0
+    first_bytes = conn.execute("SELECT substr(content_data, 1, 1), substr(tags, 1, 1) FROM mmh_records").fetchall()
+    assert all(a not in (b"{", "{") and b not in (b"[", "[") for a, b in first_bytes)
+    for record in records:
+        assert storage.get_record(record.mmh_id) == record
+
+
+def test_search_sql_is_shared_per_filter_shape(storage, records):
+    """Test cached search SQL and parameter binding, including LIMIT."""
+    storage.store_records(records)
+    assert storage_module._search_sql(2, True, False, False, True) is storage_module._search_sql(
+        2, True, False, False, True
+    )
+
+    newest_first = [r.mmh_id for r in sorted(records, key=lambda r: r.timestamp, reverse=True)]
+    assert [r.mmh_id for r in storage.search_records(limit=2)] == newest_first[:2]
+    found = storage.search_records(tags=["tag0", "tag2"], domain="climate", limit=5)
+    assert [r.mmh_id for r in found] == [records[2].mmh_id]
+
+
+def test_search_defers_content_until_accessed(storage, records):
+    """Test lazy search results against eager ones."""
+    import pickle
+
+    storage.store_records(records)
+    lazy = storage.search_records(domain="physics", eager=False)
+    eager = storage.search_records(domain="physics")
+
+    assert all(type(r) is MMHRecord for r in eager)
+    assert all(isinstance(r, MMHRecord) for r in lazy)
+    assert lazy == eager and eager == lazy
+    by_id = {r.mmh_id: r for r in records}
+    for record in lazy:
+        assert record.content_data == by_id[record.mmh_id].content_data
+        assert record.to_dict() == by_id[record.mmh_id].to_dict()
+
+    # Content is fetched on first access, not at search time
+    pending = storage.search_records(domain="climate", eager=False)
+    storage.database._conn.execute("DELETE FROM mmh_records WHERE mmh_id = ?", (pending[0].mmh_id,))
+    assert pending[0].tags == by_id[pending[0].mmh_id].tags
+    with pytest.raises(KeyError):
+        pending[0].content_data
+
+    restored = pickle.loads(pickle.dumps(lazy[0]))
+    assert type(restored) is MMHRecord and restored == lazy[0]
+
+
+def test_search_is_eager_by_default(storage, records):
+    """Test default search results keep their content after the storage closes."""
+    storage.store_records(records)
+    found = storage.search_records(domain="physics")
+    storage.close()
+
+    assert all(type(r) is MMHRecord for r in found)
+    by_id = {r.mmh_id: r for r in records}
+    assert sorted(r.mmh_id for r in found) == sorted(r.mmh_id for r in records[:2])
+    assert all(r.content_data == by_id[r.mmh_id].content_data for r in found)
+
+
+def test_statistics_from_single_aggregate(storage, records):
+    """Test folded group statistics against per-record sums."""
+    assert storage.get_statistics()["total_records"] == 0
+    assert storage.get_statistics()["average_reproducibility_score"] == 0.0
+
+    records[0].reproducibility_score = 0.5
+    records[3].reproducibility_score = None
+    storage.store_records(records)
+    stats = storage.get_statistics()
+
+    assert stats["total_records"] == 4
+    assert stats["records_by_type"] == {"scientific_data": 2, "test_result": 2}
+    assert stats["records_by_domain"] == {"physics": 2, "climate": 2}
+    assert stats["total_size_bytes"] == sum(r.content_size for r in records)
+    scores = [r.reproducibility_score for r in records if r.reproducibility_score is not None]
+    assert stats["average_reproducibility_score"] == pytest.approx(sum(scores) / len(scores))
+
+
+def test_backup_sizes_tracked_in_database(storage, records):
+    """Test backup statistics come from the backup_size column, backfilled on upgrade."""
+    storage.store_records(records[:3])
+    storage.store_record(records[3])
+    file_sizes = sum(f.stat().st_size for f in storage.backup_path.glob("*.mmh"))
+
+    stats = storage.get_statistics()
+    assert stats["backup_files"] == 4
+    assert stats["backup_size_bytes"] == file_sizes
+    assert stats["backup_size_mb"] == pytest.approx(file_sizes / (1024 * 1024))
+
+    # Schema 1 databases have no backup_size column
+    storage.close()
+    conn = sqlite3.connect(storage.database.db_path)
+    conn.execute("ALTER TABLE mmh_records DROP COLUMN backup_size")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    reopened = MMHStorage(str(storage.storage_path))
+    assert reopened.get_statistics()["backup_size_bytes"] == file_sizes
+    assert reopened.get_statistics()["backup_files"] == 4
+    reopened.close()
+
+
+def test_snapshot_links_survive_later_writes(storage, records):
+    """Test that hard-linked snapshot files are not changed by re-storing records."""
+    storage.store_records(records[:2])
+    backup = Path(storage.create_backup("linked"))
+    snapshot_file = backup / "backups" / f"{records[0].mmh_id}.mmh"
+    live_file = storage.backup_path / f"{records[0].mmh_id}.mmh"
+    before = snapshot_file.read_bytes()
+
+    # Re-store replaces the live file rather than rewriting the shared inode
+    records[0].description = "changed"
+    storage.store_record(records[0])
+    assert snapshot_file.read_bytes() == before
+    assert live_file.read_bytes() != before
+
+    storage.store_record(records[2])
+    assert storage.restore_from_backup(str(backup))
+    assert storage.get_record(records[0].mmh_id).description == "storage test"
+    assert storage.get_record(records[2].mmh_id) is None
+    assert storage.load_file_backup(records[0].mmh_id)["record"]["description"] == "storage test"
+    assert not list(storage.backup_path.glob("*.tmp"))
+
+
+def test_get_record_cache_invalidation(storage, records, monkeypatch):
+    """Test cached reads, copy-on-return and invalidation on store and restore."""
+    monkeypatch.setattr(storage_module, "RECORD_CACHE_SIZE", 2)
+    storage.store_records(records)
+    backup = storage.create_backup("cached")
+
+    first = storage.get_record(records[0].mmh_id)
+    first.description = "caller edit"
+    first.content_data["results"]["value"] = -1
+    first.tags.append("caller")
+    cached = storage.get_record(records[0].mmh_id)
+    assert cached.description == "storage test"
+    assert cached.content_data == records[0].content_data
+    assert cached.tags == records[0].tags
+    for record in records[1:]:
+        storage.get_record(record.mmh_id)
+    assert len(storage.database._record_cache) == 2
+
+    records[3].description = "updated"
+    storage.store_record(records[3])
+    assert storage.get_record(records[3].mmh_id).description == "updated"
+
+    assert storage.restore_from_backup(backup)
+    assert storage.get_record(records[3].mmh_id).description == "storage test"
+
+
+@pytest.mark.skipif(not (storage_module.ZSTD_AVAILABLE and storage_module.MSGPACK_AVAILABLE),
+                    reason="zstandard and msgpack required")
+def test_trained_backup_dictionary(storage, records, tmp_path):
+    """Test dictionary training, dictionary-compressed backups and their restore."""
+    core = MMHCore(str(tmp_path / "core_dict"))
+    samples = [
+        core.create_record(content_data={"test_name": f"sample_{i}", "results": {"value": i}},
+                           record_type="test_result", domain="physics", author="alice",
+                           tags=["storage", "sample"], description="dictionary sample")
+        for i in range(storage_module.BACKUP_DICT_MIN_SAMPLES * 4)
+    ]
+    assert storage.train_backup_dictionary() is None
+    storage.store_records(samples)
+
+    dict_id = storage.train_backup_dictionary()
+    assert dict_id
+    assert storage.train_backup_dictionary() == dict_id
+    storage.store_record(records[0])
+    data = (storage.backup_path / f"{records[0].mmh_id}.mmh").read_bytes()
+    assert storage_module.zstd.get_frame_parameters(data).dict_id == dict_id
+    assert storage.load_file_backup(records[0].mmh_id)["record"] == records[0].to_dict()
+    # Backups written before training stay readable
+    assert storage.load_file_backup(samples[0].mmh_id)["record"] == samples[0].to_dict()
+
+    backup = storage.create_backup("dict")
+    storage.backup_dict_path.unlink()
+    reopened = MMHStorage(str(storage.storage_path))
+    with pytest.raises(ValueError):
+        reopened.load_file_backup(records[0].mmh_id)
+    assert reopened.restore_from_backup(backup)
+    assert reopened.load_file_backup(records[0].mmh_id)["record"] == records[0].to_dict()
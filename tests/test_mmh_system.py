@@ -0,0 +1,432 @@
+"""
+MMH System Tests
+================
+
+Tests for MMH record creation, signing and verification.
+"""
+
+import pytest
+import os
+import sys
+import json
+import shutil
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mmh_system.mmh_core import MMHCore, MMHRecord, MMHVerifier, LEGACY_RECORD_VERSION, RECORD_VERSION
+
+LEGACY_STORAGE = Path(__file__).parent.parent / "test_mmh_storage"
+
+
+def _sample_content():
+    """Sample reproducible test payload."""
+    return {
+        "test_name": "physics_gravity_test",
+        "input_data": {"m1": 5.97e24, "m2": 7.35e22, "r": 3.84e8},
+        "parameters": {"G": 6.674e-11},
+        "results": {"force": 1.98e20},
+        "environment": {"python": "3.11"}
+    }
+
+
+@pytest.fixture
+def mmh_core(tmp_path):
+    """Fresh MMH core in a temporary storage directory."""
+    return MMHCore(str(tmp_path / "mmh_storage"))
+
+
+def test_create_record_uses_fused_signature(mmh_core):
+    """Test that new records derive signature and verification hash in one pass."""
+    record = mmh_core.create_record(
+        content_data=_sample_content(),
+        record_type="test_result",
+        domain="physics",
+        tags=["gravity"],
+        description="Gravity test",
+        author="tester",
+        test_name="physics_gravity_test"
+    )
+
+    assert record.version == RECORD_VERSION
+    signature, verification_hash = mmh_core._create_signature_pair(
+        record.mmh_id, record.content_hash, record.timestamp
+    )
+    assert record.signature == signature
+    assert record.verification_hash == verification_hash
+    assert len(record.signature) == 64
+    assert len(record.verification_hash) == 64
+    assert record.signature != record.verification_hash
+
+
+def test_create_record_copies_caller_data(mmh_core):
+    """Test later changes to the caller's content and tags do not reach the record."""
+    content = _sample_content()
+    tags = ["gravity"]
+    record = mmh_core.create_record(
+        content_data=content, record_type="test_result", domain="physics",
+        tags=tags, description="Gravity test", author="tester"
+    )
+    content["results"]["force"] = 0.0
+    content["extra"] = True
+    tags.append("edited")
+
+    stored = mmh_core.get_record(record.mmh_id)
+    assert stored.content_data == record.content_data == _sample_content()
+    assert stored.tags == record.tags == ["gravity"]
+    assert mmh_core.verify_record(stored)
+
+
+def test_legacy_records_keep_signature_scheme(tmp_path):
+    """Test that 1.0.0 records are still checked with the two-hash scheme."""
+    storage = tmp_path / "legacy_storage"
+    shutil.copytree(LEGACY_STORAGE, storage)
+    core = MMHCore(str(storage))
+
+    assert core.records
+    for mmh_id, record_dict in core.records.items():
+        assert record_dict["version"] == LEGACY_RECORD_VERSION
+        signature = core._create_signature(
+            record_dict["content_hash"], record_dict["timestamp"]
+        )
+        verification_hash = core._create_verification_hash(
+            mmh_id, record_dict["content_hash"], signature, record_dict["timestamp"]
+        )
+        assert signature == record_dict["signature"]
+        assert verification_hash == record_dict["verification_hash"]
+
+
+def test_record_json_round_trip(mmh_core):
+    """Test record serialization round trip."""
+    record = mmh_core.create_record(
+        content_data=_sample_content(),
+        record_type="test_result",
+        domain="physics",
+        tags=["gravity", "newton"],
+        description="Gravity test",
+        author="tester"
+    )
+
+    restored = MMHRecord.from_json(record.to_json())
+    assert restored == record
+    assert mmh_core.get_record(record.mmh_id) == record
+
+
+def test_verify_reproducibility_batch(mmh_core):
+    """Test bulk reproducibility scoring matches per-record verification."""
+    complete = mmh_core.create_record(
+        content_data=_sample_content(), record_type="test_result",
+        domain="physics", tags=[], description="complete", author="tester"
+    )
+    partial = mmh_core.create_record(
+        content_data={"test_name": "partial", "results": {}}, record_type="test_result",
+        domain="physics", tags=[], description="partial", author="tester"
+    )
+
+    verifier = MMHVerifier(mmh_core)
+    batch = verifier.verify_reproducibility_batch()
+
+    assert set(batch) == {complete.mmh_id, partial.mmh_id}
+    for mmh_id, result in batch.items():
+        single = verifier.verify_reproducibility(mmh_id)
+        assert result["reproducible"] == single["reproducible"]
+        assert result["missing_elements"] == single["missing_elements"]
+        assert result["computed_score"] == single["reproducibility_score"]
+
+    assert batch[complete.mmh_id]["reproducible"]
+    assert batch[partial.mmh_id]["missing_elements"] == ["input_data", "parameters"]
+    assert verifier.verify_reproducibility_batch(["missing"])["missing"]["reproducible"] is False
+
+
+def test_search_records_filters(mmh_core):
+    """Test that search filters on stored fields and returns records."""
+    physics = mmh_core.create_record(
+        content_data={"test_name": "a"}, record_type="test_result",
+        domain="physics", tags=["gravity"], description="a", author="alice"
+    )
+    climate = mmh_core.create_record(
+        content_data={"test_name": "b"}, record_type="scientific_data",
+        domain="climate", tags=["temperature"], description="b", author="bob"
+    )
+
+    assert [r.mmh_id for r in mmh_core.search_records(domain="physics")] == [physics.mmh_id]
+    assert [r.mmh_id for r in mmh_core.search_records(tags=["temperature"])] == [climate.mmh_id]
+    assert [r.mmh_id for r in mmh_core.search_records(author="bob", record_type="scientific_data")] == [climate.mmh_id]
+    assert mmh_core.search_records(domain="physics", author="bob") == []
+    assert all(isinstance(r, MMHRecord) for r in mmh_core.search_records())
+    assert mmh_core.get_chain_integrity()["broken_links"] == []
+
+
+def test_verify_fields_rejects_tampering(mmh_core):
+    """Test raw-digest verification of signature and verification hash."""
+    content = _sample_content()
+    content_hash = mmh_core._hash_content(mmh_core._canonical_content(content).encode())
+    timestamp = "2026-01-01T00:00:00"
+    signature, verification_hash = mmh_core._create_signature_pair("abc", content_hash, timestamp)
+
+    def verify(**overrides):
+        fields = dict(
+            mmh_id="abc", content_data=content, content_hash=content_hash,
+            signature=signature, verification_hash=verification_hash,
+            timestamp=timestamp, version=RECORD_VERSION
+        )
+        fields.update(overrides)
+        return mmh_core._verify_fields(**fields)
+
+    assert verify()
+    assert not verify(signature="0" * 64)
+    flipped = "1" if verification_hash[-1] == "0" else "0"
+    assert not verify(verification_hash=verification_hash[:-1] + flipped)
+    assert not verify(signature="not hex")
+    assert not verify(timestamp="2026-01-01T00:00:01")
+    assert not verify(version=LEGACY_RECORD_VERSION)
+    assert not verify(content_data=dict(content, results={}))
+
+
+def test_chain_integrity_flags_tampered_records(mmh_core):
+    """Test vectorized chain integrity check against per-record verification."""
+    records = [
+        mmh_core.create_record(
+            content_data={"test_name": f"t{i}", "results": {"value": i}},
+            record_type="test_result", domain="physics", tags=[],
+            description="chain", author="tester"
+        )
+        for i in range(4)
+    ]
+    record_dicts = [mmh_core.records[r.mmh_id] for r in records]
+    expected = [i for i, d in enumerate(record_dicts) if not mmh_core._verify_record_dict(d)]
+    assert mmh_core._find_verification_errors(record_dicts) == expected
+
+    # Tampered signature and malformed digest are both reported
+    record_dicts[1]["signature"] = "0" * 64
+    assert 1 in mmh_core._find_verification_errors(record_dicts)
+    record_dicts[2]["verification_hash"] = "zz"
+    errors = mmh_core._find_verification_errors(record_dicts)
+    assert 1 in errors and 2 in errors
+
+    del mmh_core.records[records[3].mmh_id]
+    report = mmh_core.get_chain_integrity()
+    assert report["broken_links"] == [records[3].mmh_id]
+    assert records[1].mmh_id in report["verification_errors"]
+    assert not report["chain_verified"]
+
+
+def test_chain_log_is_append_only(tmp_path):
+    """Test that chain entries are appended to the log and reloaded."""
+    storage = tmp_path / "chain_storage"
+    shutil.copytree(LEGACY_STORAGE, storage)
+    core = MMHCore(str(storage))
+    legacy_count = len(core.chain["records"])
+    snapshot = (storage / "mmh_chain.json").read_text()
+
+    record = core.create_record(
+        content_data={"test_name": "append"}, record_type="test_result",
+        domain="physics", tags=[], description="append", author="tester"
+    )
+    core.close()
+
+    # Snapshot untouched, one compact line appended
+    assert (storage / "mmh_chain.json").read_text() == snapshot
+    lines = (storage / "mmh_chain.log").read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["verification_hash"] == record.verification_hash
+
+    reloaded = MMHCore(str(storage))
+    assert len(reloaded.chain["records"]) == legacy_count + 1
+    assert reloaded._get_chain_hash() == record.verification_hash
+    reloaded.close()
+
+
+def test_chain_log_recovers_from_torn_line(tmp_path):
+    """Test that chain entries appended after a torn line are kept."""
+    storage = tmp_path / "chain_storage"
+    core = MMHCore(str(storage))
+    first = core.create_record(
+        content_data={"test_name": "first"}, record_type="test_result",
+        domain="physics", tags=[], description="first", author="tester"
+    )
+    core.close()
+    with open(storage / "mmh_chain.log", "ab") as f:
+        f.write(b'{"mmh_id":"torn","timest')
+
+    reopened = MMHCore(str(storage))
+    second = reopened.create_record(
+        content_data={"test_name": "second"}, record_type="test_result",
+        domain="physics", tags=[], description="second", author="tester"
+    )
+    reopened.close()
+
+    reloaded = MMHCore(str(storage))
+    assert [entry["mmh_id"] for entry in reloaded.chain["records"]] == [first.mmh_id, second.mmh_id]
+    assert reloaded.get_chain_integrity()["chain_verified"]
+    reloaded.close()
+
+
+def test_compact_interrupted_before_log_removal(tmp_path):
+    """Test that a log already folded into the snapshot is not replayed twice."""
+    storage = tmp_path / "chain_storage"
+    core = MMHCore(str(storage))
+    for i in range(3):
+        core.create_record(
+            content_data={"test_name": f"c{i}"}, record_type="test_result",
+            domain="physics", tags=[], description="compact", author="tester"
+        )
+    core.close()
+    chain_log = (storage / "mmh_chain.log").read_bytes()
+    records_log = (storage / "mmh_records.log").read_bytes()
+    expected = list(core.chain["records"])
+
+    # Snapshots replaced, then the process died before removing the logs
+    core.compact()
+    (storage / "mmh_chain.log").write_bytes(chain_log)
+    (storage / "mmh_records.log").write_bytes(records_log)
+
+    reloaded = MMHCore(str(storage))
+    assert reloaded.chain["records"] == expected
+    assert len(reloaded.records) == 3
+    reloaded.close()
+
+
+def test_canonical_json_matches_generic_encoder(mmh_core):
+    """Test the schema-specialized serializer against sorted json.dumps."""
+    record = mmh_core.create_record(
+        content_data={"z": [3, 2, 1], "a": {"y": "ü", "b": None}, "test_name": "c"},
+        record_type="test_result", domain="physics", tags=["b", "a"],
+        description="canonical", author="tester"
+    )
+
+    expected = json.dumps(record.to_dict(), sort_keys=True, separators=(",", ":"))
+    assert record.to_canonical_json() == expected
+
+    # Records snapshot round-trips through the specialized writer
+    mmh_core.compact()
+    with open(mmh_core.records_file) as f:
+        assert json.load(f)[record.mmh_id] == record.to_dict()
+
+
+def test_records_log_reload_and_compact(tmp_path):
+    """Test that records append to the binary log and survive compaction."""
+    storage = tmp_path / "records_storage"
+    shutil.copytree(LEGACY_STORAGE, storage)
+    core = MMHCore(str(storage))
+    legacy_ids = set(core.records)
+    snapshot = (storage / "mmh_records.json").read_text()
+
+    record = core.create_record(
+        content_data=_sample_content(), record_type="test_result",
+        domain="physics", tags=["gravity"], description="log", author="tester"
+    )
+    core.close()
+
+    # JSON snapshot untouched; record lives in the log
+    assert (storage / "mmh_records.json").read_text() == snapshot
+    assert (storage / "mmh_records.log").stat().st_size > 0
+
+    # A torn trailing frame is ignored on reload
+    with open(storage / "mmh_records.log", "ab") as f:
+        f.write(b"\xff\x00\x00\x00partial")
+    reloaded = MMHCore(str(storage))
+    assert set(reloaded.records) == legacy_ids | {record.mmh_id}
+    assert reloaded.get_record(record.mmh_id) == record
+
+    reloaded.compact()
+    assert not (storage / "mmh_records.log").exists()
+    assert not (storage / "mmh_chain.log").exists()
+    compacted = MMHCore(str(storage))
+    assert compacted.get_record(record.mmh_id) == record
+    assert len(compacted.chain["records"]) == len(reloaded.chain["records"])
+
+
+def test_append_after_torn_records_frame(tmp_path):
+    """Test that records appended after a torn frame still reload."""
+    storage = tmp_path / "torn_storage"
+    core = MMHCore(str(storage))
+    first = core.create_record(
+        content_data={"test_name": "first"}, record_type="test_result",
+        domain="physics", tags=[], description="first", author="tester"
+    )
+    core.close()
+    intact_size = (storage / "mmh_records.log").stat().st_size
+    with open(storage / "mmh_records.log", "ab") as f:
+        f.write(b"\xff\x00\x00\x00partial")
+
+    reopened = MMHCore(str(storage))
+    assert (storage / "mmh_records.log").stat().st_size == intact_size
+    second = reopened.create_record(
+        content_data={"test_name": "second"}, record_type="test_result",
+        domain="physics", tags=[], description="second", author="tester"
+    )
+    reopened.close()
+
+    reloaded = MMHCore(str(storage))
+    assert reloaded.get_record(first.mmh_id) == first
+    assert reloaded.get_record(second.mmh_id) == second
+    reloaded.close()
+
+
+def test_repeated_content_reuses_hash(mmh_core):
+    """Test that duplicate payloads hit the content cache but get unique IDs."""
+    first = mmh_core.create_record(
+        content_data=_sample_content(), record_type="test_result",
+        domain="physics", tags=[], description="first", author="tester"
+    )
+    second = mmh_core.create_record(
+        content_data=_sample_content(), record_type="test_result",
+        domain="physics", tags=[], description="second", author="tester"
+    )
+
+    assert first.mmh_id != second.mmh_id
+    assert first.content_hash == second.content_hash
+    assert len(mmh_core._content_cache) == 1
+
+    mmh_core.compact()
+    assert len(mmh_core._content_cache) == 0
+
+
+def test_compute_merkle_root(mmh_core):
+    """Test Merkle root over chain verification hashes."""
+    import hashlib
+
+    assert mmh_core.compute_merkle_root() is None
+
+    records = [
+        mmh_core.create_record(
+            content_data={"test_name": f"m{i}"}, record_type="test_result",
+            domain="physics", tags=[], description="merkle", author="tester"
+        )
+        for i in range(3)
+    ]
+    leaves = [bytes.fromhex(r.verification_hash) for r in records]
+
+    def sha256d(data):
+        return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+    expected = sha256d(sha256d(leaves[0] + leaves[1]) + sha256d(leaves[2] + leaves[2]))
+    assert mmh_core.compute_merkle_root() == expected.hex()
+
+
+def test_record_timestamp_ns(mmh_core):
+    """Test integer epoch-nanosecond view of record timestamps."""
+    record = mmh_core.create_record(
+        content_data={"test_name": "ts"}, record_type="test_result",
+        domain="physics", tags=[], description="ts", author="tester"
+    )
+    record.timestamp = "2026-01-02T03:04:05.123456"
+    assert record.timestamp_ns == 1767323045123456000
+    record.timestamp = "2026-01-02T04:04:05.123456+01:00"
+    assert record.timestamp_ns == 1767323045123456000
+
+
+def test_legacy_content_digest_streams_gzip(monkeypatch):
+    """Test the streamed gzip digest against hashing gzip.compress output."""
+    import gzip
+    import hashlib
+    from mmh_system.mmh_core import content_digest, canonical_content
+
+    # Pin the gzip header mtime so both encodings are comparable
+    monkeypatch.setattr(gzip.time, "time", lambda: 1767225600.0)
+    content = _sample_content()
+    expected = hashlib.sha256(gzip.compress(canonical_content(content).encode())).digest()
+    assert content_digest(content, LEGACY_RECORD_VERSION) == expected
+    assert content_digest(content) == hashlib.sha256(canonical_content(content).encode()).digest()
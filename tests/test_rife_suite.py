@@ -0,0 +1,170 @@
+"""
+RIFE Comprehensive Test Suite Tests
+===================================
+
+Tests for the blind-injection spectrum, Monte Carlo, pipeline SNR and
+reproducibility checksum helpers in rife_legacy.
+"""
+
+import pytest
+import os
+import sys
+import hashlib
+import warnings
+
+import numpy as np
+
+# The legacy suite is a standalone script; make it importable headless
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rife_legacy"))
+
+import RIFE_COMPREHENSIVE_TEST_SUITE as rife_suite
+
+
+def _reference_band_power(data, dt, low, high):
+    """Mean band power the way the suite computed it with a full FFT and masks."""
+    power = np.abs(np.fft.fft(data))**2
+    freqs = np.fft.fftfreq(len(data), dt)
+    return np.mean(power[(freqs > low) & (freqs < high)])
+
+
+@pytest.mark.parametrize("n, dt", [
+    (1000, 0.01),
+    (1001, 0.01),
+    (36864, 3600 / 36863),
+    (4096, 1 / 512),
+])
+@pytest.mark.parametrize("low, high", [(50, 200), (10, 40), (10.0, 20.0), (0, 5), (300, 400)])
+def test_band_bins_match_frequency_masks(n, dt, low, high):
+    """Test the arithmetic band slice against the rfftfreq masks."""
+    freqs = np.fft.rfftfreq(n, dt)
+    df = 1.0 / (n * dt)
+
+    band = np.arange(len(freqs))[rife_suite._band_bins(len(freqs), df, low, high)]
+    np.testing.assert_array_equal(band, np.flatnonzero((freqs > low) & (freqs < high)))
+
+
+def _reference_snr(dataset):
+    """Blind-test SNR as the full-FFT implementation computed it."""
+    dt = dataset["time"][1] - dataset["time"][0]
+    with warnings.catch_warnings():
+        # Bands above the Nyquist frequency are empty slices
+        warnings.simplefilter("ignore", RuntimeWarning)
+        signal_power = _reference_band_power(dataset["data"], dt, 50, 200)
+        background_power = _reference_band_power(dataset["data"], dt, 10, 40)
+    return signal_power / background_power if background_power > 0 else 0
+
+
+def test_blind_analysis_matches_full_fft_reference(monkeypatch):
+    """Test the real-input FFT path against the full complex FFT."""
+    monkeypatch.setattr(rife_suite, "NUMBA_AVAILABLE", False)
+    np.random.seed(7)
+    blind = rife_suite.BlindInjectionTest(n_trials=1)
+
+    # 1 kHz sampling puts bins in both bands
+    t = np.linspace(0, 10, 10000)
+    noise = np.random.normal(0, 1e-21, len(t))
+    datasets = [
+        {"data": noise + 5e-22 * np.sin(2 * np.pi * 120 * t), "time": t, "noise_level": 1e-21},
+        {"data": noise, "time": t, "noise_level": 1e-21},
+        blind.create_blind_dataset(True),
+        blind.create_blind_dataset(False),
+    ]
+    for dataset in datasets:
+        expected = _reference_snr(dataset)
+        result = blind.analyze_blind_data(dataset)
+        assert result["snr"] == pytest.approx(expected, rel=1e-9, nan_ok=True)
+        assert result["detected"] == (expected > result["threshold"])
+    assert _reference_snr(datasets[0]) > 0
+
+
+def test_band_mean_power_of_empty_band_is_nan():
+    """Test a band with no bins gives NaN rather than a warning or error."""
+    spectrum = np.fft.rfft(np.ones(16))
+    assert np.isnan(rife_suite._band_mean_power(spectrum, 1.0, 3.0, 3.5))
+
+
+def test_numba_kernel_matches_numpy():
+    """Test the fused band-power kernel against the numpy expression."""
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(3)
+    band = rng.normal(size=4097) + 1j * rng.normal(size=4097)
+
+    expected = np.mean(band.real**2 + band.imag**2)
+    assert rife_suite._band_power_kernel(band) / len(band) == pytest.approx(expected, rel=1e-9)
+
+    spectrum = np.fft.rfft(rng.normal(size=8192))
+    kernel = rife_suite._band_mean_power(spectrum, 0.5, 50, 200)
+    band = spectrum[rife_suite._band_bins(len(spectrum), 0.5, 50, 200)]
+    assert kernel == pytest.approx(np.mean(band.real**2 + band.imag**2), rel=1e-9)
+
+
+def test_monte_carlo_batch_matches_scalar_formulas():
+    """Test the batched draws follow the per-simulation SNR formulas."""
+    mc = rife_suite.MonteCarloSimulation(n_simulations=500, seed=11)
+    summary = mc.run_monte_carlo()
+    results = mc.results
+
+    snr = np.sqrt(results["signal_amplitude"]**2 / results["noise_level"]**2)
+    total_snr = snr / (1 + results["systematic_level"] * snr)
+    np.testing.assert_allclose(results["snr"], snr, rtol=1e-12)
+    np.testing.assert_allclose(results["total_snr"], total_snr, rtol=1e-12)
+    np.testing.assert_array_equal(results["detected"], total_snr > mc.threshold)
+    assert summary["mean_snr"] == pytest.approx(np.mean(snr))
+    assert summary["detection_rate"] == pytest.approx(np.mean(results["detected"]))
+    assert summary["n_simulations"] == 500
+
+    df = mc.results_df
+    assert len(df) == 500
+    assert list(df.columns) == list(results)
+
+    # Same seed, same draws
+    again = rife_suite.MonteCarloSimulation(n_simulations=500, seed=11)
+    again.run_monte_carlo()
+    np.testing.assert_array_equal(again.results["snr"], results["snr"])
+
+    single = rife_suite.MonteCarloSimulation(seed=11).run_single_simulation()
+    assert single["snr"] == pytest.approx(single["signal_amplitude"] / single["noise_level"])
+    assert single["detected"] == (single["total_snr"] > single["threshold"])
+
+
+@pytest.mark.parametrize("data_type, amplitude", [("ligo", 1e-20), ("lsst", 1e-2), ("alma", 3.0)])
+def test_pipeline_snr_uses_noise_level(data_type, amplitude):
+    """Test the analytical pipeline SNR against the generated noise it stands for."""
+    pipeline = rife_suite.PipelineEndToEndTest(seed=5)
+    noise_level, n_samples = pipeline.noise_parameters(data_type)
+
+    result = pipeline.run_pipeline_test(data_type, amplitude)
+    assert result["snr"] == pytest.approx(amplitude / noise_level)
+    assert result["total_snr"] == pytest.approx(result["snr"] / (1 + 0.01 * result["snr"]))
+    assert result["detected"] == (result["total_snr"] > pipeline.snr_threshold)
+
+    time, noise = pipeline.generate_realistic_noise(data_type)
+    assert len(time) == len(noise) == n_samples
+    assert np.std(noise) == pytest.approx(noise_level, rel=0.1)
+
+
+def test_data_checksum_hashes_array_bytes(monkeypatch):
+    """Test the in-place checksum equals hashing the array's bytes."""
+    data = np.random.default_rng(1).normal(size=1000)
+
+    monkeypatch.setattr(rife_suite, "BLAKE3_AVAILABLE", False)
+    assert rife_suite._data_checksum(data) == hashlib.sha256(data.tobytes()).hexdigest()
+    # Strided views hash their values, not the parent buffer
+    assert rife_suite._data_checksum(data[::2]) == hashlib.sha256(data[::2].tobytes()).hexdigest()
+
+
+def test_data_checksum_uses_blake3(monkeypatch):
+    """Test the BLAKE3 path hashes the same bytes."""
+    blake3 = pytest.importorskip("blake3")
+    monkeypatch.setattr(rife_suite, "blake3", blake3, raising=False)
+    monkeypatch.setattr(rife_suite, "BLAKE3_AVAILABLE", True)
+    data = np.random.default_rng(1).normal(size=1000)
+    assert rife_suite._data_checksum(data) == blake3.blake3(data.tobytes()).hexdigest()
+
+
+def test_reproducibility_checksums_match():
+    """Test repeated seeded runs give identical checksums of the configured algorithm."""
+    report = rife_suite.ReproducibilityTest().verify_reproducibility()
+    assert report["checksums_match"]
+    assert {r["checksum_algorithm"] for r in report["results"]} == {rife_suite.CHECKSUM_ALGORITHM}